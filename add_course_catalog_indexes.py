@@ -0,0 +1,30 @@
+"""
+Indexes for the course catalog summary (GET /courses).
+
+The per-course subject/lesson counts and total duration are correlated
+subqueries on course_id; these indexes make each one a range scan instead of
+a full scan of lessons / course_subjects per listed course.
+"""
+from sqlalchemy import create_engine, text
+from app.config import settings
+
+engine = create_engine(settings.DATABASE_URL)
+
+INDEXES = [
+    ("ix_lessons_course_id", "lessons", "course_id"),
+    ("ix_course_subjects_course_id", "course_subjects", "course_id"),
+]
+
+
+def add_indexes():
+    for name, table, column in INDEXES:
+        with engine.begin() as conn:
+            try:
+                conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({column})"))
+                print(f"Added {name}")
+            except Exception as e:
+                print(f"Could not add {name}: {e}")
+
+
+if __name__ == "__main__":
+    add_indexes()
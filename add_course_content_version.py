@@ -0,0 +1,15 @@
+from sqlalchemy import create_engine, text
+from app.config import settings
+
+engine = create_engine(settings.DATABASE_URL)
+
+def add_columns():
+    with engine.begin() as conn:
+        try:
+            conn.execute(text("ALTER TABLE courses ADD COLUMN IF NOT EXISTS content_version INTEGER NOT NULL DEFAULT 0"))
+            print("Added content_version column")
+        except Exception as e:
+            print(f"Could not add content_version: {e}")
+
+if __name__ == "__main__":
+    add_columns()
@@ -0,0 +1,29 @@
+"""
+Indexes for SQL-side daily MCQ scheduling.
+
+- daily_mcqs (course_id, question_id): the "never used for this course" anti-join.
+- questions (module_id): scoping questions to a course through its modules.
+"""
+from sqlalchemy import create_engine, text
+from app.config import settings
+
+engine = create_engine(settings.DATABASE_URL)
+
+INDEXES = [
+    ("ix_daily_mcqs_course_question", "daily_mcqs (course_id, question_id)"),
+    ("ix_questions_module_id", "questions (module_id)"),
+]
+
+
+def add_indexes():
+    for name, definition in INDEXES:
+        with engine.begin() as conn:
+            try:
+                conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {definition}"))
+                print(f"Added {name}")
+            except Exception as e:
+                print(f"Could not add {name}: {e}")
+
+
+if __name__ == "__main__":
+    add_indexes()
@@ -0,0 +1,48 @@
+"""
+Active flag for enrollments, maintained by the expiry sweeper.
+
+Adds enrollments.is_active, deactivates enrollments that already expired and
+creates the partial indexes the active-enrollment reads and the sweeper use.
+"""
+from sqlalchemy import create_engine, text
+from app.config import settings
+
+engine = create_engine(settings.DATABASE_URL)
+
+def add_columns():
+    with engine.begin() as conn:
+        try:
+            conn.execute(text("ALTER TABLE enrollments ADD COLUMN IF NOT EXISTS is_active BOOLEAN NOT NULL DEFAULT true"))
+            print("Added is_active column")
+        except Exception as e:
+            print(f"Could not add is_active: {e}")
+
+    with engine.begin() as conn:
+        try:
+            result = conn.execute(text("UPDATE enrollments SET is_active = false WHERE is_active AND expires_at <= NOW()"))
+            print(f"Deactivated {result.rowcount} expired enrollments")
+        except Exception as e:
+            print(f"Could not deactivate expired enrollments: {e}")
+
+    with engine.begin() as conn:
+        try:
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_enrollments_active_user_course "
+                "ON enrollments (user_id, course_id) WHERE is_active"
+            ))
+            print("Added ix_enrollments_active_user_course")
+        except Exception as e:
+            print(f"Could not add ix_enrollments_active_user_course: {e}")
+
+    with engine.begin() as conn:
+        try:
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_enrollments_active_expires_at "
+                "ON enrollments (expires_at) WHERE is_active AND expires_at IS NOT NULL"
+            ))
+            print("Added ix_enrollments_active_expires_at")
+        except Exception as e:
+            print(f"Could not add ix_enrollments_active_expires_at: {e}")
+
+if __name__ == "__main__":
+    add_columns()
@@ -0,0 +1,21 @@
+from sqlalchemy import create_engine, text
+from app.config import settings
+
+engine = create_engine(settings.DATABASE_URL)
+
+def add_columns():
+    with engine.begin() as conn:
+        try:
+            conn.execute(text("ALTER TABLE lessons ADD COLUMN IF NOT EXISTS poster_url VARCHAR(500)"))
+            print("Added poster_url column")
+        except Exception as e:
+            print(f"Could not add poster_url: {e}")
+
+        try:
+            conn.execute(text("ALTER TABLE lessons ADD COLUMN IF NOT EXISTS thumbnails_url VARCHAR(500)"))
+            print("Added thumbnails_url column")
+        except Exception as e:
+            print(f"Could not add thumbnails_url: {e}")
+
+if __name__ == "__main__":
+    add_columns()
@@ -0,0 +1,48 @@
+"""
+Indexes for the keyset-paginated admin listings.
+
+- tests (created_at, id): newest-first test listing seeks straight to a page.
+- Trigram indexes (pg_trgm) on tests.title, subjects.name, modules.name and
+  questions.question_text let the case-insensitive `search` filters use an
+  index instead of scanning. Skipped if the extension cannot be created.
+"""
+from sqlalchemy import create_engine, text
+from app.config import settings
+
+engine = create_engine(settings.DATABASE_URL)
+
+TRIGRAM_INDEXES = [
+    ("ix_tests_title_trgm", "tests", "title"),
+    ("ix_subjects_name_trgm", "subjects", "name"),
+    ("ix_modules_name_trgm", "modules", "name"),
+    ("ix_questions_question_text_trgm", "questions", "question_text"),
+]
+
+
+def add_indexes():
+    with engine.begin() as conn:
+        try:
+            conn.execute(text("UPDATE tests SET created_at = NOW() WHERE created_at IS NULL"))
+            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_tests_created_at_id ON tests (created_at, id)"))
+            print("Added ix_tests_created_at_id")
+        except Exception as e:
+            print(f"Could not add ix_tests_created_at_id: {e}")
+
+    with engine.begin() as conn:
+        try:
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        except Exception as e:
+            print(f"pg_trgm not available, skipping search indexes: {e}")
+            return
+
+    for name, table, column in TRIGRAM_INDEXES:
+        with engine.begin() as conn:
+            try:
+                conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin ({column} gin_trgm_ops)"))
+                print(f"Added {name}")
+            except Exception as e:
+                print(f"Could not add {name}: {e}")
+
+
+if __name__ == "__main__":
+    add_indexes()
@@ -0,0 +1,26 @@
+"""
+Index for QBank practice sets (POST /qbank/practice-sets).
+
+(user_id, module_id) on user_test_attempts serves the per-module read that
+builds a user's attempted/incorrect question bitsets.
+"""
+from sqlalchemy import create_engine, text
+from app.config import settings
+
+engine = create_engine(settings.DATABASE_URL)
+
+
+def add_indexes():
+    with engine.begin() as conn:
+        try:
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_user_test_attempts_user_module "
+                "ON user_test_attempts (user_id, module_id)"
+            ))
+            print("Added ix_user_test_attempts_user_module")
+        except Exception as e:
+            print(f"Could not add ix_user_test_attempts_user_module: {e}")
+
+
+if __name__ == "__main__":
+    add_indexes()
@@ -0,0 +1,62 @@
+"""
+Add the question fingerprint column and duplicate-index tables, then backfill
+fingerprints, MinHash signatures and LSH buckets for existing questions.
+
+Safe to re-run: questions that already have a fingerprint are skipped.
+"""
+from sqlalchemy import create_engine, text
+from app.config import settings
+from app.database import Base, SessionLocal
+from app.models.question import Question, QuestionLSHBucket, QuestionSignature
+from app.services.question_dedup import QuestionDedupIndex, question_fingerprint, question_signature
+
+BATCH_SIZE = 2000
+
+engine = create_engine(settings.DATABASE_URL)
+
+
+def add_columns():
+    with engine.begin() as conn:
+        try:
+            conn.execute(text("ALTER TABLE questions ADD COLUMN IF NOT EXISTS fingerprint VARCHAR(40)"))
+            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_questions_fingerprint ON questions (fingerprint)"))
+            print("Added fingerprint column")
+        except Exception as e:
+            print(f"Could not add fingerprint: {e}")
+
+    Base.metadata.create_all(bind=engine, tables=[QuestionSignature.__table__, QuestionLSHBucket.__table__])
+    print("Created question_signatures and question_lsh_buckets tables")
+
+
+def backfill():
+    db = SessionLocal()
+    try:
+        total = 0
+        while True:
+            # Re-query each round: updated rows drop out of the filter
+            questions = db.query(Question).filter(Question.fingerprint.is_(None)).order_by(Question.id).limit(BATCH_SIZE).all()
+            if not questions:
+                break
+
+            entries = []
+            for question in questions:
+                row = {field: getattr(question, field) for field in ("question_text", "option_a", "option_b", "option_c", "option_d")}
+                question.fingerprint = question_fingerprint(row)
+                entries.append((question.id, question_signature(row)))
+
+            ids = [question.id for question in questions]
+            db.query(QuestionSignature).filter(QuestionSignature.question_id.in_(ids)).delete(synchronize_session=False)
+            db.query(QuestionLSHBucket).filter(QuestionLSHBucket.question_id.in_(ids)).delete(synchronize_session=False)
+            QuestionDedupIndex(db).add(entries)
+            db.commit()
+            db.expunge_all()
+
+            total += len(questions)
+            print(f"Indexed {total} questions")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    add_columns()
+    backfill()
@@ -0,0 +1,25 @@
+"""
+Schema for the spaced-repetition review queue.
+
+- question_reviews: per-user SM-2 state of each missed question, with the
+  (user_id, due_at) index the due-reviews endpoint reads.
+- review_digests: per-user daily review counts, written by the daily job.
+"""
+from sqlalchemy import create_engine
+from app.config import settings
+from app.database import Base
+from app.models.review import QuestionReview, ReviewDigest
+
+engine = create_engine(settings.DATABASE_URL)
+
+
+def add_tables():
+    try:
+        Base.metadata.create_all(bind=engine, tables=[QuestionReview.__table__, ReviewDigest.__table__])
+        print("Created question_reviews and review_digests tables")
+    except Exception as e:
+        print(f"Could not create review tables: {e}")
+
+
+if __name__ == "__main__":
+    add_tables()
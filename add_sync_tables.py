@@ -0,0 +1,47 @@
+"""
+Schema for the offline /sync endpoint.
+
+- sync_receipts: idempotency store for replayed events.
+- uq_lesson_progress_user_lesson: one progress row per user and lesson, the
+  conflict target of the progress upsert. Duplicate rows are collapsed
+  first, keeping the most recently watched one.
+"""
+from sqlalchemy import create_engine, text
+from app.config import settings
+from app.database import Base
+from app.models.sync_receipt import SyncReceipt
+
+engine = create_engine(settings.DATABASE_URL)
+
+
+def add_tables():
+    try:
+        Base.metadata.create_all(bind=engine, tables=[SyncReceipt.__table__])
+        print("Created sync_receipts table")
+    except Exception as e:
+        print(f"Could not create sync_receipts: {e}")
+
+    with engine.begin() as conn:
+        try:
+            result = conn.execute(text("""
+                DELETE FROM lesson_progress WHERE id IN (
+                    SELECT id FROM (
+                        SELECT id, ROW_NUMBER() OVER (
+                            PARTITION BY user_id, lesson_id
+                            ORDER BY last_watched_at DESC NULLS LAST, id DESC
+                        ) AS position
+                        FROM lesson_progress
+                    ) ranked WHERE position > 1
+                )
+            """))
+            print(f"Removed {result.rowcount} duplicate lesson_progress rows")
+            conn.execute(text(
+                "CREATE UNIQUE INDEX IF NOT EXISTS uq_lesson_progress_user_lesson ON lesson_progress (user_id, lesson_id)"
+            ))
+            print("Added uq_lesson_progress_user_lesson")
+        except Exception as e:
+            print(f"Could not add uq_lesson_progress_user_lesson: {e}")
+
+
+if __name__ == "__main__":
+    add_tables()
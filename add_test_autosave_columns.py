@@ -0,0 +1,30 @@
+"""
+Answer autosave for in-progress test sessions.
+
+Adds the per-session answer blob (saved_answers), the last applied client
+revision and the time of the last autosave to user_test_sessions.
+"""
+from sqlalchemy import create_engine, text
+from app.config import settings
+
+engine = create_engine(settings.DATABASE_URL)
+
+COLUMNS = [
+    ("saved_answers", "JSON"),
+    ("autosave_revision", "INTEGER NOT NULL DEFAULT 0"),
+    ("answers_saved_at", "TIMESTAMP"),
+]
+
+
+def add_columns():
+    for name, definition in COLUMNS:
+        with engine.begin() as conn:
+            try:
+                conn.execute(text(f"ALTER TABLE user_test_sessions ADD COLUMN IF NOT EXISTS {name} {definition}"))
+                print(f"Added {name} column")
+            except Exception as e:
+                print(f"Could not add {name}: {e}")
+
+
+if __name__ == "__main__":
+    add_columns()
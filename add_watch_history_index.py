@@ -0,0 +1,36 @@
+"""
+Index for the "continue watching" feed (GET /lessons/user/history).
+
+(user_id, last_watched_at DESC, id DESC) keeps each user's progress rows in
+feed order, so every page is an index seek. Rows without last_watched_at are
+backfilled from created_at first; the feed skips rows where it is NULL.
+"""
+from sqlalchemy import create_engine, text
+from app.config import settings
+
+engine = create_engine(settings.DATABASE_URL)
+
+
+def add_indexes():
+    with engine.begin() as conn:
+        try:
+            result = conn.execute(text(
+                "UPDATE lesson_progress SET last_watched_at = COALESCE(created_at, NOW()) WHERE last_watched_at IS NULL"
+            ))
+            print(f"Backfilled last_watched_at on {result.rowcount} rows")
+        except Exception as e:
+            print(f"Could not backfill last_watched_at: {e}")
+
+    with engine.begin() as conn:
+        try:
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_lesson_progress_user_recent "
+                "ON lesson_progress (user_id, last_watched_at DESC, id DESC)"
+            ))
+            print("Added ix_lesson_progress_user_recent")
+        except Exception as e:
+            print(f"Could not add ix_lesson_progress_user_recent: {e}")
+
+
+if __name__ == "__main__":
+    add_indexes()
@@ -1,6 +1,6 @@
 from fastapi import APIRouter
-from app.api import auth, users, courses, enrollments, upload, kyc, subjects, questions, lessons, tests, bookmarks, stream
-from app.api.admin import courses as admin_courses, lessons as admin_lessons, qbank as admin_qbank, daily_mcq as admin_daily_mcq, tests as admin_tests, users as admin_users, course_subjects as admin_course_subjects
+from app.api import auth, users, courses, enrollments, upload, kyc, subjects, questions, lessons, tests, bookmarks, stream, sync
+from app.api.admin import courses as admin_courses, lessons as admin_lessons, qbank as admin_qbank, daily_mcq as admin_daily_mcq, tests as admin_tests, users as admin_users, course_subjects as admin_course_subjects, uploads as admin_uploads
 
 # Create main API router
 api_router = APIRouter()
@@ -18,6 +18,7 @@ api_router.include_router(lessons.router)
 api_router.include_router(tests.router)
 api_router.include_router(bookmarks.router)
 api_router.include_router(stream.router)
+api_router.include_router(sync.router)
 
 # Admin routes
 api_router.include_router(admin_courses.router)
@@ -27,6 +28,7 @@ api_router.include_router(admin_daily_mcq.router)
 api_router.include_router(admin_tests.router)
 api_router.include_router(admin_users.router)
 api_router.include_router(admin_course_subjects.router)
+api_router.include_router(admin_uploads.router)
 
 # Export router
 __all__ = ["api_router"]
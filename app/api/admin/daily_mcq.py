@@ -5,9 +5,8 @@ from app.models.user import User
 from app.models.question import Question
 from app.models.daily_mcq import DailyMCQ
 from app.dependencies import get_admin_user
+from app.services.daily_mcq_service import DailyMCQService
 from datetime import datetime, timedelta, date
-from typing import List
-import random
 
 router = APIRouter(prefix="/admin/daily-mcq", tags=["Admin - Daily MCQ"])
 
@@ -21,7 +20,8 @@ def schedule_upcoming_daily_mcqs(
 ):
     """
     Schedule daily MCQs for the upcoming days (Admin only).
-    Automatically selects random questions from the question bank.
+    Automatically selects random questions of the course that have never
+    been a daily MCQ for it, sampled in SQL (the bank is never loaded).
     """
     if not course_id:
         raise HTTPException(
@@ -32,58 +32,10 @@ def schedule_upcoming_daily_mcqs(
     if days < 1 or days > 365:
         raise HTTPException(status_code=400, detail="Days must be between 1 and 365")
     
-    # Get all available questions
-    all_questions = db.query(Question).all()
-    
-    if not all_questions:
-        raise HTTPException(status_code=404, detail="No questions available in the question bank")
-    
-    if len(all_questions) < days:
-        raise HTTPException(
-            status_code=400, 
-            detail=f"Not enough questions. Need {days} questions but only {len(all_questions)} available"
-        )
-    
-    # Get already scheduled dates for this course
-    existing_mcqs = db.query(DailyMCQ).filter(
-        DailyMCQ.date >= date.today(),
-        DailyMCQ.course_id == course_id
-    ).all()
-    existing_dates = {mcq.date for mcq in existing_mcqs}
-    used_question_ids = {mcq.question_id for mcq in existing_mcqs}
-    
-    # Filter out already used questions
-    available_questions = [q for q in all_questions if q.id not in used_question_ids]
-    
-    # Shuffle questions for random selection
-    random.shuffle(available_questions)
-    
-    scheduled_count = 0
     today = date.today()
-    
-    for day_offset in range(days):
-        target_date = today + timedelta(days=day_offset)
-        
-        # Skip if already scheduled
-        if target_date in existing_dates:
-            continue
-        
-        # Check if we have questions left
-        if scheduled_count >= len(available_questions):
-            break
-        
-        # Create daily MCQ entry
-        new_daily_mcq = DailyMCQ(
-            question_id=available_questions[scheduled_count].id,
-            course_id=course_id,
-            date=target_date,
-            created_at=datetime.utcnow()
-        )
-        
-        db.add(new_daily_mcq)
-        scheduled_count += 1
-    
+    created = DailyMCQService.schedule_upcoming(db, course_id, days, start=today)
     db.commit()
+    scheduled_count = len(created)
     
     return {
         "message": f"Successfully scheduled {scheduled_count} daily MCQs for course {course_id}",
@@ -91,7 +43,7 @@ def schedule_upcoming_daily_mcqs(
         "course_id": course_id,
         "days_requested": days,
         "start_date": today.isoformat(),
-        "end_date": (today + timedelta(days=scheduled_count - 1)).isoformat() if scheduled_count > 0 else today.isoformat()
+        "end_date": created[-1].date.isoformat() if created else today.isoformat()
     }
 
 
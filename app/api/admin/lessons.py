@@ -1,19 +1,29 @@
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.config import settings
 from app.database import get_db
 from app.models.user import User
 from app.models.course import Lesson
 from app.schemas.course import LessonCreate, LessonUpdate, LessonResponse
 from app.dependencies import get_admin_user
+from app.services.content_store import ContentStore
+from app.services.job_queue import JobQueue
+from app.utils.uploads import require_extension, iter_upload_file
 from datetime import datetime
-import shutil
-import os
-from pathlib import Path
 
 router = APIRouter(prefix="/admin/lessons", tags=["Admin - Lessons"])
 
 
+def enqueue_lesson_previews(db: Session, lesson_id: int):
+    """Queue poster/scrub-preview generation; repeated uploads coalesce into one job per lesson."""
+    return JobQueue.enqueue(
+        db, "lessons.generate_previews", {"lesson_id": lesson_id},
+        idempotency_key=f"lesson-previews:{lesson_id}", requeue=True
+    )
+
+
 @router.post("/", response_model=LessonResponse, status_code=status.HTTP_201_CREATED)
 def create_lesson(
     lesson_data: LessonCreate,
@@ -53,6 +63,7 @@ async def upload_lesson_video(
 ):
     """
     Upload video for a lesson (Admin only).
+    Poster frame and scrub previews are generated in the background.
     """
     lesson = db.query(Lesson).filter(Lesson.id == lesson_id).first()
     
@@ -60,30 +71,45 @@ async def upload_lesson_video(
         raise HTTPException(status_code=404, detail="Lesson not found")
     
     # Validate file type
-    if not video.content_type.startswith('video/'):
+    if not video.content_type or not video.content_type.startswith('video/'):
         raise HTTPException(status_code=400, detail="File must be a video")
+    file_extension = require_extension(video.filename, settings.video_extensions)
     
-    # Create upload directory if it doesn't exist
-    upload_dir = Path("static")
-    upload_dir.mkdir(exist_ok=True)
-    
-    # Generate unique filename
-    file_extension = os.path.splitext(video.filename)[1]
-    filename = f"{lesson_id}_{datetime.utcnow().timestamp()}{file_extension}"
-    file_path = upload_dir / filename
-    
-    # Save file
-    with file_path.open("wb") as buffer:
-        shutil.copyfileobj(video.file, buffer)
+    # Stream to disk off the event loop (size-limited, fsynced, atomically renamed)
+    # into content-addressed storage, so re-uploads of the same recording are deduplicated
+    stored = await ContentStore.store_stream(iter_upload_file(video), file_extension, settings.MAX_VIDEO_UPLOAD_SIZE)
     
     # Update lesson with video URL
-    lesson.video_url = f"/static/{filename}"
+    lesson.video_url = stored.url
     lesson.updated_at = datetime.utcnow()
     
     db.commit()
     db.refresh(lesson)
     
-    return {"message": "Video uploaded successfully", "video_url": lesson.video_url}
+    job = await run_in_threadpool(enqueue_lesson_previews, db, lesson.id)
+    
+    return {"message": "Video uploaded successfully", "video_url": lesson.video_url, "preview_job_id": job.id}
+
+
+@router.post("/{lesson_id}/previews", status_code=status.HTTP_202_ACCEPTED)
+def regenerate_lesson_previews(
+    lesson_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_admin_user)
+):
+    """
+    (Re)generate poster frame and scrub-preview sprites for a lesson (Admin only).
+    """
+    lesson = db.query(Lesson).filter(Lesson.id == lesson_id).first()
+    
+    if not lesson:
+        raise HTTPException(status_code=404, detail="Lesson not found")
+    if not lesson.video_url:
+        raise HTTPException(status_code=400, detail="Lesson has no video")
+    
+    job = enqueue_lesson_previews(db, lesson.id)
+    
+    return {"message": "Preview generation scheduled", "lesson_id": lesson.id, "job_id": job.id}
 
 
 @router.put("/{lesson_id}", response_model=LessonResponse)
@@ -1,44 +1,74 @@
-from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models.user import User
 from app.models.subject import Subject
 from app.models.module import Module
 from app.models.question import Question
+from app.models.test import Test
 from app.dependencies import get_admin_user
+from app.services.question_dedup import QuestionDedupIndex
+from app.services.question_export import QuestionExporter
+from app.utils.pagination import CursorError, DEFAULT_PAGE_SIZE, contains_pattern, paginate_keyset
+from app.services.question_import import ImportFormatError, QuestionImporter, iter_question_records
+from starlette.concurrency import run_in_threadpool
 from datetime import datetime
-import json
-import csv
-from io import StringIO
 
 router = APIRouter(prefix="/admin/qbank", tags=["Admin - QBank"])
 
 
 # ============= SUBJECTS =============
 
-@router.get("/subjects", response_model=List[dict])
+@router.get("/subjects")
 def get_subjects(
     course_id: int = None,
+    search: str = None,
+    cursor: str = None,
+    limit: int = DEFAULT_PAGE_SIZE,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_admin_user)
 ):
-    """Get all subjects (Admin only), optionally filtered by course."""
+    """Get subjects (Admin only), optionally filtered by course or name. Keyset-paginated on (order, id)."""
     query = db.query(Subject)
     
     if course_id:
         query = query.filter(Subject.course_id == course_id)
-        
-    subjects = query.order_by(Subject.order).all()
+    if search:
+        query = query.filter(Subject.name.ilike(contains_pattern(search), escape="\\"))
     
-    return [{
+    sort_order = func.coalesce(Subject.order, 0)
+    try:
+        page = paginate_keyset(
+            query, [(sort_order, False), (Subject.id, False)], cursor, limit,
+            key_values=lambda sub: [sub.order or 0, sub.id]
+        )
+    except CursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # Counts for the page only, in two grouped queries
+    subject_ids = [sub.id for sub in page.items]
+    modules_count = dict(
+        db.query(Module.subject_id, func.count(Module.id))
+        .filter(Module.subject_id.in_(subject_ids))
+        .group_by(Module.subject_id)
+    )
+    questions_count = dict(
+        db.query(Module.subject_id, func.count(Question.id))
+        .join(Question, Question.module_id == Module.id)
+        .filter(Module.subject_id.in_(subject_ids))
+        .group_by(Module.subject_id)
+    )
+    
+    return page.to_dict(lambda sub: {
         "id": sub.id,
         "name": sub.name,
         "description": sub.description,
         "course_id": sub.course_id,
-        "modules_count": len(sub.modules),
-        "questions_count": sum(len(m.questions) for m in sub.modules)
-    } for sub in subjects]
+        "modules_count": modules_count.get(sub.id, 0),
+        "questions_count": questions_count.get(sub.id, 0)
+    })
 
 
 @router.post("/subjects", response_model=dict, status_code=status.HTTP_201_CREATED)
@@ -124,6 +154,49 @@ def delete_subject(
 
 # ============= MODULES =============
 
+@router.get("/modules")
+def get_modules(
+    subject_id: int = None,
+    search: str = None,
+    cursor: str = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_admin_user)
+):
+    """Get modules (Admin only), optionally filtered by subject or name. Keyset-paginated on (order, id)."""
+    query = db.query(Module)
+    
+    if subject_id:
+        query = query.filter(Module.subject_id == subject_id)
+    if search:
+        query = query.filter(Module.name.ilike(contains_pattern(search), escape="\\"))
+    
+    sort_order = func.coalesce(Module.order, 0)
+    try:
+        page = paginate_keyset(
+            query, [(sort_order, False), (Module.id, False)], cursor, limit,
+            key_values=lambda module: [module.order or 0, module.id]
+        )
+    except CursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    module_ids = [module.id for module in page.items]
+    questions_count = dict(
+        db.query(Question.module_id, func.count(Question.id))
+        .filter(Question.module_id.in_(module_ids))
+        .group_by(Question.module_id)
+    )
+    
+    return page.to_dict(lambda module: {
+        "id": module.id,
+        "subject_id": module.subject_id,
+        "name": module.name,
+        "description": module.description,
+        "order": module.order,
+        "questions_count": questions_count.get(module.id, 0)
+    })
+
+
 @router.post("/modules", response_model=dict, status_code=status.HTTP_201_CREATED)
 def create_module(
     module_data: dict,
@@ -204,6 +277,46 @@ def delete_module(
 
 # ============= QUESTIONS =============
 
+@router.get("/questions")
+def get_questions(
+    module_id: int = None,
+    subject_id: int = None,
+    search: str = None,
+    cursor: str = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_admin_user)
+):
+    """Get questions (Admin only), filtered by module, subject or text. Keyset-paginated on id, newest first."""
+    query = db.query(Question)
+    
+    if module_id:
+        query = query.filter(Question.module_id == module_id)
+    if subject_id:
+        query = query.join(Module, Module.id == Question.module_id).filter(Module.subject_id == subject_id)
+    if search:
+        query = query.filter(Question.question_text.ilike(contains_pattern(search), escape="\\"))
+    
+    try:
+        page = paginate_keyset(query, [(Question.id, True)], cursor, limit)
+    except CursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return page.to_dict(lambda q: {
+        "id": q.id,
+        "module_id": q.module_id,
+        "question_text": q.question_text,
+        "option_a": q.option_a,
+        "option_b": q.option_b,
+        "option_c": q.option_c,
+        "option_d": q.option_d,
+        "correct_answer": q.correct_answer,
+        "explanation": q.explanation,
+        "difficulty": q.difficulty,
+        "created_at": q.created_at.isoformat() if q.created_at else None
+    })
+
+
 @router.post("/questions", status_code=status.HTTP_201_CREATED)
 def create_question(
     question_data: dict,
@@ -229,6 +342,8 @@ def create_question(
     )
     
     db.add(new_question)
+    db.flush()
+    QuestionDedupIndex.index_question(db, new_question)
     db.commit()
     db.refresh(new_question)
     
@@ -270,6 +385,7 @@ def update_question(
     if 'difficulty' in question_data:
         question.difficulty = question_data['difficulty']
     
+    QuestionDedupIndex.index_question(db, question)
     db.commit()
     db.refresh(question)
     
@@ -300,81 +416,84 @@ def delete_question(
 async def bulk_upload_questions(
     file: UploadFile = File(...),
     module_id: int = None,
+    atomic: bool = False,
+    skip_duplicates: bool = True,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_admin_user)
 ):
     """
-    Bulk upload questions from CSV or JSON file (Admin only).
+    Bulk upload questions from CSV, JSON or JSON Lines file (Admin only).
     
-    CSV Format: question_text,option_a,option_b,option_c,option_d,correct_answer,explanation,difficulty
-    JSON Format: [{"question_text": "...", "option_a": "...", ...}]
-    """
-    content = await file.read()
+    CSV Format: question_text,option_a,option_b,option_c,option_d,correct_answer,explanation,difficulty[,module_id]
+    JSON Format: [{"question_text": "...", "option_a": "...", ...}] or one object per line (.jsonl)
     
-    questions_created = 0
-    errors = []
+    The file is parsed incrementally and inserted in batches (COPY on PostgreSQL).
+    Invalid rows are skipped and reported; with `atomic=true` any invalid row
+    aborts the whole import.
     
+    Exact duplicates of existing questions or earlier rows are skipped
+    (`skip_duplicates=false` to keep them); near duplicates are imported and
+    reported under `near_duplicates`.
+    """
     try:
-        if file.filename.endswith('.json'):
-            # Parse JSON
-            data = json.loads(content.decode('utf-8'))
-            
-            for idx, item in enumerate(data):
-                try:
-                    question = Question(
-                        question_text=item['question_text'],
-                        option_a=item['option_a'],
-                        option_b=item['option_b'],
-                        option_c=item['option_c'],
-                        option_d=item['option_d'],
-                        correct_answer=item['correct_answer'],
-                        explanation=item.get('explanation'),
-                        module_id=item.get('module_id', module_id),
-                        difficulty=item.get('difficulty', 'medium'),
-                        created_at=datetime.utcnow()
-                    )
-                    db.add(question)
-                    questions_created += 1
-                except Exception as e:
-                    errors.append(f"Row {idx + 1}: {str(e)}")
-        
-        elif file.filename.endswith('.csv'):
-            # Parse CSV
-            csv_content = StringIO(content.decode('utf-8'))
-            reader = csv.DictReader(csv_content)
-            
-            for idx, row in enumerate(reader):
-                try:
-                    question = Question(
-                        question_text=row['question_text'],
-                        option_a=row['option_a'],
-                        option_b=row['option_b'],
-                        option_c=row['option_c'],
-                        option_d=row['option_d'],
-                        correct_answer=row['correct_answer'],
-                        explanation=row.get('explanation'),
-                        module_id=row.get('module_id', module_id),
-                        difficulty=row.get('difficulty', 'medium'),
-                        created_at=datetime.utcnow()
-                    )
-                    db.add(question)
-                    questions_created += 1
-                except Exception as e:
-                    errors.append(f"Row {idx + 2}: {str(e)}")  # +2 because of header
-        
-        else:
-            raise HTTPException(status_code=400, detail="File must be .csv or .json")
-        
-        db.commit()
-        
-        return {
-            "message": f"Successfully uploaded {questions_created} questions",
-            "questions_created": questions_created,
-            "errors": errors if errors else None
-        }
-    
-    except json.JSONDecodeError:
-        raise HTTPException(status_code=400, detail="Invalid JSON format")
+        records = iter_question_records(file.file, file.filename)
+        importer = QuestionImporter(db, default_module_id=module_id, atomic=atomic, skip_duplicates=skip_duplicates)
+        # Parsing and inserting is blocking work; keep it off the event loop
+        await run_in_threadpool(importer.run, records)
+    except ImportFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Error processing file: {str(e)}")
+    
+    if importer.atomic and importer.error_count:
+        message = f"Import aborted: {importer.error_count} invalid rows, nothing was saved"
+    else:
+        message = f"Successfully uploaded {importer.created} questions"
+    
+    return {"message": message, **importer.summary()}
+
+
+# ============= EXPORT =============
+
+@router.get("/questions/export")
+def export_questions(
+    format: str = "csv",
+    course_id: int = None,
+    subject_id: int = None,
+    module_id: int = None,
+    test_id: int = None,
+    gzip: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_admin_user)
+):
+    """
+    Export questions as CSV or JSON Lines (Admin only).
+    
+    Filter by course, subject, module or test (filters combine). The CSV uses
+    the bulk upload headers, so an export can be uploaded again.
+    
+    The file is streamed from a server-side cursor in chunks, optionally
+    gzip-compressed (`gzip=true`), so memory use stays flat however many
+    questions are exported.
+    """
+    if test_id and not db.query(Test.id).filter(Test.id == test_id).first():
+        raise HTTPException(status_code=404, detail="Test not found")
+    
+    try:
+        exporter = QuestionExporter(
+            format,
+            course_id=course_id,
+            subject_id=subject_id,
+            module_id=module_id,
+            test_id=test_id,
+            compress=gzip
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return StreamingResponse(
+        exporter.iter_bytes(),
+        media_type=exporter.media_type,
+        headers={"Content-Disposition": f'attachment; filename="{exporter.filename}"'}
+    )
@@ -1,14 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from sqlalchemy import func, insert
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from typing import List, Optional
 from datetime import datetime
-import csv
-import io
 from app.database import get_db
 from app.models.user import User
 from app.models.test import Test, TestQuestion, TestType, TestStatus
 from app.models.question import Question
 from app.dependencies import get_current_user
+from app.services.question_dedup import QuestionDedupIndex
+from app.services.question_import import ImportFormatError, QuestionImporter, iter_csv_records
+from app.utils.pagination import CursorError, DEFAULT_PAGE_SIZE, contains_pattern, paginate_keyset
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/admin/tests", tags=["Admin Tests"])
@@ -53,10 +56,19 @@ def get_all_tests(
     test_type: Optional[str] = None,
     status: Optional[str] = None,
     course_id: Optional[int] = None,
+    search: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get all tests for admin management."""
+    """
+    Get tests for admin management, newest first.
+    
+    Keyset-paginated on (created_at, id): pass `next_cursor` from the
+    response as `cursor` to get the next page. `search` matches the title
+    (case-insensitive). `total` is exact up to 10k matches, estimated beyond.
+    """
     verify_admin(current_user)
     
     query = db.query(Test)
@@ -67,10 +79,15 @@ def get_all_tests(
         query = query.filter(Test.status == status)
     if course_id:
         query = query.filter(Test.course_id == course_id)
+    if search:
+        query = query.filter(Test.title.ilike(contains_pattern(search), escape="\\"))
     
-    tests = query.order_by(Test.created_at.desc()).all()
+    try:
+        page = paginate_keyset(query, [(Test.created_at, True), (Test.id, True)], cursor, limit)
+    except CursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    return [{
+    return page.to_dict(lambda test: {
         "id": test.id,
         "title": test.title,
         "description": test.description,
@@ -84,7 +101,7 @@ def get_all_tests(
         "end_date": test.end_date.isoformat() if test.end_date else None,
         "status": test.status,
         "created_at": test.created_at.isoformat()
-    } for test in tests]
+    })
 
 
 @router.post("/")
@@ -231,6 +248,7 @@ def add_question_to_test(
     
     db.add(new_question)
     db.flush()
+    QuestionDedupIndex.index_question(db, new_question)
     
     # Get next order number
     max_order = db.query(TestQuestion).filter(
@@ -257,10 +275,25 @@ def add_question_to_test(
 async def upload_questions_csv(
     test_id: int,
     file: UploadFile = File(...),
+    module_id: Optional[int] = None,
+    atomic: bool = False,
+    skip_duplicates: bool = True,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Upload questions from CSV file."""
+    """
+    Upload questions from CSV file.
+    
+    Questions are inserted in bulk with INSERT ... RETURNING id, then linked to
+    the test with one bulk insert of TestQuestion rows (in file order, after the
+    existing questions). Invalid rows are skipped and reported; with
+    `atomic=true` any invalid row aborts the whole upload. Every question
+    needs a module: a `module_id` column, or the `module_id` parameter for
+    rows that leave it empty.
+    
+    Rows that exactly duplicate a question bank entry are not inserted again;
+    the existing question is linked instead. Near duplicates are reported.
+    """
     verify_admin(current_user)
     
     test = db.query(Test).filter(Test.id == test_id).first()
@@ -270,63 +303,56 @@ async def upload_questions_csv(
     if not file.filename.endswith('.csv'):
         raise HTTPException(status_code=400, detail="File must be CSV format")
     
-    # Read CSV
-    contents = await file.read()
-    csv_data = contents.decode('utf-8')
-    csv_reader = csv.DictReader(io.StringIO(csv_data))
-    
-    # Validate headers
-    required_headers = ['question_text', 'option_a', 'option_b', 'option_c', 'option_d', 'correct_answer']
-    if not all(header in csv_reader.fieldnames for header in required_headers):
-        raise HTTPException(
-            status_code=400,
-            detail=f"CSV must contain headers: {', '.join(required_headers)}"
-        )
-    
-    # Get current max order
-    max_order = db.query(TestQuestion).filter(
+    # Continue numbering after the current last question
+    next_order = db.query(func.coalesce(func.max(TestQuestion.order), 0)).filter(
         TestQuestion.test_id == test_id
-    ).count()
-    
-    questions_added = 0
-    errors = []
-    
-    for i, row in enumerate(csv_reader, start=1):
-        try:
-            # Create question
-            new_question = Question(
-                question_text=row['question_text'],
-                option_a=row['option_a'],
-                option_b=row['option_b'],
-                option_c=row['option_c'],
-                option_d=row['option_d'],
-                correct_answer=row['correct_answer'].upper(),
-                explanation=row.get('explanation', ''),
-                difficulty=row.get('difficulty', 'medium')
-            )
-            
-            db.add(new_question)
-            db.flush()
-            
-            # Link to test
-            test_question = TestQuestion(
-                test_id=test_id,
-                question_id=new_question.id,
-                order=max_order + questions_added + 1
-            )
-            
-            db.add(test_question)
-            questions_added += 1
-            
-        except Exception as e:
-            errors.append(f"Row {i}: {str(e)}")
-    
-    db.commit()
+    ).scalar()
+    linked = {question_id for (question_id,) in db.query(TestQuestion.question_id).filter(TestQuestion.test_id == test_id)}
+    
+    def link_to_test(batch, question_ids):
+        nonlocal next_order
+        # Duplicates of bank questions come back with the existing id; link each question once
+        question_ids = [qid for qid in dict.fromkeys(question_ids) if qid not in linked]
+        linked.update(question_ids)
+        if not question_ids:
+            return
+        db.execute(insert(TestQuestion), [
+            {"test_id": test_id, "question_id": question_id, "order": next_order + position, "marks": 1}
+            for position, question_id in enumerate(question_ids, start=1)
+        ])
+        next_order += len(question_ids)
+    
+    importer = QuestionImporter(
+        db,
+        default_module_id=module_id,
+        atomic=atomic,
+        on_batch=link_to_test,
+        skip_duplicates=skip_duplicates,
+        reuse_duplicates=True
+    )
+    try:
+        await run_in_threadpool(importer.run, iter_csv_records(file.file))
+    except ImportFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error processing file: {str(e)}")
+    
+    summary = importer.summary()
+    if importer.atomic and importer.error_count:
+        message = f"Upload aborted: {importer.error_count} invalid rows, nothing was saved"
+    else:
+        message = f"Successfully added {importer.created} questions"
     
     return {
-        "questions_added": questions_added,
-        "errors": errors,
-        "message": f"Successfully added {questions_added} questions"
+        "questions_added": importer.created,
+        "errors": summary["errors"] or [],
+        "error_count": importer.error_count,
+        "rolled_back": summary["rolled_back"],
+        "duplicates_skipped": summary["duplicates_skipped"],
+        "duplicates": summary["duplicates"],
+        "near_duplicates": summary["near_duplicates"],
+        "message": message
     }
 
 
@@ -0,0 +1,129 @@
+from fastapi import APIRouter, Depends, Header, Request, Response, status
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional
+from app.config import settings
+from app.database import get_db
+from app.models.user import User
+from app.dependencies import get_admin_user
+from app.services.upload_service import ResumableUploadService
+from app.api.admin.lessons import enqueue_lesson_previews
+
+router = APIRouter(prefix="/admin/uploads", tags=["Admin - Uploads"])
+
+
+class ResumableUploadCreate(BaseModel):
+    lesson_id: int
+    filename: str
+    upload_length: int  # Total file size in bytes
+
+
+class ResumableUploadResponse(BaseModel):
+    upload_id: str
+    lesson_id: int
+    upload_offset: int
+    upload_length: int
+    expires_at: datetime
+    completed: bool = False
+    video_url: Optional[str] = None
+
+
+def _offset_headers(response: Response, upload_offset: int, upload_length: int) -> None:
+    response.headers["Upload-Offset"] = str(upload_offset)
+    response.headers["Upload-Length"] = str(upload_length)
+    response.headers["Cache-Control"] = "no-store"
+
+
+@router.post("/", response_model=ResumableUploadResponse, status_code=status.HTTP_201_CREATED)
+def create_upload(
+    upload_data: ResumableUploadCreate,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_admin_user)
+):
+    """
+    Start a resumable lesson video upload (Admin only).
+
+    Protocol (tus-style):
+    1. POST here with the total size; the Location header points at the upload.
+    2. PATCH the upload with consecutive chunks, sending `Upload-Offset`.
+    3. After a dropped connection, HEAD the upload to get the offset to resume from.
+    The lesson's video_url is set when the last byte arrives.
+    """
+    upload = ResumableUploadService.create_upload(
+        db, upload_data.lesson_id, upload_data.filename, upload_data.upload_length, current_user.id
+    )
+    response.headers["Location"] = f"/api/{settings.API_VERSION}{router.prefix}/{upload.id}"
+    _offset_headers(response, upload.upload_offset, upload.upload_length)
+
+    return ResumableUploadResponse(
+        upload_id=upload.id,
+        lesson_id=upload.lesson_id,
+        upload_offset=upload.upload_offset,
+        upload_length=upload.upload_length,
+        expires_at=upload.expires_at
+    )
+
+
+@router.head("/{upload_id}")
+def get_upload_status(
+    upload_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_admin_user)
+):
+    """
+    Get the current offset of a resumable upload (Admin only).
+    """
+    upload = ResumableUploadService.get_upload(db, upload_id)
+    response = Response(status_code=status.HTTP_200_OK)
+    _offset_headers(response, upload.upload_offset, upload.upload_length)
+    return response
+
+
+@router.patch("/{upload_id}", response_model=ResumableUploadResponse)
+async def upload_chunk(
+    upload_id: str,
+    request: Request,
+    response: Response,
+    upload_offset: int = Header(..., alias="Upload-Offset"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_admin_user)
+):
+    """
+    Append a chunk to a resumable upload (Admin only).
+
+    The raw request body is streamed straight to disk (no multipart parsing).
+    `Upload-Offset` must equal the server's current offset.
+    """
+    upload = await ResumableUploadService.append_chunk(db, upload_id, upload_offset, request.stream())
+    result = ResumableUploadResponse(
+        upload_id=upload.id,
+        lesson_id=upload.lesson_id,
+        upload_offset=upload.upload_offset,
+        upload_length=upload.upload_length,
+        expires_at=upload.expires_at
+    )
+
+    if upload.upload_offset == upload.upload_length:
+        lesson = await ResumableUploadService.finalize_upload(db, upload)
+        await run_in_threadpool(enqueue_lesson_previews, db, lesson.id)
+        result.completed = True
+        result.video_url = lesson.video_url
+
+    _offset_headers(response, result.upload_offset, result.upload_length)
+    return result
+
+
+@router.delete("/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+def cancel_upload(
+    upload_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_admin_user)
+):
+    """
+    Cancel a resumable upload and discard received chunks (Admin only).
+    """
+    ResumableUploadService.cancel_upload(db, upload_id)
+    return None
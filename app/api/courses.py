@@ -1,14 +1,16 @@
 from typing import List
-from fastapi import APIRouter, Depends, status, HTTPException
+from fastapi import APIRouter, Depends, status, HTTPException, Response
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models.user import User
 from app.schemas.course import (
-    CourseCreate, CourseUpdate, CourseResponse,
+    CourseCreate, CourseUpdate, CourseResponse, CourseSummaryResponse,
     LessonCreate, LessonUpdate, LessonResponse
 )
 from app.services.course_service import CourseService
-from app.dependencies import get_current_user, get_optional_current_user
+from app.services.course_snapshot import course_snapshots
+from app.dependencies import get_current_user, get_optional_current_user, get_course_access
+from app.utils.security import sign_video_url
 
 router = APIRouter(prefix="/courses", tags=["Courses"])
 
@@ -25,7 +27,7 @@ def create_course(
     return CourseService.create_course(db, course_data, current_user.id)
 
 
-@router.get("/", response_model=List[CourseResponse])
+@router.get("/", response_model=List[CourseSummaryResponse])
 def get_courses(
     skip: int = 0,
     limit: int = 100,
@@ -35,9 +37,12 @@ def get_courses(
     current_user: User = Depends(get_optional_current_user)
 ):
     """
-    Get all courses filtered by user's course.
+    Get the course catalog filtered by user's course.
     Students only see courses for their selected course.
     Admins can filter by any course_id.
+    
+    Returns summaries (lesson/subject counts and total duration); the lesson
+    tree is only served by GET /courses/{id}.
     """
     # Determine the filter ID
     filter_id = None
@@ -58,7 +63,7 @@ def get_courses(
         elif user_lang == "en":
             lang_filter = "English"
             
-    return CourseService.get_courses(
+    summaries = CourseService.get_course_summaries(
         db, 
         skip, 
         limit, 
@@ -66,80 +71,32 @@ def get_courses(
         course_id_filter=filter_id,
         language_filter=lang_filter
     )
+    # Intro videos under /static are only reachable through signed stream URLs
+    return [
+        dict(summary._mapping, video_intro_url=sign_video_url(summary.video_intro_url))
+        for summary in summaries
+    ]
 
 
 @router.get("/{course_id}", response_model=CourseResponse)
 def get_course(
     course_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_optional_current_user)
+    is_enrolled: bool = Depends(get_course_access)
 ):
     """
     Get course details with lesson locking logic.
-    - If enrolled: All lessons unlocked.
-    - If not enrolled: Only first 3 lessons of first subject are unlocked.
+    - If enrolled (and not expired): All lessons unlocked.
+    - If not enrolled: Only previews and the first 3 lessons of the first subject are unlocked.
+    
+    The lesson tree comes from a cached, pre-serialized snapshot of the
+    current course version; only the lock overlay is applied per request.
     """
-    course = CourseService.get_course(db, course_id)
-    if not course:
+    snapshot = course_snapshots.get(db, course_id)
+    if not snapshot:
         raise HTTPException(status_code=404, detail="Course not found")
 
-    # Check enrollment
-    is_enrolled = False
-    if current_user:
-        # We need to import Enrollment inside to avoid circular imports if any, 
-        # or better, do it at top level if safe. 
-        # Checking local import first or assuming imports are clean.
-        from app.models.enrollment import Enrollment
-        enrollment = db.query(Enrollment).filter(
-            Enrollment.user_id == current_user.id,
-            Enrollment.course_id == course_id
-        ).first()
-        if enrollment:
-            is_enrolled = True
-            
-    # Apply Lock Logic — single clean pass
-    # Store original URLs BEFORE any modification so preview/unlocked lessons keep their URLs
-    original_urls = {lesson.id: (lesson.video_url, lesson.content_url) for lesson in course.lessons}
-    original_locked = {lesson.id: lesson.is_locked for lesson in course.lessons}
-
-    # Determine which lesson IDs are free (first 3 of first subject) for non-enrolled users
-    unlocked_ids = set()
-    subjects = sorted(course.subjects, key=lambda s: s.order)
-    if subjects:
-        first_sub_lessons = sorted(subjects[0].lessons, key=lambda l: l.order)
-        for i, lesson in enumerate(first_sub_lessons):
-            if i < 3:
-                unlocked_ids.add(lesson.id)
-    else:
-        sorted_lessons = sorted(course.lessons, key=lambda l: l.order)
-        for i, lesson in enumerate(sorted_lessons):
-            if i < 3:
-                unlocked_ids.add(lesson.id)
-
-    for lesson in course.lessons:
-        db_is_locked = original_locked[lesson.id]  # use original DB value, not a modified one
-
-        if is_enrolled:
-            should_be_locked = False
-        elif lesson.is_preview:
-            # Admin marked as free preview — always unlocked for everyone
-            should_be_locked = False
-        elif db_is_locked:
-            should_be_locked = True
-        elif lesson.id in unlocked_ids:
-            should_be_locked = False
-        else:
-            should_be_locked = True
-
-        lesson.is_locked = should_be_locked
-        if should_be_locked:
-            lesson.video_url = None
-            lesson.content_url = None
-        else:
-            # Restore original URLs (important for is_preview and free-tier lessons)
-            lesson.video_url, lesson.content_url = original_urls[lesson.id]
-                 
-    return course
+    return Response(content=snapshot.render(is_enrolled), media_type="application/json")
 
 
 @router.put("/{course_id}", response_model=CourseResponse)
@@ -1,3 +1,4 @@
+from typing import Optional, Union
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from sqlalchemy import func
@@ -7,68 +8,72 @@ from app.models.lesson_progress import LessonProgress
 from app.models.enrollment import Enrollment
 from app.models.user import User
 from app.dependencies import get_current_user
-from app.schemas.course import LessonHistoryResponse
+from app.schemas.course import (
+    LessonResponse, LessonHistoryResponse, LessonHistoryCompactResponse, LessonHistoryPage, LessonHistoryCompactPage
+)
+from app.services.course_snapshot import course_snapshots
+from app.services.entitlements import entitlements
+from app.services.job_queue import JobQueue, job_handler
+from app.services.watch_history import WatchHistoryService
+from app.utils.pagination import CursorError
+from app.utils.security import sign_video_url
 from pydantic import BaseModel
 from datetime import datetime
 
 router = APIRouter(prefix="/lessons", tags=["Lessons"])
 
 
-@router.get("/user/history", response_model=list[LessonHistoryResponse])
+@router.get("/user/history", response_model=Union[LessonHistoryPage, LessonHistoryCompactPage])
 def get_user_history(
     completed: bool = None,
     limit: int = 10,
+    cursor: Optional[str] = None,
+    compact: bool = False,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
-    Get user's watch history.
-    - list of lessons with progress details.
+    Get user's watch history ("continue watching"), most recently watched first.
     - filter by completed (optional).
-    - sort by last_watched_at desc.
+    - cursor pagination: pass `next_cursor` back as `cursor` for the next page.
+    - compact=true returns only what a resume card needs (no URLs or descriptions).
+    
+    Lessons are locked as in the course details: unlocked with an active
+    enrollment or when free (see course_snapshot); locked lessons have no
+    video or content URL, unlocked ones a signed stream URL.
     """
-    query = db.query(Lesson, LessonProgress).join(
-        LessonProgress, Lesson.id == LessonProgress.lesson_id
-    ).filter(
-        LessonProgress.user_id == current_user.id
-    )
-
-    if completed is not None:
-        query = query.filter(LessonProgress.completed == completed)
-
-    # Sort by last watched
-    results = query.order_by(LessonProgress.last_watched_at.desc()).limit(limit).all()
-
-    history = []
-    for lesson, progress in results:
-        # Create a response object combining lesson and progress
-        # We use the LessonHistoryResponse schema which inherits from LessonResponse
-        
-        # Manually construct to ensure all fields are mapped correctly
-        item = LessonHistoryResponse(
-            # Lesson fields
-            id=lesson.id,
-            course_id=lesson.course_id,
-            subject_id=lesson.subject_id,
-            title=lesson.title,
-            description=lesson.description,
-            content_url=lesson.content_url,
-            video_url=lesson.video_url,
-            duration=lesson.duration,
-            order=lesson.order,
-            is_preview=lesson.is_preview,
-            created_at=lesson.created_at,
-            updated_at=lesson.updated_at,
-            
-            # Progress fields
+    try:
+        page = WatchHistoryService.get_history(db, current_user.id, completed, cursor, limit, compact)
+    except CursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if compact:
+        items = [LessonHistoryCompactResponse.model_validate(row) for row in page.items]
+        return LessonHistoryCompactPage(items=items, next_cursor=page.next_cursor, has_more=page.next_cursor is not None)
+
+    access = {}
+    free_lesson_ids = set()
+    for course_id in {lesson.course_id for lesson, _ in page.items}:
+        access[course_id] = entitlements.has_course(db, current_user.id, course_id)
+        snapshot = None if access[course_id] else course_snapshots.get(db, course_id)
+        if snapshot:
+            free_lesson_ids.update(snapshot.free_lesson_ids)
+    items = []
+    for lesson, progress in page.items:
+        data = LessonResponse.model_validate(lesson).model_dump()
+        unlocked = access[lesson.course_id] or lesson.id in free_lesson_ids
+        data["is_locked"] = not unlocked
+        data["video_url"] = sign_video_url(lesson.video_url) if unlocked else None
+        if not unlocked:
+            data["content_url"] = None
+        items.append(LessonHistoryResponse(
+            **data,
             progress_completed=progress.completed,
             progress_watch_time=progress.watch_time,
             progress_last_position=progress.last_position,
             last_watched_at=progress.last_watched_at
-        )
-        history.append(item)
-
-    return history
+        ))
+    return LessonHistoryPage(items=items, next_cursor=page.next_cursor, has_more=page.next_cursor is not None)
 
 
 class UpdateProgressRequest(BaseModel):
@@ -132,8 +137,14 @@ def update_lesson_progress(
     
     db.commit()
     
-    # Recalculate course progress
-    update_course_progress(current_user.id, lesson.course_id, db)
+    # Recalculate course progress in the background; progress pings in quick
+    # succession coalesce into a single recalculation
+    JobQueue.enqueue(
+        db, "lessons.update_course_progress",
+        {"user_id": current_user.id, "course_id": lesson.course_id},
+        idempotency_key=f"course-progress:{current_user.id}:{lesson.course_id}",
+        requeue=True
+    )
     
     return {
         "success": True,
@@ -225,3 +236,9 @@ def update_course_progress(user_id: int, course_id: int, db: Session):
     if enrollment:
         enrollment.progress = progress_percentage
         db.commit()
+
+
+@job_handler("lessons.update_course_progress")
+def update_course_progress_job(db: Session, user_id: int, course_id: int):
+    """Job entry point for update_course_progress."""
+    update_course_progress(user_id, course_id, db)
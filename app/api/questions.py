@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from typing import List
@@ -9,7 +9,11 @@ from app.models.user_test_attempt import UserTestAttempt
 from app.models.user import User
 from app.models.daily_mcq import DailyMCQ
 from app.dependencies import get_current_user, get_optional_current_user
-from pydantic import BaseModel
+from app.services.attempt_service import Answer, AttemptService
+from app.services.practice_service import PracticeService
+from app.services.review_service import ReviewService
+from app.config import settings
+from pydantic import BaseModel, Field
 from datetime import date, datetime
 
 router = APIRouter()
@@ -59,6 +63,54 @@ class SubmitAnswerResponse(BaseModel):
     selected_answer: str
 
 
+class BatchAnswer(BaseModel):
+    question_id: int
+    selected_answer: str  # 'A', 'B', 'C', or 'D'
+    time_taken: int | None = None  # seconds
+
+
+class BatchSubmitRequest(BaseModel):
+    module_id: int | None = None  # If set, every question must belong to this module
+    answers: List[BatchAnswer] = Field(..., min_length=1, max_length=200)
+
+
+class BatchAnswerResult(SubmitAnswerResponse):
+    question_id: int
+
+
+class BatchSubmitResponse(BaseModel):
+    results: List[BatchAnswerResult]
+    total: int
+    correct: int
+
+
+class PracticeSetRequest(BaseModel):
+    subject_ids: List[int] = Field(default_factory=list, max_length=50)
+    module_ids: List[int] = Field(default_factory=list, max_length=200)
+    count: int = Field(20, ge=1, le=settings.PRACTICE_SET_MAX_QUESTIONS)
+
+
+class PracticeSetResponse(BaseModel):
+    questions: List[QuestionResponse]
+    unattempted: int  # Picked questions the user never attempted
+    incorrect: int  # Picked questions the user last answered wrong
+    correct: int  # Picked questions the user last answered right
+
+
+class DueReviewResponse(BaseModel):
+    question: QuestionResponse
+    due_at: datetime
+    interval_days: int
+    repetitions: int
+    lapses: int
+
+
+class DueReviewsResponse(BaseModel):
+    reviews: List[DueReviewResponse]
+    due_today: int | None  # From the daily digest; None before it has run today
+    next_due_at: datetime | None  # When the next review that is not yet due becomes due
+
+
 class UserProgressResponse(BaseModel):
     total_questions_attempted: int
     total_correct: int
@@ -88,6 +140,61 @@ def get_module_questions(module_id: int, db: Session = Depends(get_db)):
     ) for q in questions]
 
 
+@router.post("/practice-sets", response_model=PracticeSetResponse)
+def generate_practice_set(
+    request: PracticeSetRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Generate a practice set of `count` questions from the chosen subjects and modules.
+    
+    Questions the user has not attempted or last answered wrong are more
+    likely to be picked than ones already answered right.
+    """
+    questions, counts = PracticeService.generate(
+        db, current_user.id, request.count,
+        subject_ids=request.subject_ids, module_ids=request.module_ids
+    )
+    
+    return PracticeSetResponse(
+        questions=[QuestionResponse.model_validate(question) for question in questions],
+        **counts
+    )
+
+
+@router.get("/reviews/due", response_model=DueReviewsResponse)
+def get_due_reviews(
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Get the next batch of questions due for review, most overdue first.
+    
+    Questions enter the queue when answered wrong and are rescheduled
+    (spaced repetition) every time they are attempted again.
+    """
+    now = datetime.utcnow()
+    due = ReviewService.get_due(db, current_user.id, limit, now)
+    digest = ReviewService.get_digest(db, current_user.id, now.date())
+    
+    return DueReviewsResponse(
+        reviews=[
+            DueReviewResponse(
+                question=QuestionResponse.model_validate(question),
+                due_at=review.due_at,
+                interval_days=review.interval_days,
+                repetitions=review.repetitions,
+                lapses=review.lapses
+            )
+            for review, question in due
+        ],
+        due_today=digest.due_count if digest else None,
+        next_due_at=ReviewService.next_due_at(db, current_user.id, now)
+    )
+
+
 @router.post("/questions/{question_id}/attempt", response_model=SubmitAnswerResponse)
 def submit_answer(
     question_id: int,
@@ -96,34 +203,50 @@ def submit_answer(
     db: Session = Depends(get_db)
 ):
     """Submit an answer for a question"""
-    question = db.query(Question).filter(Question.id == question_id).first()
-    if not question:
-        raise HTTPException(status_code=404, detail="Question not found")
-    
-    # Use authenticated user
-    user_id = current_user.id
+    graded, = AttemptService.submit(
+        db, current_user.id, [Answer(question_id, request.selected_answer, request.time_taken)]
+    )
     
-    # Check if answer is correct
-    is_correct = request.selected_answer.upper() == question.correct_answer.upper()
+    return SubmitAnswerResponse(
+        is_correct=graded.is_correct,
+        correct_answer=graded.correct_answer,
+        explanation=graded.explanation,
+        selected_answer=graded.selected_answer
+    )
+
+
+@router.post("/questions/attempts", response_model=BatchSubmitResponse)
+def submit_answers(
+    request: BatchSubmitRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Submit a practice round's answers in one request.
     
-    # Save attempt
-    attempt = UserTestAttempt(
-        user_id=user_id,
-        question_id=question_id,
-        module_id=question.module_id,
-        selected_answer=request.selected_answer.upper(),
-        is_correct=is_correct,
-        time_taken=request.time_taken,
-        attempted_at=datetime.utcnow()
+    All answers are graded against one answer-key query and recorded with a
+    single insert. If any question does not exist (or is outside `module_id`),
+    nothing is recorded.
+    """
+    graded = AttemptService.submit(
+        db, current_user.id,
+        [Answer(answer.question_id, answer.selected_answer, answer.time_taken) for answer in request.answers],
+        module_id=request.module_id
     )
-    db.add(attempt)
-    db.commit()
     
-    return SubmitAnswerResponse(
-        is_correct=is_correct,
-        correct_answer=question.correct_answer,
-        explanation=question.explanation,
-        selected_answer=request.selected_answer.upper()
+    return BatchSubmitResponse(
+        results=[
+            BatchAnswerResult(
+                question_id=result.question_id,
+                is_correct=result.is_correct,
+                correct_answer=result.correct_answer,
+                explanation=result.explanation,
+                selected_answer=result.selected_answer
+            )
+            for result in graded
+        ],
+        total=len(graded),
+        correct=sum(result.is_correct for result in graded)
     )
 
 
@@ -1,36 +1,121 @@
 from fastapi import APIRouter, Header, HTTPException, Request, status
-from fastapi.responses import StreamingResponse
+from fastapi.responses import RedirectResponse, StreamingResponse
+from fastapi.staticfiles import StaticFiles
+from starlette.concurrency import run_in_threadpool
+from starlette.exceptions import HTTPException as StarletteHTTPException
+from typing import Optional
+from urllib.parse import parse_qs
 import os
-from pathlib import Path
 from app.config import settings
+from app.utils.security import verify_stream_signature
+from app.utils.bandwidth import stream_scheduler
+from app.services.content_store import CAS_PREFIX, ContentStore
+from app.services.image_service import ImageService
+from app.services.media_service import PREVIEW_PREFIX
+from app.services.storage import LocalStorage, get_storage
 
 router = APIRouter(prefix="/stream", tags=["Streaming"])
 
 CHUNK_SIZE = 1024 * 1024  # 1MB chunks
 
+
+# Static sub-directories whose file URLs are versioned and never change
+IMMUTABLE_STATIC_PREFIXES = ("previews/", "cas/")
+# Static sub-directories written through the storage backend
+STORED_STATIC_PREFIXES = (f"{PREVIEW_PREFIX}/", f"{CAS_PREFIX}/")
+
+
+class ProtectedStaticFiles(StaticFiles):
+    """
+    Static files mount that refuses to serve videos directly.
+    Videos must go through the signed /stream/video endpoint instead.
+    Versioned assets (e.g. lesson previews) are marked as cacheable forever.
+    Content-addressed files and previews kept in remote storage are redirected
+    to the store.
+    Uploaded images accept `?w=<width>` (and optionally `fm=webp|jpg`) to get a
+    resized variant; without `fm`, WebP is served to clients that accept it.
+    """
+
+    async def get_response(self, path: str, scope):
+        extension = os.path.splitext(path)[1].lstrip(".").lower()
+        if settings.STREAM_REQUIRE_SIGNED_URLS and extension in settings.video_extensions:
+            raise HTTPException(status_code=404, detail="Not Found")
+
+        negotiated = False
+        fallback = False  # A variant was asked for but the original is served
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        width = query.get("w", [""])[0]
+        if width.isdigit() and ImageService.is_original_key(path):
+            accept = dict(scope["headers"]).get(b"accept", b"").decode("latin-1")
+            # Falls back to the original until the variants have been generated
+            variant = await run_in_threadpool(
+                ImageService.select_variant, path, int(width), query.get("fm", [None])[0], accept
+            )
+            if variant:
+                path, negotiated = variant
+            else:
+                fallback = True
+
+        try:
+            response = await super().get_response(path, scope)
+        except StarletteHTTPException as e:
+            storage = get_storage()
+            if e.status_code != 404 or not path.startswith(STORED_STATIC_PREFIXES) or storage.local_path(path):
+                raise
+            if not await run_in_threadpool(storage.exists, path):
+                raise
+            return RedirectResponse(storage.download_url(path), status_code=status.HTTP_307_TEMPORARY_REDIRECT)
+        if fallback:
+            # Revalidate, so the variant replaces the original once it exists
+            response.headers["Cache-Control"] = "no-cache"
+        elif path.startswith(IMMUTABLE_STATIC_PREFIXES) and response.status_code == 200:
+            response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        if negotiated:
+            response.headers["Vary"] = "Accept"
+        return response
+
+
 @router.get("/video/{filename}")
-async def stream_video(filename: str, request: Request, range: str = Header(None)):
+async def stream_video(
+    filename: str,
+    request: Request,
+    range: str = Header(None),
+    expires: Optional[int] = None,
+    sig: Optional[str] = None
+):
     """
     Stream video file with support for Range requests (seeking).
     Now with efficient chunks and optimized generator.
+    
+    Requires a signed URL (issued by GET /courses/{id} for unlocked lessons).
+    Verification is a single HMAC check, so range requests never hit the DB.
     """
     safe_filename = os.path.basename(filename)
-    # Search in multiple locations
-    possible_paths = [
-        Path("static") / "videos" / safe_filename,
-        Path("static") / safe_filename,
+    
+    if settings.STREAM_REQUIRE_SIGNED_URLS and not verify_stream_signature(safe_filename, expires, sig):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid or expired stream URL")
+    
+    # Content-addressed uploads live in the configured storage backend;
+    # legacy uploads are searched in multiple local locations
+    candidates = [
+        (LocalStorage(), f"videos/{safe_filename}"),
+        (LocalStorage(), safe_filename),
     ]
+    content_key = ContentStore.key_from_filename(safe_filename)
+    if content_key:
+        candidates.insert(0, (get_storage(), content_key))
     
-    video_path = None
-    for path in possible_paths:
-        if path.exists():
-            video_path = path
+    storage = video = None
+    for candidate_storage, key in candidates:
+        video = await run_in_threadpool(candidate_storage.stat, key)
+        if video:
+            storage = candidate_storage
             break
             
-    if not video_path:
+    if not video:
         raise HTTPException(status_code=404, detail="Video not found")
 
-    file_size = video_path.stat().st_size
+    file_size = video.size
     
     # Defaults
     start = 0
@@ -65,19 +150,22 @@ async def stream_video(filename: str, request: Request, range: str = Header(None
 
     content_length = end - start + 1
 
-    # Efficient Generator: don't load 3MB into RAM at once
-    def iterfile():
-        with open(video_path, "rb") as f:
-            f.seek(start)
-            remaining = content_length
-            while remaining > 0:
-                # Read in small 64KB blocks to keep memory low
-                read_size = min(64 * 1024, remaining)
-                data = f.read(read_size)
-                if not data:
-                    break
-                yield data
-                remaining -= len(data)
+    # Efficient Generator: don't load 3MB into RAM at once.
+    # The backend reads only the requested range (a ranged GET on S3), in small
+    # 64KB blocks to keep memory low. Each block is paced by the bandwidth
+    # scheduler so a few fast clients cannot starve everyone else during peaks.
+    async def iterfile():
+        async with stream_scheduler.open_stream() as shaper:
+            blocks = storage.iter_range(video.key, start, end)
+            try:
+                while True:
+                    data = await run_in_threadpool(next, blocks, None)
+                    if data is None:
+                        break
+                    await shaper.throttle(len(data))
+                    yield data
+            finally:
+                blocks.close()
 
     headers = {
         "Content-Range": f"bytes {start}-{end}/{file_size}",
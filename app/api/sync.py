@@ -0,0 +1,42 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import get_db
+from app.models.user import User
+from app.dependencies import get_current_user
+from app.schemas.sync import SyncRequest, SyncResponse
+from app.services.sync_service import SyncService, APPLIED, STALE, REJECTED, DUPLICATE
+
+router = APIRouter(prefix="/sync", tags=["Sync"])
+
+
+@router.post("/", response_model=SyncResponse)
+def sync_events(
+    request: SyncRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Replay events queued by an offline client in one request.
+    
+    Accepts lesson progress, QBank attempts and bookmarks, each with a
+    client-generated idempotency key and the time it happened on the device.
+    The batch is applied in one transaction; lesson progress is
+    last-write-wins by client timestamp. Returns one result per event, in
+    order: applied, stale (a newer progress update won), rejected (with
+    detail) or duplicate (key already synced; the stored result is returned).
+    """
+    if len(request.events) > settings.SYNC_MAX_EVENTS:
+        raise HTTPException(status_code=413, detail=f"At most {settings.SYNC_MAX_EVENTS} events per sync")
+
+    results = SyncService.apply(db, current_user.id, request.events)
+    counts = {APPLIED: 0, STALE: 0, REJECTED: 0, DUPLICATE: 0}
+    for result in results:
+        counts[result.status] += 1
+    return SyncResponse(
+        results=results,
+        applied=counts[APPLIED],
+        stale=counts[STALE],
+        rejected=counts[REJECTED],
+        duplicates=counts[DUPLICATE]
+    )
@@ -1,14 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_, extract
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime, date
 from app.database import get_db
 from app.models.user import User
 from app.models.test import Test, UserTestSession, TestQuestion, UserTestAnswer, TestType, TestStatus, SessionStatus
 from app.models.question import Question
 from app.dependencies import get_current_user, get_optional_current_user
-from pydantic import BaseModel
+from app.services.review_service import Review, ReviewService
+from pydantic import BaseModel, Field
 
 router = APIRouter(prefix="/tests", tags=["Tests"])
 
@@ -47,6 +48,11 @@ class TestSessionResponse(BaseModel):
         from_attributes = True
 
 
+class AutosaveRequest(BaseModel):
+    answers: Dict[int, Optional[str]] = Field(..., max_length=500)  # Question id -> option, None clears it
+    revision: Optional[int] = None  # Increasing per save; an older or repeated revision is ignored
+
+
 @router.get("/", response_model=List[dict])
 def get_tests(
     test_type: Optional[str] = None,
@@ -192,6 +198,12 @@ def start_test(
     if active_session:
         return {
             "session_id": active_session.id,
+            "test_id": test_id,
+            "duration_minutes": test.duration_minutes,
+            "total_questions": test.total_questions,
+            "started_at": active_session.started_at,
+            "answers": active_session.saved_answers or {},
+            "revision": active_session.autosave_revision,
             "message": "Resuming existing session"
         }
     
@@ -212,6 +224,9 @@ def start_test(
         "test_id": test_id,
         "duration_minutes": test.duration_minutes,
         "total_questions": test.total_questions,
+        "started_at": new_session.started_at,
+        "answers": {},
+        "revision": 0,
         "message": "Test session started successfully"
     }
 
@@ -303,15 +318,81 @@ def get_test_questions(
     }
 
 
+@router.post("/{test_id}/autosave")
+def autosave_answers(
+    test_id: int,
+    session_id: int,
+    request: AutosaveRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Save changed answers of an in-progress session.
+    
+    Only the answers changed since the last save are sent; they are merged
+    into the session's saved answers, which start_test returns on resume and
+    submit_test grades. With `revision`, a save that arrives after a newer
+    one is ignored.
+    """
+    session = db.query(UserTestSession).filter(
+        UserTestSession.id == session_id,
+        UserTestSession.user_id == current_user.id,
+        UserTestSession.test_id == test_id,
+        UserTestSession.status == SessionStatus.IN_PROGRESS
+    ).with_for_update().first()
+    
+    if not session:
+        raise HTTPException(status_code=404, detail="Active test session not found")
+    
+    if request.revision is None or request.revision > session.autosave_revision:
+        question_ids = {
+            question_id for (question_id,) in db.query(TestQuestion.question_id).filter(TestQuestion.test_id == test_id)
+        }
+        unknown = sorted(set(request.answers) - question_ids)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Questions not in this test: {unknown}")
+        invalid = sorted(
+            question_id for question_id, option in request.answers.items()
+            if option is not None and option.upper() not in ("A", "B", "C", "D")
+        )
+        if invalid:
+            raise HTTPException(status_code=400, detail=f"Invalid options for questions: {invalid}")
+        
+        saved = dict(session.saved_answers or {})
+        for question_id, option in request.answers.items():
+            if option is None:
+                saved.pop(str(question_id), None)
+            else:
+                saved[str(question_id)] = option.upper()
+        session.saved_answers = saved
+        session.autosave_revision = request.revision if request.revision is not None else session.autosave_revision + 1
+        session.answers_saved_at = datetime.utcnow()
+    db.commit()
+    
+    return {
+        "session_id": session.id,
+        "revision": session.autosave_revision,
+        "saved_answers": len(session.saved_answers or {}),
+        "saved_at": session.answers_saved_at
+    }
+
+
 @router.post("/{test_id}/submit")
 def submit_test(
     test_id: int,
     session_id: int,
-    answers: dict,
+    answers: Optional[dict] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Submit test answers and calculate score."""
+    """
+    Submit test answers and calculate score.
+    
+    Grades the session's autosaved answers; answers in the request body
+    (question id -> option under "answers") are applied on top, so a client
+    only has to send what changed since its last autosave.
+    """
+    answers = answers or {}
     # Verify session
     session = db.query(UserTestSession).filter(
         UserTestSession.id == session_id,
@@ -328,14 +409,18 @@ def submit_test(
         TestQuestion.test_id == test_id
     ).all()
     
+    submitted = dict(session.saved_answers or {})
+    submitted.update(answers.get("answers", {}))
+    
     # Process answers
     correct_count = 0
     total_attempted = 0
+    reviews = []
     
     for tq in test_questions:
         question_id = str(tq.question_id)
-        if question_id in answers.get("answers", {}):
-            selected_answer = answers["answers"][question_id]
+        if submitted.get(question_id) is not None:
+            selected_answer = submitted[question_id]
             total_attempted += 1
             
             # Get correct answer
@@ -354,6 +439,10 @@ def submit_test(
                 answered_at=datetime.utcnow()
             )
             db.add(user_answer)
+            reviews.append(Review(question.id, question.module_id, is_correct, user_answer.answered_at))
+    
+    # Missed questions enter the review queue
+    ReviewService.record(db, current_user.id, reviews)
     
     # Calculate score
     score = round((correct_count / len(test_questions)) * 100, 1) if len(test_questions) > 0 else 0
@@ -365,6 +454,7 @@ def submit_test(
     session.correct_answers = correct_count
     session.time_taken_minutes = answers.get("time_taken_minutes", 0)
     session.status = SessionStatus.COMPLETED
+    session.saved_answers = None  # Graded answers now live in UserTestAnswer
     
     db.commit()
     
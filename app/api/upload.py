@@ -1,11 +1,16 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException, status, Depends
-import shutil
+from starlette.concurrency import run_in_threadpool
 import os
-import uuid
 from typing import Dict
 from app.config import settings
+from sqlalchemy.orm import Session
+from app.database import get_db
 from app.models.user import User, UserRole
 from app.dependencies import get_current_user
+from app.services.content_store import ContentStore
+from app.services.image_service import ImageService
+from app.services.job_queue import JobQueue
+from app.utils.uploads import require_extension, iter_upload_file
 
 router = APIRouter(prefix="/upload", tags=["Upload"])
 
@@ -15,11 +20,15 @@ os.makedirs(UPLOAD_DIR, exist_ok=True)
 @router.post("/", response_model=Dict[str, str])
 async def upload_file(
     file: UploadFile = File(...),
+    db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Upload a file (Admin only).
     Returns file URL.
+    
+    Resized variants of images are generated in the background; use
+    `?w=<width>` on the returned URL (or the *_srcset response fields).
     """
     # Verify admin role
     if current_user.role != UserRole.ADMIN:
@@ -28,33 +37,30 @@ async def upload_file(
             detail="Only admins can upload files"
         )
 
-    # Validate file size (basic check, Nginx/Reverse proxy usually handles limit too)
-    # This reads into memory, for large files better to stream, but for now simple write
-    
-    file_extension = os.path.splitext(file.filename)[1]
-    unique_filename = f"{uuid.uuid4()}{file_extension}"
-    file_path = os.path.join(UPLOAD_DIR, unique_filename)
+    file_extension = require_extension(
+        file.filename,
+        settings.image_extensions + settings.document_extensions + settings.video_extensions
+    )
     
+    # Streamed to disk in chunks off the event loop; aborts with 413 past the limit.
+    # Stored by content hash, so re-uploading the same file reuses the existing copy.
     try:
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        stored = await ContentStore.store_stream(iter_upload_file(file), file_extension, settings.MAX_UPLOAD_SIZE)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Could not save file: {str(e)}"
         )
-        
-    # Construct URL
-    # Assuming backend is served at base URL, we serve uploads at /static/
-    # In production, this should be an S3 URL or similar
     
-    # If using local static files:
-    base_url = f"http://{settings.HOST}:{settings.PORT}" 
-    # Or rely on client to prepend base URL if returning relative path
-    # Let's return full URL for simplicity
-    
-    # Correction: "http://0.0.0.0:8000" might be accessible inside container/local but 
-    # for physical device it needs LAN IP.
-    # Better to return relative path "/static/{unique_filename}" and let frontend prepend base URL
+    if ImageService.is_original_key(stored.key):
+        await run_in_threadpool(
+            JobQueue.enqueue, db, "images.generate_variants", {"key": stored.key},
+            idempotency_key=f"image-variants:{stored.key}", requeue=True
+        )
     
-    return {"url": f"/static/{unique_filename}"}
+    # Return relative path "/static/cas/..." and let frontend prepend base URL
+    # (a LAN IP is needed for physical devices, so the backend can't know the right host).
+    # The URL is immutable: its content never changes.
+    return {"url": stored.url, "sha256": stored.sha256}
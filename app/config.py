@@ -41,6 +41,14 @@ class Settings(BaseSettings):
     AWS_SECRET_ACCESS_KEY: str = ""
     AWS_S3_BUCKET: str = ""
     AWS_REGION: str = "us-east-1"
+    AWS_S3_ENDPOINT_URL: str = ""  # For S3-compatible stores (MinIO etc.)
+    AWS_S3_PUBLIC_URL: str = ""  # Public/CDN base URL of the bucket; presigned URLs when empty
+    
+    # File Storage
+    STORAGE_BACKEND: str = "local"  # "local" (static/ directory) or "s3"
+    S3_MULTIPART_THRESHOLD: int = 8388608  # 8MB
+    S3_MULTIPART_CHUNK_SIZE: int = 16777216  # 16MB parts
+    S3_MULTIPART_CONCURRENCY: int = 8  # Parts uploaded in parallel
     
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
@@ -56,10 +64,67 @@ class Settings(BaseSettings):
     
     # File Upload
     MAX_UPLOAD_SIZE: int = 104857600  # 100MB
+    MAX_VIDEO_UPLOAD_SIZE: int = 10737418240  # 10GB
+    RESUMABLE_UPLOAD_DIR: str = "uploads_partial"
+    RESUMABLE_UPLOAD_EXPIRE_HOURS: int = 24
+    UPLOAD_STAGING_DIR: str = "uploads_tmp"
+    CAS_GC_GRACE_HOURS: int = 24  # Unreferenced uploads younger than this are kept
     ALLOWED_VIDEO_EXTENSIONS: str = "mp4,mov,avi,mkv"
     ALLOWED_IMAGE_EXTENSIONS: str = "jpg,jpeg,png,webp"
     ALLOWED_DOCUMENT_EXTENSIONS: str = "pdf,doc,docx,ppt,pptx"
     
+    # Video Streaming
+    STREAM_URL_SECRET: str = ""  # Falls back to SECRET_KEY when empty
+    STREAM_URL_TTL_SECONDS: int = 7200  # 2 hours
+    STREAM_REQUIRE_SIGNED_URLS: bool = True
+    STREAM_CONNECTION_RATE: int = 625000  # bytes/sec per stream (~5 Mbit/s), 0 = unlimited
+    STREAM_GLOBAL_RATE: int = 62500000  # bytes/sec shared by all streams (~500 Mbit/s), 0 = unlimited
+    STREAM_BURST_BYTES: int = 1048576  # 1MB initial burst for fast startup
+    
+    # Entitlements (per-user cache of active course enrollments)
+    ENTITLEMENT_CACHE_TTL_SECONDS: int = 300  # Upper bound on staleness across processes
+    ENTITLEMENT_RECHECK_SECONDS: int = 5  # A denied course is re-read from the DB after this
+    ENTITLEMENT_CACHE_MAX_USERS: int = 50000
+    ENROLLMENT_SWEEP_INTERVAL_SECONDS: int = 300  # How often expired enrollments are deactivated
+    ENROLLMENT_SWEEP_BATCH_SIZE: int = 1000
+    
+    # Background Jobs
+    JOB_WORKERS: int = 2  # Worker threads per process, 0 disables the in-process workers
+    JOB_POLL_INTERVAL_SECONDS: float = 1.0
+    JOB_MAX_ATTEMPTS: int = 5
+    JOB_RETRY_BASE_SECONDS: int = 10  # Backoff doubles per attempt
+    JOB_RETRY_MAX_SECONDS: int = 3600
+    JOB_LOCK_TIMEOUT_SECONDS: int = 3600  # Running jobs older than this are considered crashed
+    JOB_RETENTION_DAYS: int = 7  # Finished jobs are purged after this
+    
+    # Offline sync (/sync)
+    SYNC_MAX_EVENTS: int = 500  # Events per request
+    SYNC_RECEIPT_RETENTION_DAYS: int = 30  # Replays older than this are applied again
+    
+    # QBank practice sets (per-user attempted/incorrect bitsets per module)
+    PRACTICE_BITSET_TTL_SECONDS: int = 600  # Upper bound on staleness of attempts made through other processes
+    PRACTICE_MODULE_TTL_SECONDS: int = 300  # Added/removed questions are picked up after this
+    PRACTICE_CACHE_MAX_ENTRIES: int = 50000  # Cached (user, module) bitsets
+    PRACTICE_SET_MAX_QUESTIONS: int = 100
+    
+    # Spaced-repetition reviews
+    REVIEW_DIGEST_HOUR: int = 2  # UTC hour the daily review digest job runs
+    REVIEW_DIGEST_BATCH_SIZE: int = 1000  # Users per digest batch
+    
+    # Image Variants (resized covers, banners and avatars)
+    IMAGE_VARIANT_WIDTHS: str = "200,400,800,1600"
+    IMAGE_VARIANT_QUALITY: int = 80
+    IMAGE_WORKERS: int = 2  # Processes used to resize images
+    
+    # Lesson Previews (poster frames and scrub sprites)
+    FFMPEG_PATH: str = "ffmpeg"
+    FFPROBE_PATH: str = "ffprobe"
+    PREVIEW_INTERVAL_SECONDS: int = 10
+    PREVIEW_THUMB_WIDTH: int = 160
+    PREVIEW_THUMB_HEIGHT: int = 90
+    PREVIEW_SPRITE_COLUMNS: int = 10
+    PREVIEW_SPRITE_ROWS: int = 10
+    
     @property
     def cors_origins(self) -> List[str]:
         """Parse ALLOWED_ORIGINS into a list."""
@@ -75,6 +140,11 @@ class Settings(BaseSettings):
         """Parse image extensions into a list."""
         return [ext.strip() for ext in self.ALLOWED_IMAGE_EXTENSIONS.split(",")]
     
+    @property
+    def image_variant_widths(self) -> List[int]:
+        """Parse image variant widths into a sorted list."""
+        return sorted(int(width) for width in self.IMAGE_VARIANT_WIDTHS.split(",") if width.strip())
+    
     @property
     def document_extensions(self) -> List[str]:
         """Parse document extensions into a list."""
@@ -1,4 +1,5 @@
 from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 from typing import Generator
@@ -38,3 +39,13 @@ def init_db() -> None:
     Called on application startup.
     """
     Base.metadata.create_all(bind=engine)
+
+
+def upsert_insert(db: Session):
+    """INSERT construct with ON CONFLICT support (postgresql or sqlite) for the session's database."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert
+    if dialect == "sqlite":
+        return sqlite.insert
+    raise NotImplementedError(f"Upserts are not supported on {dialect}")
@@ -3,6 +3,7 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models.user import User
+from app.services.entitlements import entitlements
 from app.utils.security import decode_token
 from typing import Optional
 
@@ -128,3 +129,25 @@ async def get_admin_user(
             detail="Admin or Instructor access required"
         )
     return current_user
+
+
+async def get_course_access(
+    course_id: int,
+    current_user: Optional[User] = Depends(get_optional_current_user),
+    db: Session = Depends(get_db)
+) -> bool:
+    """
+    Dependency: whether the (optional) current user has an active enrollment
+    in the `course_id` path parameter. Answered from the entitlement cache.
+    
+    Args:
+        course_id: Course ID from the path
+        current_user: Current user, if authenticated
+        db: Database session (only used on a cache miss)
+        
+    Returns:
+        True if enrolled and not expired, False otherwise (or when anonymous)
+    """
+    if current_user is None:
+        return False
+    return entitlements.has_course(db, current_user.id, course_id)
@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, String, Text, Float, DateTime, ForeignKey, Boolean, Enum as SQLEnum
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Text, Float, DateTime, ForeignKey, Boolean, Enum as SQLEnum, event, inspect, update
+from sqlalchemy.orm import Session, relationship
 from sqlalchemy.sql import func
 from app.database import Base
 import enum
@@ -37,6 +37,9 @@ class Course(Base):
     level = Column(SQLEnum(CourseLevel), default=CourseLevel.BEGINNER)
     language = Column(String(50), default="English")
     is_published = Column(Boolean, default=False)
+    # Bumped whenever the course, its subjects or its lessons change (see below);
+    # keys the cached lesson-tree snapshots
+    content_version = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
@@ -56,7 +59,7 @@ class CourseSubject(Base):
     __tablename__ = "course_subjects"
 
     id = Column(Integer, primary_key=True, index=True)
-    course_id = Column(Integer, ForeignKey("courses.id", ondelete="CASCADE"), nullable=False)
+    course_id = Column(Integer, ForeignKey("courses.id", ondelete="CASCADE"), nullable=False, index=True)
     title = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
     order = Column(Integer, default=0)
@@ -76,12 +79,14 @@ class Lesson(Base):
     __tablename__ = "lessons"
 
     id = Column(Integer, primary_key=True, index=True)
-    course_id = Column(Integer, ForeignKey("courses.id", ondelete="CASCADE"), nullable=False)
+    course_id = Column(Integer, ForeignKey("courses.id", ondelete="CASCADE"), nullable=False, index=True)
     subject_id = Column(Integer, ForeignKey("course_subjects.id", ondelete="CASCADE"), nullable=True) # Linked to subject
     title = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
     content_url = Column(String(500), nullable=True)  # For documents/resources
     video_url = Column(String(500), nullable=True)
+    poster_url = Column(String(500), nullable=True)  # Poster frame image
+    thumbnails_url = Column(String(500), nullable=True)  # WebVTT index into scrub-preview sprite sheets
     duration = Column(Integer, default=0)  # In seconds
     order = Column(Integer, default=0)
     is_preview = Column(Boolean, default=False)
@@ -95,3 +100,39 @@ class Lesson(Base):
 
     def __repr__(self):
         return f"<Lesson {self.title}>"
+
+
+def _changed_course_ids(session: Session) -> set:
+    """Courses whose own row, subjects or lessons are written by the current flush."""
+    course_ids = set()
+    for obj in session.dirty | session.deleted:
+        if isinstance(obj, Course) and (obj in session.deleted or session.is_modified(obj)):
+            course_ids.add(obj.id)
+    for obj in session.new | session.dirty | session.deleted:
+        if not isinstance(obj, (CourseSubject, Lesson)):
+            continue
+        if obj in session.dirty and not session.is_modified(obj):
+            continue
+        # A subject or lesson moved to another course changes both courses
+        history = inspect(obj).attrs.course_id.history
+        course_ids.update(history.added or history.unchanged or ())
+        course_ids.update(history.deleted or ())
+    course_ids.discard(None)
+    return course_ids
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_course_content_version(session: Session, flush_context) -> None:
+    """
+    Bump Course.content_version for every course touched by an ORM flush.
+
+    Runs in the flushing transaction, so the new version becomes visible to
+    other processes together with the edit. Core/bulk statements that bypass
+    the ORM do not bump the version.
+    """
+    course_ids = _changed_course_ids(session)
+    if course_ids:
+        table = Course.__table__
+        session.connection().execute(
+            update(table).where(table.c.id.in_(course_ids)).values(content_version=table.c.content_version + 1)
+        )
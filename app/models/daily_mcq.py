@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Date, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, Date, DateTime, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
@@ -15,6 +15,8 @@ class DailyMCQ(Base):
     
     __table_args__ = (
         UniqueConstraint('course_id', 'date', name='uq_daily_mcq_course_date'),
+        # Scheduler anti-join: "was this question ever used for this course?"
+        Index('ix_daily_mcqs_course_question', 'course_id', 'question_id'),
     )
 
     # Relationships
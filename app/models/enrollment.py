@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, DateTime, ForeignKey, Boolean, Float
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Boolean, Float, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -16,8 +16,23 @@ class Enrollment(Base):
     is_completed = Column(Boolean, default=False)
     completed_at = Column(DateTime(timezone=True), nullable=True)
     expires_at = Column(DateTime(timezone=True), nullable=True) # Expiry date
+    # Cleared by the expiry sweeper once expires_at has passed
+    is_active = Column(Boolean, nullable=False, default=True, server_default=text("true"))
     last_accessed_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    __table_args__ = (
+        # Partial indexes: only active enrollments are read on the hot paths
+        Index(
+            "ix_enrollments_active_user_course", "user_id", "course_id",
+            postgresql_where=text("is_active"), sqlite_where=text("is_active")
+        ),
+        Index(
+            "ix_enrollments_active_expires_at", "expires_at",
+            postgresql_where=text("is_active AND expires_at IS NOT NULL"),
+            sqlite_where=text("is_active AND expires_at IS NOT NULL")
+        ),
+    )
+
     # Relationships
     user = relationship("User", back_populates="enrollments")
     course = relationship("Course", back_populates="enrollments")
@@ -0,0 +1,39 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, Index, Enum as SQLEnum
+from datetime import datetime
+from app.database import Base
+import enum
+
+
+class JobStatus(str, enum.Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class Job(Base):
+    """Background job persisted so it survives restarts and can be retried."""
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(100), nullable=False)  # Registered handler name
+    payload = Column(JSON, nullable=False, default=dict)  # Handler keyword arguments
+    idempotency_key = Column(String(255), nullable=True, unique=True)
+    status = Column(SQLEnum(JobStatus), default=JobStatus.PENDING, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    max_attempts = Column(Integer, default=5, nullable=False)
+    run_at = Column(DateTime, default=datetime.utcnow, nullable=False)  # Not picked up before this
+    locked_by = Column(String(100), nullable=True)  # Worker that claimed the job
+    locked_at = Column(DateTime, nullable=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # Workers poll for the next due pending job
+        Index("ix_jobs_status_run_at", "status", "run_at"),
+    )
+
+    def __repr__(self):
+        return f"<Job {self.id} {self.name} {self.status}>"
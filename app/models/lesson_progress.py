@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 from datetime import datetime
@@ -16,6 +16,13 @@ class LessonProgress(Base):
     last_watched_at = Column(DateTime, default=datetime.utcnow)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        # "Continue watching" feed: a user's progress rows, most recent first
+        Index("ix_lesson_progress_user_recent", "user_id", last_watched_at.desc(), id.desc()),
+        # One row per user and lesson; target of the /sync progress upsert
+        Index("uq_lesson_progress_user_lesson", "user_id", "lesson_id", unique=True),
+    )
+
     # Relationships
     user = relationship("User", back_populates="lesson_progress")
     lesson = relationship("Lesson")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, BigInteger, String, Text, DateTime, ForeignKey, LargeBinary
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
@@ -8,7 +8,7 @@ class Question(Base):
     __tablename__ = "questions"
     
     id = Column(Integer, primary_key=True, index=True)
-    module_id = Column(Integer, ForeignKey("modules.id"), nullable=False)
+    module_id = Column(Integer, ForeignKey("modules.id"), nullable=False, index=True)
     question_text = Column(Text, nullable=False)
     option_a = Column(String, nullable=False)
     option_b = Column(String, nullable=False)
@@ -17,8 +17,25 @@ class Question(Base):
     correct_answer = Column(String, nullable=False)  # 'A', 'B', 'C', or 'D'
     explanation = Column(Text)
     difficulty = Column(String, default='medium')  # 'easy', 'medium', 'hard'
+    fingerprint = Column(String(40), nullable=True, index=True)  # Hash of normalized text + options
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
     module = relationship("Module", back_populates="questions")
     attempts = relationship("UserTestAttempt", back_populates="question", cascade="all, delete-orphan")
+
+
+class QuestionSignature(Base):
+    """MinHash signature of a question, for near-duplicate detection."""
+    __tablename__ = "question_signatures"
+    
+    question_id = Column(Integer, ForeignKey("questions.id", ondelete="CASCADE"), primary_key=True)
+    signature = Column(LargeBinary, nullable=False)
+
+
+class QuestionLSHBucket(Base):
+    """Locality-sensitive hashing bucket: questions sharing a bucket are near-duplicate candidates."""
+    __tablename__ = "question_lsh_buckets"
+    
+    bucket = Column(BigInteger, primary_key=True)  # Hash of one band of the signature
+    question_id = Column(Integer, ForeignKey("questions.id", ondelete="CASCADE"), primary_key=True, index=True)
@@ -0,0 +1,46 @@
+from sqlalchemy import Column, Integer, Float, Date, DateTime, ForeignKey, Index, UniqueConstraint
+from datetime import datetime
+from app.database import Base
+
+
+class QuestionReview(Base):
+    """
+    Spaced-repetition (SM-2) state of one question for one user.
+
+    A question enters a user's review queue when they answer it wrong; every
+    later attempt reschedules it.
+    """
+    __tablename__ = "question_reviews"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    question_id = Column(Integer, ForeignKey("questions.id", ondelete="CASCADE"), nullable=False)
+    module_id = Column(Integer, ForeignKey("modules.id", ondelete="CASCADE"), nullable=False)
+    ease_factor = Column(Float, nullable=False, default=2.5)
+    interval_days = Column(Integer, nullable=False, default=0)
+    repetitions = Column(Integer, nullable=False, default=0)  # Correct reviews in a row
+    lapses = Column(Integer, nullable=False, default=0)  # Times answered wrong
+    due_at = Column(DateTime, nullable=False)
+    last_reviewed_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # Conflict target of the review upsert
+        UniqueConstraint("user_id", "question_id", name="uq_question_reviews_user_question"),
+        # A user's due reviews, earliest first
+        Index("ix_question_reviews_user_due", "user_id", "due_at"),
+    )
+
+    def __repr__(self):
+        return f"<QuestionReview user={self.user_id} question={self.question_id} due={self.due_at}>"
+
+
+class ReviewDigest(Base):
+    """A user's review workload for one day, written by the daily digest job."""
+    __tablename__ = "review_digests"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    for_date = Column(Date, nullable=False)
+    due_count = Column(Integer, nullable=False, default=0)  # Reviews due by the end of for_date
+    next_due_at = Column(DateTime, nullable=True)  # Earliest due review at generation time
+    generated_at = Column(DateTime, default=datetime.utcnow)
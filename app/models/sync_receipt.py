@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, UniqueConstraint
+from datetime import datetime
+from app.database import Base
+
+
+class SyncReceipt(Base):
+    """
+    Outcome of one offline event applied through /sync, keyed by the client's
+    idempotency key, so replaying the event returns the stored result instead
+    of applying it again.
+    """
+    __tablename__ = "sync_receipts"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    idempotency_key = Column(String(100), nullable=False)  # Generated by the client, unique per user
+    event_type = Column(String(50), nullable=False)
+    status = Column(String(20), nullable=False)  # applied, stale or rejected
+    result = Column(JSON, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "idempotency_key", name="uq_sync_receipts_user_key"),
+    )
+
+    def __repr__(self):
+        return f"<SyncReceipt user={self.user_id} key={self.idempotency_key} {self.status}>"
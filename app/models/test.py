@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Enum, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Enum, ForeignKey, Index, JSON
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -42,6 +42,11 @@ class Test(Base):
     sessions = relationship("UserTestSession", back_populates="test", cascade="all, delete-orphan")
     questions = relationship("TestQuestion", back_populates="test", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Admin listing: keyset pagination, newest first
+        Index("ix_tests_created_at_id", "created_at", "id"),
+    )
+
     def __repr__(self):
         return f"<Test {self.title}>"
 
@@ -65,6 +70,9 @@ class UserTestSession(Base):
     correct_answers = Column(Integer, default=0)
     time_taken_minutes = Column(Integer, nullable=True)
     status = Column(Enum(SessionStatus), default=SessionStatus.IN_PROGRESS)
+    saved_answers = Column(JSON, nullable=True)  # Autosaved while in progress: question id (str) -> option
+    autosave_revision = Column(Integer, nullable=False, default=0, server_default="0")  # Last applied client revision
+    answers_saved_at = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
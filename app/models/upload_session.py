@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, String, BigInteger, DateTime, ForeignKey
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from app.database import Base
+
+
+class UploadSession(Base):
+    """Resumable (chunked) upload of a lesson video."""
+    __tablename__ = "upload_sessions"
+
+    id = Column(String(32), primary_key=True)  # uuid4 hex
+    lesson_id = Column(Integer, ForeignKey("lessons.id", ondelete="CASCADE"), nullable=False)
+    created_by = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    filename = Column(String(255), nullable=False)
+    upload_length = Column(BigInteger, nullable=False)  # Total size in bytes
+    upload_offset = Column(BigInteger, default=0, nullable=False)  # Bytes received so far
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+    # Relationships
+    lesson = relationship("Lesson")
+
+    def __repr__(self):
+        return f"<UploadSession {self.id} {self.upload_offset}/{self.upload_length}>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
@@ -16,6 +16,11 @@ class UserTestAttempt(Base):
     time_taken = Column(Integer)  # seconds
     attempted_at = Column(DateTime, default=datetime.utcnow)
     
+    __table_args__ = (
+        # A user's attempts per module; source of the practice-set bitsets
+        Index("ix_user_test_attempts_user_module", "user_id", "module_id"),
+    )
+    
     # Relationships
     user = relationship("User")
     question = relationship("Question", back_populates="attempts")
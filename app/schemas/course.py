@@ -1,4 +1,4 @@
-from pydantic import BaseModel, HttpUrl
+from pydantic import BaseModel, HttpUrl, computed_field
 from typing import Optional, List
 from datetime import datetime
 from app.models.course import CourseLevel
@@ -41,6 +41,8 @@ class LessonResponse(BaseModel):
     description: Optional[str]
     content_url: Optional[str]
     video_url: Optional[str]
+    poster_url: Optional[str] = None
+    thumbnails_url: Optional[str] = None
     duration: int
     order: int
     is_preview: bool
@@ -134,7 +136,8 @@ class CourseUpdate(BaseModel):
     is_published: Optional[bool] = None
 
 
-class CourseResponse(BaseModel):
+class CourseFields(BaseModel):
+    """Course columns shared by the catalog summary and the full course response."""
     id: int
     title: str
     subtitle: Optional[str]
@@ -159,15 +162,65 @@ class CourseResponse(BaseModel):
     is_published: bool
     created_at: datetime
     updated_at: Optional[datetime]
-    subjects: List[CourseSubjectResponse] = [] # Added subjects
-    lessons: List[LessonResponse] = []
+
+    # Resized variants ("<url>?w=200 200w, ..."), None for external images
+    @computed_field
+    @property
+    def cover_image_srcset(self) -> Optional[str]:
+        from app.utils.helpers import image_srcset  # app.utils imports the schemas
+        return image_srcset(self.cover_image)
+
+    @computed_field
+    @property
+    def banner_image_srcset(self) -> Optional[str]:
+        from app.utils.helpers import image_srcset
+        return image_srcset(self.banner_image)
 
     class Config:
         from_attributes = True
 
 
+class CourseSummaryResponse(CourseFields):
+    """Catalog entry: course fields plus aggregates, no lesson tree."""
+    subjects_count: int = 0
+    lessons_count: int = 0
+    total_duration: int = 0  # Sum of lesson durations, in seconds
+
+
+class CourseResponse(CourseFields):
+    subjects: List[CourseSubjectResponse] = [] # Added subjects
+    lessons: List[LessonResponse] = []
+
+
 class LessonHistoryResponse(LessonResponse):
     progress_completed: bool
     progress_watch_time: int
     progress_last_position: int
     last_watched_at: datetime
+
+
+class LessonHistoryCompactResponse(BaseModel):
+    """Continue-watching feed item: just enough to render a resume card."""
+    lesson_id: int
+    course_id: int
+    title: str
+    poster_url: Optional[str]
+    duration: int
+    progress_completed: bool
+    progress_last_position: int
+    last_watched_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class LessonHistoryPage(BaseModel):
+    items: List[LessonHistoryResponse]
+    next_cursor: Optional[str]
+    has_more: bool
+
+
+class LessonHistoryCompactPage(BaseModel):
+    items: List[LessonHistoryCompactResponse]
+    next_cursor: Optional[str]
+    has_more: bool
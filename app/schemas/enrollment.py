@@ -22,6 +22,8 @@ class EnrollmentResponse(BaseModel):
     is_completed: bool
     completed_at: Optional[datetime]
     last_accessed_at: Optional[datetime]
+    expires_at: Optional[datetime] = None
+    is_active: bool = True
     course: Optional[CourseResponse] = None
 
     class Config:
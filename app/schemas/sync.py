@@ -0,0 +1,56 @@
+from pydantic import BaseModel, Field
+from typing import Annotated, Any, Dict, List, Literal, Optional, Union
+from datetime import datetime
+
+
+class SyncEventBase(BaseModel):
+    idempotency_key: str = Field(..., min_length=1, max_length=100)  # Generated by the client per event
+    client_timestamp: datetime  # When the event happened on the device
+
+
+class LessonProgressEvent(SyncEventBase):
+    type: Literal["lesson_progress"]
+    lesson_id: int
+    watch_time: int  # in seconds
+    last_position: int = 0
+    completed: bool = False
+
+
+class QuestionAttemptEvent(SyncEventBase):
+    type: Literal["question_attempt"]
+    question_id: int
+    selected_answer: str  # 'A', 'B', 'C', or 'D'
+    time_taken: Optional[int] = None  # seconds
+
+
+class BookmarkEvent(SyncEventBase):
+    type: Literal["bookmark"]
+    lesson_id: int
+    timestamp: int  # Position in the lesson, in seconds
+    note: Optional[str] = Field(None, max_length=255)
+
+
+SyncEvent = Annotated[
+    Union[LessonProgressEvent, QuestionAttemptEvent, BookmarkEvent],
+    Field(discriminator="type")
+]
+
+
+class SyncRequest(BaseModel):
+    events: List[SyncEvent]
+
+
+class SyncEventResult(BaseModel):
+    idempotency_key: str
+    type: str
+    status: str  # applied, stale (a newer write won), rejected, or duplicate (replayed key)
+    detail: Optional[str] = None
+    data: Optional[Dict[str, Any]] = None
+
+
+class SyncResponse(BaseModel):
+    results: List[SyncEventResult]
+    applied: int
+    stale: int
+    rejected: int
+    duplicates: int
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr, Field, validator
+from pydantic import BaseModel, EmailStr, Field, computed_field, validator
 from typing import Optional
 from datetime import datetime
 from app.models.user import UserRole
@@ -70,6 +70,13 @@ class UserProfileResponse(BaseModel):
     created_at: datetime
     updated_at: Optional[datetime]
     
+    @computed_field
+    @property
+    def avatar_srcset(self) -> Optional[str]:
+        """Resized avatar variants ("<url>?w=200 200w, ..."), None for external images."""
+        from app.utils.helpers import image_srcset  # app.utils imports the schemas
+        return image_srcset(self.avatar_url)
+    
     class Config:
         from_attributes = True
 
@@ -0,0 +1,140 @@
+from datetime import datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence
+from sqlalchemy import event, insert
+from sqlalchemy.orm import Session
+from fastapi import HTTPException, status
+from app.models.question import Question
+from app.models.user_test_attempt import UserTestAttempt
+from app.services.review_service import Review, ReviewService
+from app.utils.events import emit
+
+# Graded attempts of the open transaction, announced once it commits
+_PENDING_KEY = "recorded_attempts"
+
+
+class Answer(NamedTuple):
+    """One answer to grade and record."""
+    question_id: int
+    selected_answer: str
+    time_taken: Optional[int] = None
+    attempted_at: Optional[datetime] = None  # Default: now
+
+
+class GradedAnswer(NamedTuple):
+    question_id: int
+    module_id: int
+    selected_answer: str
+    is_correct: bool
+    correct_answer: str
+    explanation: Optional[str]
+
+
+class AttemptService:
+    """Service class for grading and recording QBank question attempts."""
+
+    @staticmethod
+    def answer_key(db: Session, question_ids: Iterable[int], module_id: Optional[int] = None) -> Dict[int, tuple]:
+        """
+        Load the answer key for a set of questions in one query.
+
+        Args:
+            db: Database session
+            question_ids: Question IDs
+            module_id: If provided, only questions of this module are returned
+
+        Returns:
+            question id -> (id, module_id, correct_answer, explanation) row
+        """
+        query = db.query(Question.id, Question.module_id, Question.correct_answer, Question.explanation).filter(
+            Question.id.in_(set(question_ids))
+        )
+        if module_id is not None:
+            query = query.filter(Question.module_id == module_id)
+        return {row.id: row for row in query}
+
+    @staticmethod
+    def grade(question, selected_answer: str) -> GradedAnswer:
+        """Grade one answer against its answer key row."""
+        selected = selected_answer.upper()
+        return GradedAnswer(
+            question_id=question.id,
+            module_id=question.module_id,
+            selected_answer=selected,
+            is_correct=selected == question.correct_answer.upper(),
+            correct_answer=question.correct_answer,
+            explanation=question.explanation
+        )
+
+    @staticmethod
+    def record(db: Session, user_id: int, answers: Sequence[Answer], key: Dict[int, tuple]) -> List[Optional[GradedAnswer]]:
+        """
+        Grade answers, insert their UserTestAttempt rows in one statement and
+        reschedule the questions' reviews. Does not commit; an
+        "attempts.recorded" event follows the commit.
+
+        Args:
+            db: Database session
+            user_id: User ID
+            answers: Answers to record
+            key: Answer key from answer_key(); answers to other questions are skipped
+
+        Returns:
+            The graded answer per input answer, None where the question is not in the key
+        """
+        now = datetime.utcnow()
+        graded = []
+        rows = []
+        reviews = []
+        for answer in answers:
+            question = key.get(answer.question_id)
+            if question is None:
+                graded.append(None)
+                continue
+            result = AttemptService.grade(question, answer.selected_answer)
+            graded.append(result)
+            rows.append({
+                "user_id": user_id,
+                "question_id": result.question_id,
+                "module_id": result.module_id,
+                "selected_answer": result.selected_answer,
+                "is_correct": result.is_correct,
+                "time_taken": answer.time_taken,
+                "attempted_at": answer.attempted_at or now
+            })
+            reviews.append(Review(result.question_id, result.module_id, result.is_correct, answer.attempted_at or now))
+        if rows:
+            db.execute(insert(UserTestAttempt.__table__).values(rows))
+            ReviewService.record(db, user_id, reviews)
+            db.info.setdefault(_PENDING_KEY, []).append((user_id, [result for result in graded if result]))
+        return graded
+
+    @staticmethod
+    def submit(db: Session, user_id: int, answers: Sequence[Answer], module_id: Optional[int] = None) -> List[GradedAnswer]:
+        """
+        Grade and record a batch of answers, then commit.
+
+        All-or-nothing: if any question does not exist (or is not in
+        `module_id`), nothing is recorded.
+
+        Raises:
+            HTTPException: If any question is not found
+        """
+        key = AttemptService.answer_key(db, [answer.question_id for answer in answers], module_id)
+        missing = sorted({answer.question_id for answer in answers} - key.keys())
+        if missing:
+            detail = "Question not found" if len(answers) == 1 else f"Questions not found: {missing}"
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=detail)
+        graded = AttemptService.record(db, user_id, answers, key)
+        db.commit()
+        return graded
+
+
+@event.listens_for(Session, "after_commit")
+def _announce_committed(session: Session) -> None:
+    for user_id, graded in session.info.pop(_PENDING_KEY, ()):
+        emit("attempts.recorded", user_id=user_id, answers=graded)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,182 @@
+import logging
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import AsyncIterable, List, NamedTuple, Optional, Set, Union
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.config import settings
+from app.models.course import Course, Lesson
+from app.models.user import UserProfile
+from app.services.storage import get_storage
+from app.utils.uploads import StoredUpload, save_stream
+
+logger = logging.getLogger(__name__)
+
+CAS_PREFIX = "cas"
+
+
+class StoredObject(NamedTuple):
+    """A file stored in the content-addressed store."""
+    key: str
+    url: str
+    sha256: str
+    size: int
+    deduplicated: bool
+
+
+class ContentStore:
+    """
+    Content-addressed storage for uploaded files.
+
+    Files are keyed by the SHA-256 of their content
+    (static/cas/<first two hex chars>/<sha256><ext>), so identical uploads are
+    stored once and every URL is immutable and safe to cache forever.
+    Unreferenced files are removed by `collect_garbage`.
+
+    The bytes live in the configured storage backend (local static/ directory
+    or S3); URLs are "/static/<key>" either way.
+    """
+
+    @staticmethod
+    def key_for(sha256: str, extension: str) -> str:
+        """Storage key of a file with the given hash and extension."""
+        return f"{CAS_PREFIX}/{sha256[:2]}/{sha256}{extension.lower()}"
+
+    @staticmethod
+    def url_for(key: str) -> str:
+        """Public URL of a storage key."""
+        return f"/static/{key}"
+
+    @staticmethod
+    def key_from_url(url: Optional[str]) -> Optional[str]:
+        """Storage key of a content-addressed "/static/cas/..." URL."""
+        if not url or not url.startswith(f"/static/{CAS_PREFIX}/"):
+            return None
+        return url.split("?", 1)[0][len("/static/"):]
+
+    @staticmethod
+    def key_from_filename(filename: str) -> Optional[str]:
+        """Map a bare content-addressed file name (<sha256><ext>) to its key."""
+        sha256 = filename.split(".", 1)[0]
+        if len(sha256) != 64:
+            return None
+        return f"{CAS_PREFIX}/{sha256[:2]}/{filename}"
+
+    @staticmethod
+    def media_source(url: Optional[str]) -> Optional[Union[Path, str]]:
+        """
+        Something ffmpeg can read a stored file from: a local path, or a
+        (presigned) download URL for remote backends.
+        """
+        key = ContentStore.key_from_url(url)
+        if not key:
+            return None
+        storage = get_storage()
+        local_path = storage.local_path(key)
+        if local_path:
+            return local_path if local_path.exists() else None
+        return storage.download_url(key) if storage.exists(key) else None
+
+    @staticmethod
+    def commit(staged: StoredUpload, extension: str) -> StoredObject:
+        """
+        Move a fully written staging file into the store.
+
+        If the content already exists the staged copy is discarded.
+
+        Args:
+            staged: File written by `save_stream`
+            extension: File extension including the dot
+
+        Returns:
+            Stored object description
+        """
+        storage = get_storage()
+        key = ContentStore.key_for(staged.sha256, extension)
+        deduplicated = storage.exists(key)
+
+        if deduplicated:
+            staged.path.unlink(missing_ok=True)
+            # Refresh the age so GC treats it like a fresh upload
+            storage.touch(key)
+        else:
+            storage.save_file(staged.path, key)
+
+        return StoredObject(
+            key=key,
+            url=ContentStore.url_for(key),
+            sha256=staged.sha256,
+            size=staged.size,
+            deduplicated=deduplicated
+        )
+
+    @staticmethod
+    async def store_stream(chunks: AsyncIterable[bytes], extension: str, max_size: int) -> StoredObject:
+        """
+        Stream chunks into the store (hashing on the fly) and deduplicate.
+
+        Args:
+            chunks: Async iterable of byte chunks
+            extension: File extension including the dot
+            max_size: Maximum allowed size in bytes
+
+        Returns:
+            Stored object description
+        """
+        staging_path = Path(settings.UPLOAD_STAGING_DIR) / f"{uuid.uuid4().hex}{extension}"
+        staged = await save_stream(chunks, staging_path, max_size)
+        return await run_in_threadpool(ContentStore.commit, staged, extension)
+
+    @staticmethod
+    def referenced_urls(db: Session) -> Set[str]:
+        """Collect every static URL still referenced by lessons, courses or profiles."""
+        columns = [
+            Lesson.video_url, Lesson.content_url,
+            Course.cover_image, Course.banner_image, Course.video_intro_url,
+            UserProfile.avatar_url,
+        ]
+        urls: Set[str] = set()
+        for column in columns:
+            rows = db.query(column).filter(column.like("/static/%")).yield_per(1000)
+            urls.update(url.split("?", 1)[0] for (url,) in rows)
+        return urls
+
+    @staticmethod
+    def collect_garbage(db: Session, grace_hours: Optional[int] = None, dry_run: bool = False) -> List[str]:
+        """
+        Delete content-addressed files that nothing references any more.
+
+        Files younger than the grace period are kept, because a fresh upload is
+        only referenced once the admin saves the lesson/course it belongs to.
+        Derived files (<sha256>_w400.webp, ...) live as long as their original.
+
+        Args:
+            db: Database session
+            grace_hours: Minimum file age before deletion (default: CAS_GC_GRACE_HOURS)
+            dry_run: Only report what would be deleted
+
+        Returns:
+            Keys that were (or would be) deleted
+        """
+        if grace_hours is None:
+            grace_hours = settings.CAS_GC_GRACE_HOURS
+        storage = get_storage()
+        referenced = {
+            url.rsplit("/", 1)[1][:64]
+            for url in ContentStore.referenced_urls(db)
+            if url.startswith(f"/static/{CAS_PREFIX}/")
+        }
+        cutoff = datetime.utcnow() - timedelta(hours=grace_hours)
+        removed: List[str] = []
+
+        for stored in list(storage.list(f"{CAS_PREFIX}/")):
+            sha256 = stored.key.rsplit("/", 1)[1][:64]
+            if sha256 in referenced or stored.modified_at > cutoff:
+                continue
+            removed.append(stored.key)
+            if not dry_run:
+                storage.delete(stored.key)
+
+        logger.info(f"Content store GC {'would remove' if dry_run else 'removed'} {len(removed)} files")
+        return removed
@@ -1,9 +1,11 @@
 from typing import List, Optional
+from sqlalchemy import func, select
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
-from app.models.course import Course, Lesson
+from app.models.course import Course, CourseSubject, Lesson
 from app.models.user import User
-from app.schemas.course import CourseCreate, CourseUpdate, LessonCreate, LessonUpdate
+from app.schemas.course import CourseCreate, CourseFields, CourseUpdate, LessonCreate, LessonUpdate
 
 
 class CourseService:
@@ -41,6 +43,56 @@ class CourseService:
             query = query.filter(Course.language == language_filter)
         return query.offset(skip).limit(limit).all()
 
+    @staticmethod
+    def get_course_summaries(
+        db: Session,
+        skip: int = 0,
+        limit: int = 100,
+        published_only: bool = True,
+        course_id_filter: Optional[int] = None,
+        language_filter: Optional[str] = None
+    ) -> List[Row]:
+        """
+        Catalog listing: course columns plus subject/lesson counts and total
+        lesson duration, in one column-projected query.
+
+        The aggregates are correlated subqueries on the indexed course_id
+        columns, so only the returned page of courses is aggregated and no
+        lesson or subject rows are loaded.
+
+        Args:
+            db: Database session
+            skip: Number of records to skip
+            limit: Maximum number of records to return
+            published_only: If True, only return published courses
+            course_id_filter: If provided, only return courses for this StandardCourse
+            language_filter: If provided, only return courses in this language
+
+        Returns:
+            Rows with the CourseSummaryResponse fields
+        """
+        subjects_count = select(func.count(CourseSubject.id)).where(
+            CourseSubject.course_id == Course.id
+        ).scalar_subquery()
+        lessons_count = select(func.count(Lesson.id)).where(Lesson.course_id == Course.id).scalar_subquery()
+        total_duration = select(func.coalesce(func.sum(Lesson.duration), 0)).where(
+            Lesson.course_id == Course.id
+        ).scalar_subquery()
+
+        query = db.query(
+            *[getattr(Course, field) for field in CourseFields.model_fields],
+            subjects_count.label("subjects_count"),
+            lessons_count.label("lessons_count"),
+            total_duration.label("total_duration")
+        )
+        if published_only:
+            query = query.filter(Course.is_published == True)
+        if course_id_filter:
+            query = query.filter(Course.course_id == course_id_filter)
+        if language_filter:
+            query = query.filter(Course.language == language_filter)
+        return query.order_by(Course.id).offset(skip).limit(limit).all()
+
     @staticmethod
     def get_course(db: Session, course_id: int) -> Optional[Course]:
         """
@@ -0,0 +1,217 @@
+import json
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Tuple, Union
+from sqlalchemy.orm import Session, selectinload
+from app.models.course import Course, CourseSubject
+from app.schemas.course import CourseResponse
+from app.utils.metrics import metrics
+from app.utils.security import sign_video_url
+
+# Lessons of the first subject (or of the course, without subjects) that are
+# free for users who are not enrolled
+FREE_LESSONS = 3
+
+
+def _dumps(value) -> bytes:
+    # Same encoding as FastAPI's JSONResponse
+    return json.dumps(value, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def _open_object(value: dict) -> bytes:
+    """JSON for a non-empty dict without its closing brace, so more keys can follow."""
+    return _dumps(value)[:-1]
+
+
+class LessonFragments(NamedTuple):
+    """Pre-serialized JSON for one lesson, locked and unlocked."""
+    locked: bytes
+    unlocked_prefix: bytes  # Everything up to the video_url value
+    video_url: Optional[str]  # Raw URL, signed per request
+    free: bool  # Unlocked for users who are not enrolled
+
+    def render(self, unlocked: bool) -> bytes:
+        if not unlocked:
+            return self.locked
+        return self.unlocked_prefix + _dumps(sign_video_url(self.video_url)) + b"}"
+
+
+class CourseSnapshot(NamedTuple):
+    """
+    Immutable, pre-serialized lesson tree of one course version.
+
+    `parts` is the CourseResponse JSON split into static byte fragments,
+    lesson slots (indexes into `lessons`) and one None slot for the intro
+    video URL; rendering only fills in the slots.
+    """
+    course_id: int
+    version: int
+    parts: Tuple[Union[bytes, int, None], ...]
+    lessons: Tuple[LessonFragments, ...]
+    video_intro_url: Optional[str]  # Raw URL, signed per request
+    free_lesson_ids: FrozenSet[int]  # Lessons unlocked without enrollment
+
+    def render(self, is_enrolled: bool) -> bytes:
+        """
+        CourseResponse JSON for one user.
+
+        Enrolled users get every lesson unlocked; everyone else gets the
+        precomputed free lessons unlocked and the rest locked, without URLs.
+        Unlocked lessons and the intro video carry a freshly signed stream URL.
+        """
+        rendered = [lesson.render(is_enrolled or lesson.free) for lesson in self.lessons]
+        intro = _dumps(sign_video_url(self.video_intro_url))
+        return b"".join(
+            intro if part is None else part if isinstance(part, bytes) else rendered[part]
+            for part in self.parts
+        )
+
+
+def _free_lesson_ids(course: Course) -> set:
+    """
+    Lessons unlocked without enrollment: admin-marked previews, plus the first
+    FREE_LESSONS lessons of the first subject (of the course if it has no
+    subjects) unless an admin locked them.
+    """
+    subjects = sorted(course.subjects, key=lambda s: (s.order or 0, s.id))
+    candidates = subjects[0].lessons if subjects else course.lessons
+    first = sorted(candidates, key=lambda l: (l.order or 0, l.id))[:FREE_LESSONS]
+    free = {lesson.id for lesson in first if not lesson.is_locked}
+    free.update(lesson.id for lesson in course.lessons if lesson.is_preview)
+    for subject in subjects:
+        free.update(lesson.id for lesson in subject.lessons if lesson.is_preview)
+    return free
+
+
+def build_course_snapshot(course: Course, version: int) -> CourseSnapshot:
+    """
+    Serialize a course with its subjects and lessons into a CourseSnapshot.
+
+    Args:
+        course: Course with `subjects`, `subjects.lessons` and `lessons` loaded
+        version: Course.content_version the tree was read at
+
+    Returns:
+        The snapshot
+    """
+    free_ids = _free_lesson_ids(course)
+    data = CourseResponse.model_validate(course).model_dump(mode="json")
+    subjects = data.pop("subjects")
+    course_lessons = data.pop("lessons")
+    video_intro_url = data.pop("video_intro_url")
+
+    lessons: List[LessonFragments] = []
+    slots: Dict[int, int] = {}
+
+    def slot(lesson: dict) -> int:
+        # A lesson is listed under its subject and in the course; render it once
+        if lesson["id"] not in slots:
+            video_url = lesson.pop("video_url")
+            locked = dict(lesson, is_locked=True, content_url=None)
+            unlocked = dict(lesson, is_locked=False)
+            slots[lesson["id"]] = len(lessons)
+            lessons.append(LessonFragments(
+                locked=_dumps(dict(locked, video_url=None)),
+                unlocked_prefix=_open_object(unlocked) + b',"video_url":',
+                video_url=video_url,
+                free=lesson["id"] in free_ids
+            ))
+        return slots[lesson["id"]]
+
+    parts: List[Union[bytes, int, None]] = []
+
+    def add_lessons(items: List[dict]) -> None:
+        for i, lesson in enumerate(items):
+            if i:
+                parts.append(b",")
+            parts.append(slot(lesson))
+
+    parts.extend([_open_object(data) + b',"video_intro_url":', None, b',"subjects":['])
+    for i, subject in enumerate(subjects):
+        subject_lessons = subject.pop("lessons")
+        parts.append((b"," if i else b"") + _open_object(subject) + b',"lessons":[')
+        add_lessons(subject_lessons)
+        parts.append(b"]}")
+    parts.append(b'],"lessons":[')
+    add_lessons(course_lessons)
+    parts.append(b"]}")
+
+    # Merge neighbouring static fragments
+    merged: List[Union[bytes, int, None]] = []
+    for part in parts:
+        if isinstance(part, bytes) and merged and isinstance(merged[-1], bytes):
+            merged[-1] += part
+        else:
+            merged.append(part)
+    return CourseSnapshot(course.id, version, tuple(merged), tuple(lessons), video_intro_url, frozenset(free_ids))
+
+
+class CourseSnapshotCache:
+    """
+    Process-local LRU of course snapshots, keyed by course id and checked
+    against Course.content_version.
+
+    Every ORM edit of a course, subject or lesson bumps the version in the
+    same transaction (from any process), so a request only pays one
+    primary-key lookup to know whether its cached snapshot is current.
+    """
+
+    MAX_COURSES = 256
+
+    def __init__(self):
+        self._snapshots: "OrderedDict[int, CourseSnapshot]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, db: Session, course_id: int) -> Optional[CourseSnapshot]:
+        """
+        Current snapshot of a course, built on a miss.
+
+        Args:
+            db: Database session
+            course_id: Course ID
+
+        Returns:
+            The snapshot, or None if the course does not exist
+        """
+        version = db.query(Course.content_version).filter(Course.id == course_id).scalar()
+        if version is None:
+            return None
+
+        with self._lock:
+            cached = self._snapshots.get(course_id)
+            if cached and cached.version == version:
+                self._snapshots.move_to_end(course_id)
+                metrics.inc("courses.snapshot.hits")
+                return cached
+
+        # Read after the version: an edit committed in between only makes this
+        # snapshot newer than its label, and the next request rebuilds it
+        course = (
+            db.query(Course)
+            .options(
+                selectinload(Course.subjects).selectinload(CourseSubject.lessons),
+                selectinload(Course.lessons)
+            )
+            .filter(Course.id == course_id)
+            .first()
+        )
+        if not course:
+            return None
+        snapshot = build_course_snapshot(course, version)
+        metrics.inc("courses.snapshot.builds")
+
+        with self._lock:
+            cached = self._snapshots.get(course_id)
+            if not cached or cached.version <= version:
+                self._snapshots[course_id] = snapshot
+                self._snapshots.move_to_end(course_id)
+            while len(self._snapshots) > self.MAX_COURSES:
+                self._snapshots.popitem(last=False)
+        return snapshot
+
+    def clear(self) -> None:
+        with self._lock:
+            self._snapshots.clear()
+
+
+course_snapshots = CourseSnapshotCache()
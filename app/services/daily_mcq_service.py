@@ -0,0 +1,113 @@
+import random
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+from sqlalchemy import exists
+from sqlalchemy.orm import Query, Session
+from fastapi import HTTPException, status
+from app.models.daily_mcq import DailyMCQ
+from app.models.module import Module
+from app.models.question import Question
+from app.models.subject import Subject
+
+
+class DailyMCQService:
+    """Service class for daily MCQ scheduling."""
+
+    @staticmethod
+    def unused_questions(db: Session, course_id: int) -> Query:
+        """
+        Ids of the course's questions that were never a daily MCQ for the course.
+
+        "Never used" is an anti-join (NOT EXISTS) against daily_mcqs, so past
+        and future schedules are both excluded without loading them.
+        """
+        used = exists().where(DailyMCQ.course_id == course_id, DailyMCQ.question_id == Question.id)
+        return (
+            db.query(Question.id)
+            .join(Module, Module.id == Question.module_id)
+            .join(Subject, Subject.id == Module.subject_id)
+            .filter(Subject.course_id == course_id, ~used)
+        )
+
+    @staticmethod
+    def sample_unused_questions(
+        db: Session,
+        course_id: int,
+        count: int,
+        rng: Optional[random.Random] = None
+    ) -> List[int]:
+        """
+        Pick up to `count` random unused questions of a course.
+
+        Every unused question is equally likely: the candidates are counted
+        once, then `count` distinct random positions are read from the
+        id-ordered anti-join with OFFSET. Each pick is one indexed read; no
+        question list is loaded into memory.
+
+        Args:
+            db: Database session
+            course_id: StandardCourse ID
+            count: Number of questions wanted
+            rng: Random source (tests can pass a seeded one)
+
+        Returns:
+            Distinct question ids; fewer than `count` if the course runs out
+        """
+        rng = rng or random
+        candidates = DailyMCQService.unused_questions(db, course_id)
+        total = candidates.count()
+        if not total:
+            return []
+
+        ordered = candidates.order_by(Question.id)
+        picked: List[int] = []
+        for offset in rng.sample(range(total), min(count, total)):
+            question_id = ordered.offset(offset).limit(1).scalar()
+            if question_id is not None:
+                picked.append(question_id)
+        return picked
+
+    @staticmethod
+    def schedule_upcoming(db: Session, course_id: int, days: int, start: Optional[date] = None) -> List[DailyMCQ]:
+        """
+        Fill the unscheduled days of the next `days` days with random unused questions.
+
+        Args:
+            db: Database session
+            course_id: StandardCourse ID
+            days: Number of days from `start` to cover
+            start: First day (default: today)
+
+        Returns:
+            The created DailyMCQ rows (not committed), in date order
+
+        Raises:
+            HTTPException: If days need a question but the course has no unused ones left
+        """
+        start = start or date.today()
+        end = start + timedelta(days=days)
+        scheduled_dates = {
+            mcq_date for (mcq_date,) in db.query(DailyMCQ.date).filter(
+                DailyMCQ.course_id == course_id,
+                DailyMCQ.date >= start,
+                DailyMCQ.date < end
+            )
+        }
+        open_dates = [start + timedelta(days=offset) for offset in range(days)]
+        open_dates = [day for day in open_dates if day not in scheduled_dates]
+        if not open_dates:
+            return []
+
+        question_ids = DailyMCQService.sample_unused_questions(db, course_id, len(open_dates))
+        if not question_ids:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="No unused questions available for this course"
+            )
+        now = datetime.utcnow()
+        created = [
+            DailyMCQ(question_id=question_id, course_id=course_id, date=day, created_at=now)
+            for day, question_id in zip(open_dates, question_ids)
+        ]
+        db.add_all(created)
+        return created
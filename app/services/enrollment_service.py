@@ -1,15 +1,47 @@
+import logging
 from typing import List, Optional
-from datetime import datetime
+from datetime import datetime, timedelta
+from sqlalchemy import or_, update
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
+from app.config import settings
 from app.models.enrollment import Enrollment
 from app.models.course import Course, Lesson
 from app.schemas.enrollment import EnrollmentCreate, EnrollmentUpdate
+from app.services.job_queue import JobQueue, job_handler
+from app.utils.events import emit
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+EXPIRY_SWEEP_JOB = "enrollments.expire"
 
 
 class EnrollmentService:
     """Service class for enrollment and progress operations."""
 
+    @staticmethod
+    def active_filter(now: Optional[datetime] = None):
+        """
+        SQL conditions for enrollments that grant access at `now` (default: current UTC time).
+
+        Every "is this enrollment still valid" check goes through here. The
+        is_active equality is what the partial index serves; the expiry
+        comparison only re-checks those rows, covering enrollments that
+        expired since the last sweep.
+        """
+        now = now or datetime.utcnow()
+        return Enrollment.is_active == True, or_(Enrollment.expires_at == None, Enrollment.expires_at > now)
+
+    @staticmethod
+    def expiry_for(course: Course) -> Optional[datetime]:
+        """Expiry of an enrollment starting now, from the course validity settings."""
+        if course.validity_type == 'limited_days' and course.validity_days:
+            return datetime.utcnow() + timedelta(days=course.validity_days)
+        if course.validity_type == 'fixed_date' and course.validity_date:
+            return course.validity_date
+        return None
+
     @staticmethod
     def enroll_user(db: Session, user_id: int, course_id: int) -> Enrollment:
         """
@@ -38,22 +70,23 @@ class EnrollmentService:
         ).first()
         
         if existing:
-            # If already enrolled, just return the existing enrollment
+            expired = existing.expires_at is not None and existing.expires_at.replace(tzinfo=None) <= datetime.utcnow()
+            if existing.is_active and not expired:
+                # If already enrolled, just return the existing enrollment
+                return existing
+            # Re-enrolling after expiry renews the enrollment (progress is kept)
+            existing.is_active = True
+            existing.expires_at = EnrollmentService.expiry_for(course)
+            db.commit()
+            db.refresh(existing)
             return existing
 
-        # Calculate expiry based on course validity
-        expires_at = None
-        if course.validity_type == 'limited_days' and course.validity_days:
-            from datetime import timedelta
-            expires_at = datetime.utcnow() + timedelta(days=course.validity_days)
-        elif course.validity_type == 'fixed_date' and course.validity_date:
-            expires_at = course.validity_date
-
         enrollment = Enrollment(
             user_id=user_id,
             course_id=course_id,
             enrolled_at=datetime.utcnow(),
-            expires_at=expires_at,
+            expires_at=EnrollmentService.expiry_for(course),
+            is_active=True,
             progress=0.0,
             is_completed=False
         )
@@ -79,20 +112,11 @@ class EnrollmentService:
         """
         from app.models.lesson_progress import LessonProgress
         
-        # Filter expired enrollments logic
-        # We can do this in DB query or python. DB query is better.
-        # But for 'fixed_date' courses that expire for everyone, the course itself might be considered expired, 
-        # but here we check enrollment expiry which we set at enrollment time (or should be dynamic for fixed date).
-        # Actually for fixed_date, if we set expires_at at enrollment, it works.
-        
-        current_time = datetime.utcnow()
-        
-        # Query: (expires_at IS NULL OR expires_at > now)
-        from sqlalchemy import or_
-        
+        # For 'fixed_date' courses expires_at is set to the course's validity date
+        # at enrollment time, so checking the enrollment's own expiry covers both types.
         enrollments = db.query(Enrollment).filter(
             Enrollment.user_id == user_id,
-            or_(Enrollment.expires_at == None, Enrollment.expires_at > current_time)
+            *EnrollmentService.active_filter()
         ).offset(skip).limit(limit).all()
         
         # Calculate progress for each enrollment based on watch time
@@ -181,3 +205,73 @@ class EnrollmentService:
         db.commit()
         db.refresh(enrollment)
         return enrollment
+
+    @staticmethod
+    def expire_enrollments(db: Session, now: Optional[datetime] = None, batch_size: Optional[int] = None) -> int:
+        """
+        Deactivate enrollments whose expiry has passed, in batches.
+
+        Each batch is one indexed range read on the active-expiry partial
+        index and one UPDATE, committed on its own, followed by an
+        "enrollments.expired" event with the affected users and courses.
+
+        Args:
+            db: Database session
+            now: Cut-off time (default: current UTC time)
+            batch_size: Enrollments per batch (default: ENROLLMENT_SWEEP_BATCH_SIZE)
+
+        Returns:
+            Number of enrollments deactivated
+        """
+        now = now or datetime.utcnow()
+        batch_size = batch_size or settings.ENROLLMENT_SWEEP_BATCH_SIZE
+        expired = 0
+        while True:
+            rows = db.query(Enrollment.id, Enrollment.user_id, Enrollment.course_id).filter(
+                Enrollment.is_active == True,
+                Enrollment.expires_at != None,
+                Enrollment.expires_at <= now
+            ).order_by(Enrollment.expires_at).limit(batch_size).all()
+            if not rows:
+                break
+            # Re-check the condition so a renewal committed meanwhile is left alone
+            result = db.execute(
+                update(Enrollment)
+                .where(Enrollment.id.in_([row.id for row in rows]), Enrollment.is_active == True, Enrollment.expires_at <= now)
+                .values(is_active=False),
+                execution_options={"synchronize_session": False}
+            )
+            db.commit()
+            expired += result.rowcount
+            emit(
+                "enrollments.expired",
+                user_ids={row.user_id for row in rows},
+                course_ids={row.course_id for row in rows}
+            )
+            if len(rows) < batch_size:
+                break
+        if expired:
+            metrics.inc("enrollments.expired", expired)
+            logger.info(f"Deactivated {expired} expired enrollments")
+        return expired
+
+    @staticmethod
+    def schedule_expiry_sweep(db: Session, delay_seconds: float = 0):
+        """
+        (Re)schedule the periodic expiry sweep job.
+
+        A single keyed job: scheduling again while it is pending is a no-op,
+        so every app process can call this on startup.
+        """
+        return JobQueue.enqueue(
+            db, EXPIRY_SWEEP_JOB, idempotency_key="enrollments:expiry-sweep",
+            requeue=True, delay_seconds=delay_seconds
+        )
+
+
+@job_handler(EXPIRY_SWEEP_JOB)
+def expire_enrollments_job(db: Session) -> None:
+    """Job entry point: deactivate expired enrollments, then run again after the sweep interval."""
+    # Rescheduling first keeps the sweep periodic even if this run fails
+    EnrollmentService.schedule_expiry_sweep(db, delay_seconds=settings.ENROLLMENT_SWEEP_INTERVAL_SECONDS)
+    EnrollmentService.expire_enrollments(db)
@@ -0,0 +1,153 @@
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from threading import Lock
+from typing import FrozenSet, Iterable, NamedTuple
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models.enrollment import Enrollment
+from app.services.enrollment_service import EnrollmentService
+from app.utils.events import subscribe
+from app.utils.metrics import metrics
+
+
+def _epoch(value: datetime) -> float:
+    # Naive datetimes are UTC throughout the app
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class Entitlements(NamedTuple):
+    """The courses a user can access, as loaded at `loaded_at`."""
+    user_id: int
+    course_ids: FrozenSet[int]
+    valid_until: float  # Earliest enrollment expiry or the cache TTL, whichever is first
+    loaded_at: float
+
+    def allows(self, course_id: int) -> bool:
+        return course_id in self.course_ids
+
+
+class EntitlementCache:
+    """
+    Process-local cache of each user's active course ids.
+
+    An entry lives until the earliest expiry among its enrollments (capped at
+    ENTITLEMENT_CACHE_TTL_SECONDS), so an expired enrollment is never granted
+    from the cache. Enrollment writes committed through an ORM session of this
+    process invalidate the user's entry immediately, as do the expiry
+    sweeper's "enrollments.expired" events. Writes made by other processes
+    are picked up when the entry expires, or, for a course the entry denies,
+    after ENTITLEMENT_RECHECK_SECONDS, so a new enrollment is visible within
+    seconds on every worker.
+    """
+
+    def __init__(self):
+        self._entries: "OrderedDict[int, Entitlements]" = OrderedDict()
+        self._lock = Lock()
+
+    def load(self, db: Session, user_id: int) -> Entitlements:
+        """Read a user's active enrollments from the database and cache them."""
+        now = time.time()
+        valid_until = now + settings.ENTITLEMENT_CACHE_TTL_SECONDS
+        course_ids = set()
+        rows = db.query(Enrollment.course_id, Enrollment.expires_at).filter(
+            Enrollment.user_id == user_id,
+            *EnrollmentService.active_filter()
+        )
+        for course_id, expires_at in rows:
+            course_ids.add(course_id)
+            if expires_at is not None:
+                valid_until = min(valid_until, _epoch(expires_at))
+        entry = Entitlements(user_id, frozenset(course_ids), valid_until, now)
+        metrics.inc("entitlements.loads")
+
+        with self._lock:
+            self._entries[user_id] = entry
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > settings.ENTITLEMENT_CACHE_MAX_USERS:
+                self._entries.popitem(last=False)
+        return entry
+
+    def get(self, db: Session, user_id: int) -> Entitlements:
+        """
+        A user's entitlements, from the cache while they are valid.
+
+        Args:
+            db: Database session, only used on a miss
+            user_id: User ID
+
+        Returns:
+            The user's Entitlements
+        """
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry and entry.valid_until > time.time():
+                self._entries.move_to_end(user_id)
+                return entry
+        return self.load(db, user_id)
+
+    def has_course(self, db: Session, user_id: int, course_id: int) -> bool:
+        """
+        Whether the user is enrolled in the course and the enrollment has not expired.
+
+        Granted courses are answered from memory. A denied course is re-read
+        when the cached entry is older than ENTITLEMENT_RECHECK_SECONDS, which
+        covers enrollments made through another worker process.
+        """
+        entry = self.get(db, user_id)
+        if entry.allows(course_id):
+            return True
+        if time.time() - entry.loaded_at > settings.ENTITLEMENT_RECHECK_SECONDS:
+            entry = self.load(db, user_id)
+        return entry.allows(course_id)
+
+    def invalidate(self, user_ids: Iterable[int]) -> None:
+        with self._lock:
+            for user_id in user_ids:
+                self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+entitlements = EntitlementCache()
+
+
+# Invalidate on commit of any ORM write to enrollments (enroll, expiry, refund/removal).
+# The users are collected at flush time and only dropped once the change is committed.
+
+_PENDING_KEY = "entitlement_user_ids"
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_enrollment_changes(session: Session, flush_context) -> None:
+    for obj in session.new | session.dirty | session.deleted:
+        if not isinstance(obj, Enrollment):
+            continue
+        if obj in session.dirty and not session.is_modified(obj):
+            continue
+        history = inspect(obj).attrs.user_id.history
+        user_ids = session.info.setdefault(_PENDING_KEY, set())
+        user_ids.update(history.added or history.unchanged or ())
+        user_ids.update(history.deleted or ())
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session) -> None:
+    user_ids = session.info.pop(_PENDING_KEY, None)
+    if user_ids:
+        entitlements.invalidate(user_ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+@subscribe("enrollments.expired")
+def _invalidate_expired(user_ids, **_) -> None:
+    entitlements.invalidate(user_ids)
@@ -0,0 +1,193 @@
+import asyncio
+import logging
+import os
+import re
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Tuple
+from PIL import Image, ImageOps
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.config import settings
+from app.services.job_queue import job_handler
+from app.services.storage import get_storage
+
+logger = logging.getLogger(__name__)
+
+# Original: cas/<aa>/<sha256>.<ext>, variants: cas/<aa>/<sha256>_w<width>.<webp|jpg>
+ORIGINAL_KEY_PATTERN = re.compile(r"^cas/([0-9a-f]{2})/([0-9a-f]{64})\.(jpg|jpeg|png|webp)$")
+VARIANT_FORMATS = {"webp": "WEBP", "jpg": "JPEG"}
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def render_image_variants(source_path: str, output_dir: str, stem: str, widths: List[int], quality: int) -> List[str]:
+    """
+    Resize an image to every width in WebP and JPEG.
+
+    Runs in a worker process, so it only takes and returns plain values.
+    Images are never upscaled: widths larger than the original produce
+    original-size variants, so every configured width always exists.
+
+    Returns:
+        File names written to output_dir
+    """
+    written = []
+    with Image.open(source_path) as original:
+        # Let the JPEG decoder downscale while decoding when possible
+        original.draft("RGB", (max(widths), max(widths)))
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "transparency" in image.info or image.mode in ("LA", "PA") else "RGB")
+
+        # Resize from largest to smallest, each step starting from the previous one
+        current = image
+        for width in sorted(widths, reverse=True):
+            if width < current.width:
+                height = max(1, round(current.height * width / current.width))
+                current = current.resize((width, height), Image.LANCZOS, reducing_gap=3.0)
+
+            webp_name = f"{stem}_w{width}.webp"
+            current.save(os.path.join(output_dir, webp_name), VARIANT_FORMATS["webp"], quality=quality, method=4)
+            written.append(webp_name)
+
+            jpeg = current
+            if current.mode == "RGBA":
+                jpeg = Image.new("RGB", current.size, (255, 255, 255))
+                jpeg.paste(current, mask=current.getchannel("A"))
+            jpg_name = f"{stem}_w{width}.jpg"
+            jpeg.save(os.path.join(output_dir, jpg_name), VARIANT_FORMATS["jpg"], quality=quality, optimize=True, progressive=True)
+            written.append(jpg_name)
+
+    return written
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Shared process pool for image resizing (created on first use)."""
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(max_workers=settings.IMAGE_WORKERS or None)
+    return _process_pool
+
+
+def shutdown_process_pool() -> None:
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
+
+
+class ImageService:
+    """Service class for resized image variants of uploaded images."""
+
+    @staticmethod
+    def is_original_key(key: str) -> bool:
+        return bool(ORIGINAL_KEY_PATTERN.match(key))
+
+    @staticmethod
+    def variant_key(key: str, width: int, fmt: str) -> str:
+        """Storage key of a variant of an original image key."""
+        match = ORIGINAL_KEY_PATTERN.match(key)
+        return f"cas/{match.group(1)}/{match.group(2)}_w{width}.{fmt}"
+
+    @staticmethod
+    def select_variant(key: str, requested_width: int, fmt: Optional[str], accept: str) -> Optional[Tuple[str, bool]]:
+        """
+        Pick the variant to serve for a `?w=` request.
+
+        Args:
+            key: Original image key
+            requested_width: Width the client asked for
+            fmt: Explicit format ("webp"/"jpg"), or None to negotiate
+            accept: Request Accept header
+
+        Returns:
+            (variant key, whether the format was negotiated from Accept),
+            or None if the variant does not exist (yet)
+        """
+        if not ImageService.is_original_key(key):
+            return None
+
+        widths = settings.image_variant_widths
+        width = next((w for w in widths if w >= requested_width), widths[-1])
+        negotiated = fmt not in VARIANT_FORMATS
+        if negotiated:
+            fmt = "webp" if "image/webp" in accept else "jpg"
+
+        variant = ImageService.variant_key(key, width, fmt)
+        if not get_storage().exists(variant):
+            return None
+        return variant, negotiated
+
+    @staticmethod
+    def _fetch_original(key: str, directory: str) -> Optional[Path]:
+        """Local copy of the original (the file itself for local storage)."""
+        storage = get_storage()
+        local_path = storage.local_path(key)
+        if local_path:
+            return local_path if local_path.exists() else None
+
+        stored = storage.stat(key)
+        if not stored:
+            return None
+        path = Path(directory) / os.path.basename(key)
+        with open(path, "wb") as f:
+            for block in storage.iter_range(key, 0, stored.size - 1, block_size=1024 * 1024):
+                f.write(block)
+        return path
+
+    @staticmethod
+    def _store_variants(directory: str, names: List[str], key: str) -> None:
+        storage = get_storage()
+        prefix = key.rsplit("/", 1)[0]
+        for name in names:
+            storage.save_file(Path(directory) / name, f"{prefix}/{name}")
+
+    @staticmethod
+    async def generate_variants(key: str) -> List[str]:
+        """
+        Generate all resized variants of an uploaded image.
+
+        Decoding and encoding are CPU-bound, so they run in the process pool;
+        storage I/O runs in the threadpool.
+
+        Args:
+            key: Original image key (cas/<aa>/<sha256>.<ext>)
+
+        Returns:
+            Keys of the generated variants
+        """
+        match = ORIGINAL_KEY_PATTERN.match(key)
+        if not match:
+            return []
+
+        with tempfile.TemporaryDirectory() as tmp:
+            source = await run_in_threadpool(ImageService._fetch_original, key, tmp)
+            if not source:
+                logger.warning(f"Image variants skipped: {key} not found")
+                return []
+
+            loop = asyncio.get_running_loop()
+            try:
+                names = await loop.run_in_executor(
+                    get_process_pool(),
+                    render_image_variants,
+                    str(source), tmp, match.group(2),
+                    settings.image_variant_widths, settings.IMAGE_VARIANT_QUALITY
+                )
+            except (OSError, ValueError, Image.DecompressionBombError) as e:
+                logger.error(f"Image variant generation failed for {key}: {e}")
+                return []
+
+            await run_in_threadpool(ImageService._store_variants, tmp, names, key)
+
+        prefix = key.rsplit("/", 1)[0]
+        logger.info(f"Generated {len(names)} image variants for {key}")
+        return [f"{prefix}/{name}" for name in names]
+
+
+@job_handler("images.generate_variants")
+async def generate_image_variants_job(db: Session, key: str) -> None:
+    """Job entry point: generate resized variants after an image upload."""
+    await ImageService.generate_variants(key)
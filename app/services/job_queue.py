@@ -0,0 +1,377 @@
+import asyncio
+import inspect
+import logging
+import os
+import random
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+from sqlalchemy import func, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import SessionLocal
+from app.models.job import Job, JobStatus
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Handler name -> callable(db, **payload); may be a coroutine function
+_handlers: Dict[str, Callable[..., Any]] = {}
+
+# Set on enqueue so idle in-process workers start immediately instead of on the next poll
+_wakeup = threading.Event()
+
+FINISHED_STATUSES = (JobStatus.SUCCEEDED, JobStatus.FAILED)
+
+
+def job_handler(name: str):
+    """
+    Register a function as the handler for jobs called `name`.
+
+    The handler receives its own database session followed by the job payload
+    as keyword arguments. Jobs can be retried, so handlers must be idempotent.
+    """
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        _handlers[name] = func
+        return func
+    return decorator
+
+
+class JobQueue:
+    """
+    Persistent job queue backed by the `jobs` table.
+
+    Jobs are claimed with a conditional UPDATE (status pending -> running), so
+    any number of worker threads and processes can share the table without two
+    of them running the same job. Failed jobs are retried with exponential
+    backoff up to `max_attempts`.
+    """
+
+    @staticmethod
+    def enqueue(
+        db: Session,
+        name: str,
+        payload: Optional[dict] = None,
+        idempotency_key: Optional[str] = None,
+        requeue: bool = False,
+        delay_seconds: float = 0,
+        max_attempts: Optional[int] = None
+    ) -> Job:
+        """
+        Add a job to the queue. Commits the session.
+
+        Args:
+            db: Database session
+            name: Registered handler name
+            payload: JSON-serialisable handler arguments
+            idempotency_key: Enqueuing the same key again returns the existing job
+                instead of creating a duplicate
+            requeue: With an idempotency key, run the existing job again (with the
+                new payload) if it already started or finished. A pending job is
+                simply reused, so bursts of enqueues coalesce into one run.
+            delay_seconds: Do not start the job before this delay
+            max_attempts: Attempts before the job is marked failed
+
+        Returns:
+            The queued (or existing) job
+        """
+        if name not in _handlers:
+            raise ValueError(f"No job handler registered for '{name}'")
+
+        run_at = datetime.utcnow() + timedelta(seconds=delay_seconds)
+        payload = payload or {}
+
+        if idempotency_key:
+            existing = db.query(Job).filter(Job.idempotency_key == idempotency_key).first()
+            if existing:
+                if requeue and existing.status != JobStatus.PENDING:
+                    JobQueue._reset(db, existing, payload, run_at)
+                    _wakeup.set()
+                return existing
+
+        job = Job(
+            name=name,
+            payload=payload,
+            idempotency_key=idempotency_key,
+            status=JobStatus.PENDING,
+            max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+            run_at=run_at
+        )
+        db.add(job)
+        try:
+            db.commit()
+        except IntegrityError:
+            # Another request enqueued the same key concurrently
+            db.rollback()
+            existing = db.query(Job).filter(Job.idempotency_key == idempotency_key).one()
+            if requeue and existing.status != JobStatus.PENDING:
+                JobQueue._reset(db, existing, payload, run_at)
+            _wakeup.set()
+            return existing
+
+        db.refresh(job)
+        metrics.inc("jobs.enqueued")
+        _wakeup.set()
+        return job
+
+    @staticmethod
+    def _reset(db: Session, job: Job, payload: dict, run_at: datetime) -> None:
+        # Clearing locked_by makes a still-running attempt's completion update a no-op
+        job.payload = payload
+        job.status = JobStatus.PENDING
+        job.attempts = 0
+        job.run_at = run_at
+        job.locked_by = None
+        job.locked_at = None
+        job.last_error = None
+        job.finished_at = None
+        db.commit()
+        db.refresh(job)
+        metrics.inc("jobs.enqueued")
+
+    @staticmethod
+    def get_job(db: Session, job_id: int) -> Optional[Job]:
+        return db.query(Job).filter(Job.id == job_id).first()
+
+    @staticmethod
+    def claim_next(db: Session, worker_id: str) -> Optional[Job]:
+        """
+        Claim the next due pending job.
+
+        Returns:
+            The claimed job (status running, locked_by set to a per-claim token),
+            or None if nothing is due
+        """
+        now = datetime.utcnow()
+        candidates = db.query(Job.id).filter(
+            Job.status == JobStatus.PENDING,
+            Job.run_at <= now
+        ).order_by(Job.run_at, Job.id).limit(10).all()
+
+        for (job_id,) in candidates:
+            token = f"{worker_id}:{uuid.uuid4().hex[:8]}"
+            result = db.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.status == JobStatus.PENDING)
+                .values(
+                    status=JobStatus.RUNNING,
+                    attempts=Job.attempts + 1,
+                    locked_by=token,
+                    locked_at=now,
+                    started_at=now
+                )
+            )
+            db.commit()
+            if result.rowcount == 1:
+                return JobQueue.get_job(db, job_id)
+        return None
+
+    @staticmethod
+    def _retry_delay(attempts: int) -> float:
+        delay = min(settings.JOB_RETRY_BASE_SECONDS * 2 ** (attempts - 1), settings.JOB_RETRY_MAX_SECONDS)
+        # Jitter spreads out retries of jobs that failed together
+        return delay * random.uniform(0.5, 1.0)
+
+    @staticmethod
+    def _finish(db: Session, job: Job, values: dict) -> bool:
+        result = db.execute(
+            update(Job)
+            .where(Job.id == job.id, Job.status == JobStatus.RUNNING, Job.locked_by == job.locked_by)
+            .values(**values)
+        )
+        db.commit()
+        return result.rowcount == 1
+
+    @staticmethod
+    def run_job(db: Session, job: Job) -> bool:
+        """
+        Run a claimed job and record the outcome.
+
+        The handler gets its own session, so a failing handler cannot leave
+        the queue's session in a broken state.
+
+        Returns:
+            True if the handler succeeded
+        """
+        queued_at = max(job.run_at, job.created_at or job.run_at)
+        metrics.observe("jobs.queue_latency", max(0.0, (job.started_at - queued_at).total_seconds()))
+
+        started = time.perf_counter()
+        handler = _handlers.get(job.name)
+        handler_db = SessionLocal()
+        try:
+            if not handler:
+                raise LookupError(f"No job handler registered for '{job.name}'")
+            result = handler(handler_db, **(job.payload or {}))
+            if inspect.isawaitable(result):
+                asyncio.run(result)
+        except Exception as e:
+            handler_db.rollback()
+            elapsed = time.perf_counter() - started
+            metrics.observe(f"jobs.{job.name}.run_time", elapsed)
+
+            if job.attempts < job.max_attempts and handler:
+                delay = JobQueue._retry_delay(job.attempts)
+                JobQueue._finish(db, job, {
+                    "status": JobStatus.PENDING,
+                    "run_at": datetime.utcnow() + timedelta(seconds=delay),
+                    "locked_by": None,
+                    "locked_at": None,
+                    "last_error": f"{type(e).__name__}: {e}"
+                })
+                metrics.inc("jobs.retried")
+                logger.warning(f"Job {job.id} ({job.name}) failed attempt {job.attempts}, retrying in {delay:.0f}s: {e}")
+            else:
+                JobQueue._finish(db, job, {
+                    "status": JobStatus.FAILED,
+                    "finished_at": datetime.utcnow(),
+                    "locked_by": None,
+                    "last_error": f"{type(e).__name__}: {e}"
+                })
+                metrics.inc("jobs.failed")
+                logger.error(f"Job {job.id} ({job.name}) failed permanently after {job.attempts} attempts: {e}")
+            return False
+        finally:
+            handler_db.close()
+
+        metrics.observe(f"jobs.{job.name}.run_time", time.perf_counter() - started)
+        JobQueue._finish(db, job, {
+            "status": JobStatus.SUCCEEDED,
+            "finished_at": datetime.utcnow(),
+            "locked_by": None,
+            "last_error": None
+        })
+        metrics.inc("jobs.succeeded")
+        return True
+
+    @staticmethod
+    def run_pending(db: Session, worker_id: str = "inline", limit: Optional[int] = None) -> int:
+        """
+        Run due jobs in the calling thread until the queue is empty.
+
+        Returns:
+            Number of jobs run
+        """
+        count = 0
+        while limit is None or count < limit:
+            job = JobQueue.claim_next(db, worker_id)
+            if not job:
+                break
+            JobQueue.run_job(db, job)
+            count += 1
+        return count
+
+    @staticmethod
+    def requeue_stale_jobs(db: Session) -> int:
+        """Put jobs whose worker died mid-run back in the queue."""
+        cutoff = datetime.utcnow() - timedelta(seconds=settings.JOB_LOCK_TIMEOUT_SECONDS)
+        result = db.execute(
+            update(Job)
+            .where(Job.status == JobStatus.RUNNING, Job.locked_at < cutoff)
+            .values(status=JobStatus.PENDING, locked_by=None, locked_at=None, run_at=datetime.utcnow(),
+                    last_error="Worker timed out")
+        )
+        db.commit()
+        if result.rowcount:
+            logger.warning(f"Requeued {result.rowcount} stale jobs")
+        return result.rowcount
+
+    @staticmethod
+    def purge_finished(db: Session) -> int:
+        """
+        Delete finished jobs past the retention period, keyed or not.
+
+        A keyed job only deduplicates while it is pending, so once it has
+        finished its row is history like any other; enqueuing the key again
+        after the purge creates a fresh job.
+        """
+        cutoff = datetime.utcnow() - timedelta(days=settings.JOB_RETENTION_DAYS)
+        deleted = db.query(Job).filter(
+            Job.status.in_(FINISHED_STATUSES),
+            Job.finished_at < cutoff
+        ).delete(synchronize_session=False)
+        db.commit()
+        return deleted
+
+    @staticmethod
+    def queue_depth(db: Session) -> Dict[str, int]:
+        """Number of jobs per status (pending includes delayed retries)."""
+        rows = db.query(Job.status, func.count(Job.id)).filter(
+            Job.status.in_((JobStatus.PENDING, JobStatus.RUNNING))
+        ).group_by(Job.status).all()
+        counts = {status.value: count for status, count in rows}
+        return {status.value: counts.get(status.value, 0) for status in (JobStatus.PENDING, JobStatus.RUNNING)}
+
+
+class JobWorkerPool:
+    """
+    Pool of worker threads that run queued jobs.
+
+    CPU-heavy handlers hand their work to a process pool themselves (see the
+    image service), so threads are enough here. Several app processes (or a
+    standalone `run_job_worker.py`) can run pools against the same table.
+    """
+
+    MAINTENANCE_INTERVAL_SECONDS = 10
+
+    def __init__(self, workers: int = None, poll_interval: float = None):
+        self.workers = settings.JOB_WORKERS if workers is None else workers
+        self.poll_interval = poll_interval or settings.JOB_POLL_INTERVAL_SECONDS
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}"
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._maintenance_lock = threading.Lock()
+        self._next_maintenance = 0.0
+
+    def start(self) -> None:
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._run, args=(f"{self.worker_id}-{index}",), name=f"job-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        if self._threads:
+            logger.info(f"Started {len(self._threads)} job workers")
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._stop.set()
+        _wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _maintenance(self, db: Session) -> None:
+        if time.monotonic() < self._next_maintenance or not self._maintenance_lock.acquire(blocking=False):
+            return
+        try:
+            self._next_maintenance = time.monotonic() + self.MAINTENANCE_INTERVAL_SECONDS
+            JobQueue.requeue_stale_jobs(db)
+            JobQueue.purge_finished(db)
+            depth = JobQueue.queue_depth(db)
+            metrics.set_gauge("jobs.queue_depth", depth[JobStatus.PENDING.value])
+            metrics.set_gauge("jobs.running", depth[JobStatus.RUNNING.value])
+        finally:
+            self._maintenance_lock.release()
+
+    def _run(self, worker_id: str) -> None:
+        while not self._stop.is_set():
+            db = SessionLocal()
+            try:
+                self._maintenance(db)
+                ran = JobQueue.run_pending(db, worker_id, limit=100)
+            except Exception as e:
+                logger.error(f"Job worker {worker_id} error: {e}")
+                db.rollback()
+                ran = 0
+            finally:
+                db.close()
+
+            if not ran:
+                _wakeup.wait(self.poll_interval)
+                _wakeup.clear()
+
+
+# Global worker pool (started on application startup)
+job_workers = JobWorkerPool()
@@ -0,0 +1,228 @@
+import hashlib
+import logging
+import math
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import List, Optional, Union
+from PIL import Image
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models.course import Lesson
+from app.services.content_store import ContentStore
+from app.services.job_queue import job_handler
+from app.services.storage import get_storage
+from app.utils.helpers import static_file_path
+
+logger = logging.getLogger(__name__)
+
+PREVIEW_PREFIX = "previews"
+
+
+def _format_timestamp(seconds: float) -> str:
+    """Format seconds as a WebVTT timestamp (HH:MM:SS.mmm)."""
+    millis = int(round(seconds * 1000))
+    hours, millis = divmod(millis, 3600 * 1000)
+    minutes, millis = divmod(millis, 60 * 1000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}.{millis:03d}"
+
+
+class MediaService:
+    """Service class for video post-processing (poster frames, scrub previews)."""
+
+    @staticmethod
+    def ffmpeg_available() -> bool:
+        """Check whether ffmpeg and ffprobe are installed."""
+        return bool(shutil.which(settings.FFMPEG_PATH) and shutil.which(settings.FFPROBE_PATH))
+
+    @staticmethod
+    def probe_duration(video_path: Union[Path, str]) -> float:
+        """
+        Get the duration of a video in seconds using ffprobe.
+
+        Args:
+            video_path: Path or URL of the video file
+
+        Returns:
+            Duration in seconds
+        """
+        result = subprocess.run(
+            [
+                settings.FFPROBE_PATH, "-v", "error",
+                "-show_entries", "format=duration",
+                "-of", "default=noprint_wrappers=1:nokey=1",
+                str(video_path),
+            ],
+            capture_output=True, text=True, check=True, timeout=60,
+        )
+        return float(result.stdout.strip())
+
+    @staticmethod
+    def extract_poster(video_path: Union[Path, str], output_path: Path, duration: float) -> None:
+        """
+        Extract a single poster frame from the video.
+
+        The frame is taken a little way in (10%, at most 5s) to skip black intros.
+        """
+        offset = min(duration * 0.1, 5.0)
+        subprocess.run(
+            [
+                settings.FFMPEG_PATH, "-y", "-v", "error",
+                "-ss", f"{offset:.3f}", "-i", str(video_path),
+                "-frames:v", "1", "-vf", "scale=1280:-2", "-q:v", "3",
+                str(output_path),
+            ],
+            capture_output=True, check=True, timeout=120,
+        )
+
+    @staticmethod
+    def extract_thumbnails(video_path: Union[Path, str], output_dir: Path) -> List[Path]:
+        """
+        Extract one small thumbnail every PREVIEW_INTERVAL_SECONDS.
+
+        Only keyframes are decoded, which is much faster than decoding every frame
+        and accurate enough for scrub previews.
+
+        Returns:
+            Thumbnail paths in playback order
+        """
+        width = settings.PREVIEW_THUMB_WIDTH
+        height = settings.PREVIEW_THUMB_HEIGHT
+        video_filter = (
+            f"fps=1/{settings.PREVIEW_INTERVAL_SECONDS},"
+            f"scale={width}:{height}:force_original_aspect_ratio=decrease,"
+            f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2"
+        )
+        subprocess.run(
+            [
+                settings.FFMPEG_PATH, "-y", "-v", "error",
+                "-skip_frame", "nokey", "-i", str(video_path),
+                "-vf", video_filter, "-vsync", "vfr", "-q:v", "5",
+                str(output_dir / "thumb_%05d.jpg"),
+            ],
+            capture_output=True, check=True, timeout=1800,
+        )
+        return sorted(output_dir.glob("thumb_*.jpg"))
+
+    @staticmethod
+    def build_sprite_sheets(thumbnails: List[Path], output_dir: Path, url_prefix: str, duration: float) -> str:
+        """
+        Tile thumbnails into sprite sheets and build the WebVTT index.
+
+        Args:
+            thumbnails: Thumbnail images in playback order
+            output_dir: Directory to write sprite sheets into
+            url_prefix: Public URL prefix of output_dir
+            duration: Video duration in seconds
+
+        Returns:
+            WebVTT document mapping time ranges to sprite regions
+        """
+        width = settings.PREVIEW_THUMB_WIDTH
+        height = settings.PREVIEW_THUMB_HEIGHT
+        columns = settings.PREVIEW_SPRITE_COLUMNS
+        per_sheet = columns * settings.PREVIEW_SPRITE_ROWS
+        interval = settings.PREVIEW_INTERVAL_SECONDS
+
+        cues = ["WEBVTT", ""]
+        for sheet_index in range(math.ceil(len(thumbnails) / per_sheet)):
+            batch = thumbnails[sheet_index * per_sheet:(sheet_index + 1) * per_sheet]
+            rows = math.ceil(len(batch) / columns)
+            sheet = Image.new("RGB", (width * min(columns, len(batch)), height * rows))
+            sheet_name = f"sprite_{sheet_index}.jpg"
+
+            for position, thumb_path in enumerate(batch):
+                x, y = (position % columns) * width, (position // columns) * height
+                with Image.open(thumb_path) as thumb:
+                    sheet.paste(thumb.convert("RGB"), (x, y))
+
+                start = (sheet_index * per_sheet + position) * interval
+                end = min(start + interval, duration) if duration > start else start + interval
+                cues.append(f"{_format_timestamp(start)} --> {_format_timestamp(end)}")
+                cues.append(f"{url_prefix}/{sheet_name}#xywh={x},{y},{width},{height}")
+                cues.append("")
+
+            sheet.save(output_dir / sheet_name, "JPEG", quality=70, optimize=True, progressive=True)
+
+        return "\n".join(cues)
+
+    @staticmethod
+    def generate_lesson_previews(db: Session, lesson_id: int) -> Optional[Lesson]:
+        """
+        Generate the poster frame and scrub-preview sprites for a lesson.
+
+        Output is stored in the storage backend under
+        previews/{lesson_id}/{version}/ where the version is derived from the
+        video URL, so the URLs never change for a given video and can be cached
+        indefinitely.
+
+        Args:
+            db: Database session
+            lesson_id: Lesson ID
+
+        Returns:
+            Updated lesson, or None if there is nothing to do (lesson or video
+            gone, ffmpeg not installed)
+
+        Raises:
+            subprocess.SubprocessError, OSError, ValueError: If ffmpeg fails or
+                the video cannot be read; the job queue retries these
+        """
+        lesson = db.query(Lesson).filter(Lesson.id == lesson_id).first()
+        if not lesson:
+            logger.warning(f"Preview generation skipped: lesson {lesson_id} not found")
+            return None
+
+        # Local file, or a download URL ffmpeg can range-read from remote storage
+        video_path = ContentStore.media_source(lesson.video_url)
+        if not video_path:
+            video_path = static_file_path(lesson.video_url)
+            if not video_path or not video_path.exists():
+                logger.warning(f"Preview generation skipped: video not found for lesson {lesson_id}")
+                return None
+
+        if not MediaService.ffmpeg_available():
+            logger.warning("Preview generation skipped: ffmpeg/ffprobe not installed")
+            return None
+
+        storage = get_storage()
+        version = hashlib.sha256(lesson.video_url.encode()).hexdigest()[:12]
+        lesson_prefix = f"{PREVIEW_PREFIX}/{lesson_id}/"
+        prefix = f"{lesson_prefix}{version}"
+        url_prefix = f"/static/{prefix}"
+
+        with tempfile.TemporaryDirectory() as tmp:
+            output_dir = Path(tmp) / "output"
+            thumbnail_dir = Path(tmp) / "thumbnails"
+            output_dir.mkdir()
+            thumbnail_dir.mkdir()
+            duration = MediaService.probe_duration(video_path)
+            MediaService.extract_poster(video_path, output_dir / "poster.jpg", duration)
+            thumbnails = MediaService.extract_thumbnails(video_path, thumbnail_dir)
+            vtt = MediaService.build_sprite_sheets(thumbnails, output_dir, url_prefix, duration)
+            (output_dir / "thumbnails.vtt").write_text(vtt)
+
+            # The index last, so it never points at sprites that are not stored yet
+            outputs = sorted(output_dir.iterdir(), key=lambda path: path.name == "thumbnails.vtt")
+            for path in outputs:
+                storage.save_file(path, f"{prefix}/{path.name}")
+
+        # Remove previews of previous videos
+        for stored in list(storage.list(lesson_prefix)):
+            if not stored.key.startswith(f"{prefix}/"):
+                storage.delete(stored.key)
+
+        lesson.poster_url = f"{url_prefix}/poster.jpg"
+        lesson.thumbnails_url = f"{url_prefix}/thumbnails.vtt"
+        db.commit()
+        db.refresh(lesson)
+        logger.info(f"Generated {len(thumbnails)} preview thumbnails for lesson {lesson_id}")
+        return lesson
+
+
+@job_handler("lessons.generate_previews")
+def generate_lesson_previews_job(db: Session, lesson_id: int) -> None:
+    """Job entry point: generate previews after a lesson video upload. Failures propagate, so the job is retried."""
+    MediaService.generate_lesson_previews(db, lesson_id)
@@ -0,0 +1,345 @@
+import random
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from fastapi import HTTPException, status
+from app.config import settings
+from app.models.module import Module
+from app.models.question import Question
+from app.models.user_test_attempt import UserTestAttempt
+from app.utils.events import subscribe
+from app.utils.metrics import metrics
+
+UNATTEMPTED = "unattempted"
+INCORRECT = "incorrect"
+CORRECT = "correct"
+
+# Relative chance of a question being picked, by how the user last did on it
+WEIGHTS = {INCORRECT: 4, UNATTEMPTED: 3, CORRECT: 1}
+
+
+def _positions(mask: int) -> List[int]:
+    """Indexes of the set bits of `mask`, ascending."""
+    return [i for i, bit in enumerate(reversed(bin(mask)[2:])) if bit == "1"]
+
+
+class ModuleIndex(NamedTuple):
+    """A module's question ids in id order; bit i of a user bitset is question_ids[i]."""
+    module_id: int
+    version: int  # Changes whenever question_ids does
+    question_ids: Tuple[int, ...]
+    positions: Dict[int, int]  # question id -> bit
+    loaded_at: float
+
+    @property
+    def full(self) -> int:
+        return (1 << len(self.question_ids)) - 1
+
+
+class UserModuleBits(NamedTuple):
+    """A user's attempt state in one module, over the bits of a ModuleIndex version."""
+    index_version: int
+    attempted: int
+    incorrect: int  # Questions whose latest attempt was wrong
+    loaded_at: float
+
+    def apply(self, index: ModuleIndex, question_id: int, is_correct: bool) -> "UserModuleBits":
+        bit = 1 << index.positions[question_id]
+        incorrect = self.incorrect & ~bit if is_correct else self.incorrect | bit
+        return self._replace(attempted=self.attempted | bit, incorrect=incorrect)
+
+
+class PracticeSet(NamedTuple):
+    question_ids: List[int]
+    counts: Dict[str, int]  # Picked questions per category
+
+
+class PracticeSetGenerator:
+    """
+    Builds practice sets weighted toward questions a user has not attempted or
+    last answered wrong.
+
+    Per module, questions are numbered by their position in id order, and
+    each user's state is two integer bitsets over those positions:
+    attempted, and incorrect on the latest attempt. Both are derived from
+    the latest UserTestAttempt per question and cached, so picking a set is
+    a few bitwise operations per module rather than anti-joins over the
+    attempts table.
+
+    The cache only pays off from the second set: building a user's bitsets
+    reads the same rows the SQL version does, so a cold miss costs about
+    as much as (or somewhat more than) one SQL-built set, and a warm hit
+    about a millisecond (scripts/benchmark_practice_sets.py). Module
+    indexes are shared by all users, so a user's first set usually only
+    rebuilds their own bitsets. Attempts committed in this process
+    update cached bitsets in place ("attempts.recorded"); attempts made
+    through other processes are picked up after PRACTICE_BITSET_TTL_SECONDS.
+    Stale bits only shift the weighting, never which questions exist.
+    """
+
+    def __init__(self):
+        self._modules: "OrderedDict[int, ModuleIndex]" = OrderedDict()
+        self._bits: "OrderedDict[Tuple[int, int], UserModuleBits]" = OrderedDict()
+        self._versions = 0
+        self._lock = Lock()
+
+    def module_indexes(self, db: Session, module_ids: Iterable[int]) -> Dict[int, ModuleIndex]:
+        """
+        Question indexes of the given modules, loading stale or missing ones in one query.
+
+        Modules without questions are left out.
+        """
+        now = time.time()
+        indexes: Dict[int, ModuleIndex] = {}
+        with self._lock:
+            for module_id in set(module_ids):
+                index = self._modules.get(module_id)
+                if index and now - index.loaded_at < settings.PRACTICE_MODULE_TTL_SECONDS:
+                    indexes[module_id] = index
+            missing = set(module_ids) - indexes.keys()
+        if not missing:
+            return {module_id: index for module_id, index in indexes.items() if index.question_ids}
+
+        loaded: Dict[int, List[int]] = {module_id: [] for module_id in missing}
+        rows = db.query(Question.module_id, Question.id).filter(
+            Question.module_id.in_(missing)
+        ).order_by(Question.module_id, Question.id)
+        for module_id, question_id in rows:
+            loaded[module_id].append(question_id)
+        metrics.inc("practice.module_loads", len(missing))
+
+        with self._lock:
+            for module_id, question_ids in loaded.items():
+                question_ids = tuple(question_ids)
+                cached = self._modules.get(module_id)
+                if cached and cached.question_ids == question_ids:
+                    # Same questions: keep the version so cached user bitsets stay valid
+                    index = cached._replace(loaded_at=now)
+                else:
+                    self._versions += 1
+                    index = ModuleIndex(
+                        module_id, self._versions, question_ids,
+                        {question_id: i for i, question_id in enumerate(question_ids)}, now
+                    )
+                self._modules[module_id] = index
+                self._modules.move_to_end(module_id)
+                indexes[module_id] = index
+            while len(self._modules) > settings.PRACTICE_CACHE_MAX_ENTRIES:
+                self._modules.popitem(last=False)
+        return {module_id: index for module_id, index in indexes.items() if index.question_ids}
+
+    def user_bits(self, db: Session, user_id: int, indexes: Dict[int, ModuleIndex]) -> Dict[int, UserModuleBits]:
+        """
+        A user's bitsets for the given module indexes, loading stale or missing ones in one query.
+
+        The query returns only each question's latest attempt (by
+        attempted_at, so late offline syncs count by when they were
+        answered), ranked by a window function in the database on the
+        (user_id, module_id) index, rather than every attempt replayed here.
+
+        Args:
+            db: Database session, only used on a miss
+            user_id: User ID
+            indexes: Module indexes from module_indexes()
+
+        Returns:
+            module id -> UserModuleBits
+        """
+        now = time.time()
+        bits: Dict[int, UserModuleBits] = {}
+        with self._lock:
+            for module_id, index in indexes.items():
+                entry = self._bits.get((user_id, module_id))
+                if (entry and entry.index_version == index.version
+                        and now - entry.loaded_at < settings.PRACTICE_BITSET_TTL_SECONDS):
+                    self._bits.move_to_end((user_id, module_id))
+                    bits[module_id] = entry
+        missing = indexes.keys() - bits.keys()
+        if not missing:
+            return bits
+
+        # Only each question's latest attempt; the database picks it per question
+        latest = db.query(
+            UserTestAttempt.module_id,
+            UserTestAttempt.question_id,
+            UserTestAttempt.is_correct,
+            func.row_number().over(
+                partition_by=UserTestAttempt.question_id,
+                order_by=(UserTestAttempt.attempted_at.desc(), UserTestAttempt.id.desc())
+            ).label("recency")
+        ).filter(
+            UserTestAttempt.user_id == user_id,
+            UserTestAttempt.module_id.in_(missing)
+        ).subquery()
+        rows = db.query(latest.c.module_id, latest.c.question_id, latest.c.is_correct).filter(latest.c.recency == 1)
+        state = {module_id: [0, 0] for module_id in missing}
+        for module_id, question_id, is_correct in rows:
+            position = indexes[module_id].positions.get(question_id)
+            if position is None:
+                continue  # Question deleted or moved since the index was loaded
+            bit = 1 << position
+            state[module_id][0] |= bit
+            if not is_correct:
+                state[module_id][1] |= bit
+        metrics.inc("practice.bitset_loads", len(missing))
+
+        with self._lock:
+            for module_id, (attempted, incorrect) in state.items():
+                entry = UserModuleBits(indexes[module_id].version, attempted, incorrect, now)
+                self._bits[(user_id, module_id)] = entry
+                self._bits.move_to_end((user_id, module_id))
+                bits[module_id] = entry
+            while len(self._bits) > settings.PRACTICE_CACHE_MAX_ENTRIES:
+                self._bits.popitem(last=False)
+        return bits
+
+    def record(self, user_id: int, answers: Sequence) -> None:
+        """Apply committed graded answers to the user's cached bitsets (uncached modules are skipped)."""
+        with self._lock:
+            for answer in answers:
+                key = (user_id, answer.module_id)
+                entry = self._bits.get(key)
+                index = self._modules.get(answer.module_id)
+                if not entry or not index or entry.index_version != index.version:
+                    continue
+                if answer.question_id in index.positions:
+                    self._bits[key] = entry.apply(index, answer.question_id, answer.is_correct)
+
+    def generate(
+        self, db: Session, user_id: int, module_ids: Iterable[int], count: int,
+        rng: Optional[random.Random] = None
+    ) -> PracticeSet:
+        """
+        Pick up to `count` distinct questions from the given modules.
+
+        Every question is weighted by its category (WEIGHTS) and sampled
+        without replacement: a category pool is drawn in proportion to
+        weight x remaining questions, then a question uniformly within it.
+        Pools are the bitwise combinations of the module's full mask with the
+        user's attempted and incorrect bitsets; only drawn pools are expanded
+        to question ids.
+
+        Args:
+            db: Database session
+            user_id: User ID
+            module_ids: Modules to pick from
+            count: Number of questions wanted
+            rng: Random source (default: the random module)
+
+        Returns:
+            The PracticeSet; shorter than `count` if the modules have fewer questions
+        """
+        rng = rng or random
+        indexes = self.module_indexes(db, module_ids)
+        bits = self.user_bits(db, user_id, indexes)
+
+        # [category, module index, mask, expanded positions, remaining]
+        pools = []
+        for module_id, index in sorted(indexes.items()):
+            entry = bits[module_id]
+            attempted = entry.attempted & index.full
+            incorrect = entry.incorrect & attempted
+            for category, mask in (
+                (UNATTEMPTED, index.full & ~attempted),
+                (INCORRECT, incorrect),
+                (CORRECT, attempted & ~incorrect)
+            ):
+                if mask:
+                    pools.append([category, index, mask, None, mask.bit_count()])
+
+        picked: List[int] = []
+        counts = {UNATTEMPTED: 0, INCORRECT: 0, CORRECT: 0}
+        while len(picked) < count:
+            pools = [pool for pool in pools if pool[4]]
+            if not pools:
+                break
+            target = rng.random() * sum(WEIGHTS[pool[0]] * pool[4] for pool in pools)
+            for pool in pools:
+                target -= WEIGHTS[pool[0]] * pool[4]
+                if target < 0:
+                    break
+            category, index, mask, positions, remaining = pool
+            if positions is None:
+                positions = pool[3] = _positions(mask)
+            # Swap the pick past the end of the pool's remaining part
+            choice = rng.randrange(remaining)
+            positions[choice], positions[remaining - 1] = positions[remaining - 1], positions[choice]
+            pool[4] = remaining - 1
+            picked.append(index.question_ids[positions[remaining - 1]])
+            counts[category] += 1
+        metrics.observe("practice.set_size", len(picked))
+        return PracticeSet(picked, counts)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._modules.clear()
+            self._bits.clear()
+
+
+practice_sets = PracticeSetGenerator()
+
+
+@subscribe("attempts.recorded")
+def _record_attempts(user_id, answers, **_) -> None:
+    practice_sets.record(user_id, answers)
+
+
+class PracticeService:
+    """Service class for QBank practice sets."""
+
+    @staticmethod
+    def resolve_modules(db: Session, subject_ids: Sequence[int], module_ids: Sequence[int]) -> List[int]:
+        """
+        The modules a practice set draws from: the given modules plus every module of the given subjects.
+
+        Raises:
+            HTTPException: If nothing is selected or a module does not exist
+        """
+        if not subject_ids and not module_ids:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Select at least one subject or module")
+        selected = set()
+        if module_ids:
+            selected = {module_id for (module_id,) in db.query(Module.id).filter(Module.id.in_(set(module_ids)))}
+            missing = sorted(set(module_ids) - selected)
+            if missing:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Modules not found: {missing}")
+        if subject_ids:
+            selected.update(
+                module_id for (module_id,) in db.query(Module.id).filter(Module.subject_id.in_(set(subject_ids)))
+            )
+        return sorted(selected)
+
+    @staticmethod
+    def generate(
+        db: Session, user_id: int, count: int,
+        subject_ids: Sequence[int] = (), module_ids: Sequence[int] = ()
+    ) -> Tuple[List[Question], Dict[str, int]]:
+        """
+        Generate a practice set for a user.
+
+        Args:
+            db: Database session
+            user_id: User ID
+            count: Number of questions wanted
+            subject_ids: Subjects to draw from (all their modules)
+            module_ids: Modules to draw from
+
+        Returns:
+            The questions in pick order, and how many were picked per category
+
+        Raises:
+            HTTPException: If the selection is empty or has no questions
+        """
+        modules = PracticeService.resolve_modules(db, subject_ids, module_ids)
+        practice_set = practice_sets.generate(db, user_id, modules, count)
+        questions = {
+            question.id: question
+            for question in db.query(Question).filter(Question.id.in_(practice_set.question_ids))
+        }
+        if not questions:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No questions in the selected modules")
+        # A question deleted since its module was indexed is dropped from this set
+        return [questions[question_id] for question_id in practice_set.question_ids if question_id in questions], practice_set.counts
@@ -0,0 +1,221 @@
+import hashlib
+import operator
+import re
+import struct
+import unicodedata
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from app.models.question import Question, QuestionLSHBucket, QuestionSignature
+
+# MinHash with 32 hash functions split into 8 LSH bands of 4 rows: questions with
+# Jaccard similarity 0.8 share a bucket with ~98% probability, at 0.3 with ~6%.
+NUM_HASHES = 32
+BANDS = 8
+ROWS_PER_BAND = NUM_HASHES // BANDS
+NEAR_DUPLICATE_THRESHOLD = 0.8
+# Templated questions ("Which nerve supplies muscle #N") pile up in the same
+# buckets; only the most recent entries of a bucket are compared.
+MAX_BUCKET_CANDIDATES = 20
+
+# One blake2b-512 digest per shingle is split into 32 independent 16-bit hash
+# values, one per MinHash function. Chance collisions between 16-bit minima
+# barely move the similarity estimate and the hashing cost is halved.
+_HASH_VALUES = struct.Struct(f"<{NUM_HASHES}H")
+_SIGNATURE_FORMAT = _HASH_VALUES
+_BAND_FORMAT = struct.Struct(f"<B{ROWS_PER_BAND}H")
+
+_NON_WORD = re.compile(r"[\W_]+", re.UNICODE)
+_SQL_IN_CHUNK = 900
+
+Signature = Tuple[int, ...]
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """Case-fold and NFKC-normalize text, dropping punctuation and extra whitespace."""
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKC", str(text)).casefold()
+    return " ".join(_NON_WORD.sub(" ", text).split())
+
+
+def _options(row: dict) -> List[str]:
+    # Sorted, so the same question with shuffled options still matches
+    return sorted(normalize_text(row.get(f"option_{letter}")) for letter in "abcd")
+
+
+def question_fingerprint(row: dict) -> str:
+    """Exact-duplicate key: hash of the normalized question text and option set."""
+    payload = "\x1f".join([normalize_text(row.get("question_text"))] + _options(row))
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def shingles(row: dict) -> Set[str]:
+    """Word 3-grams of the question text plus each whole option."""
+    words = normalize_text(row.get("question_text")).split()
+    grams = {" ".join(words[i:i + 3]) for i in range(max(1, len(words) - 2))}
+    grams.update(f"option:{option}" for option in _options(row))
+    return grams
+
+
+def _shingle_hashes(shingle: str) -> Tuple[int, ...]:
+    return _HASH_VALUES.unpack(hashlib.blake2b(shingle.encode("utf-8"), digest_size=64, person=b"qdedup").digest())
+
+
+def minhash(grams: Iterable[str]) -> Signature:
+    """MinHash signature of a shingle set: the minimum of each hash function."""
+    hashed = [_shingle_hashes(gram) for gram in grams] or [_shingle_hashes("")]
+    return tuple(map(min, zip(*hashed)))
+
+
+def question_signature(row: dict) -> Signature:
+    return minhash(shingles(row))
+
+
+@lru_cache(maxsize=16384)  # Looked up several times per row during an import
+def band_buckets(signature: Signature) -> Tuple[int, ...]:
+    """One LSH bucket per band (signed 63-bit, fits a BIGINT column)."""
+    buckets = []
+    for band in range(BANDS):
+        values = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+        digest = hashlib.blake2b(_BAND_FORMAT.pack(band, *values), digest_size=8).digest()
+        buckets.append(int.from_bytes(digest, "little", signed=True) >> 1)
+    return tuple(buckets)
+
+
+def similarity(first: Signature, second: Signature) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(map(operator.eq, first, second)) / NUM_HASHES
+
+
+def pack_signature(signature: Signature) -> bytes:
+    return _SIGNATURE_FORMAT.pack(*signature)
+
+
+def unpack_signature(data: bytes) -> Signature:
+    return _SIGNATURE_FORMAT.unpack(data)
+
+
+def _chunks(items: Sequence, size: int = _SQL_IN_CHUNK):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class QuestionDedupIndex:
+    """
+    Duplicate detection over the question bank.
+
+    Exact duplicates are found through the indexed `Question.fingerprint`
+    column (one lookup per row). Near duplicates are found with MinHash + LSH:
+    each question is stored under one bucket per signature band, so a lookup
+    only compares against questions sharing a bucket instead of the whole bank.
+
+    An instance also remembers the questions added through it, so duplicates
+    within one import file are caught before they reach the database.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self._pending_fingerprints: Dict[str, int] = {}
+        self._pending_buckets: Dict[int, List[Tuple[int, Signature]]] = defaultdict(list)
+
+    def find_exact(self, fingerprints: Iterable[str]) -> Dict[str, int]:
+        """Map fingerprints that already exist in the bank to a question id."""
+        fingerprints = list(set(fingerprints))
+        found: Dict[str, int] = {}
+        for chunk in _chunks(fingerprints):
+            rows = self.db.query(Question.fingerprint, Question.id).filter(Question.fingerprint.in_(chunk))
+            for fingerprint, question_id in rows:
+                found.setdefault(fingerprint, question_id)
+        return found
+
+    def find_pending_exact(self, fingerprint: str) -> Optional[int]:
+        """Row number of an earlier row in this import with the same fingerprint."""
+        return self._pending_fingerprints.get(fingerprint)
+
+    def find_near(self, signatures: List[Signature]) -> List[Optional[Tuple[int, float]]]:
+        """
+        Best near-duplicate in the bank for each signature.
+
+        Returns:
+            (question_id, similarity) at or above NEAR_DUPLICATE_THRESHOLD, or None, per signature
+        """
+        buckets_per_row = [band_buckets(signature) for signature in signatures]
+        all_buckets = list({bucket for buckets in buckets_per_row for bucket in buckets})
+
+        candidates_by_bucket: Dict[int, List[int]] = defaultdict(list)
+        for chunk in _chunks(all_buckets):
+            rows = self.db.query(QuestionLSHBucket.bucket, QuestionLSHBucket.question_id).filter(
+                QuestionLSHBucket.bucket.in_(chunk)
+            )
+            for bucket, question_id in rows:
+                candidates_by_bucket[bucket].append(question_id)
+        for bucket, question_ids in candidates_by_bucket.items():
+            if len(question_ids) > MAX_BUCKET_CANDIDATES:
+                candidates_by_bucket[bucket] = sorted(question_ids)[-MAX_BUCKET_CANDIDATES:]
+
+        candidate_ids = list({qid for ids in candidates_by_bucket.values() for qid in ids})
+        candidate_signatures: Dict[int, Signature] = {}
+        for chunk in _chunks(candidate_ids):
+            rows = self.db.query(QuestionSignature.question_id, QuestionSignature.signature).filter(
+                QuestionSignature.question_id.in_(chunk)
+            )
+            for question_id, data in rows:
+                candidate_signatures[question_id] = unpack_signature(data)
+
+        results: List[Optional[Tuple[int, float]]] = []
+        for signature, buckets in zip(signatures, buckets_per_row):
+            best = None
+            for question_id in {qid for bucket in buckets for qid in candidates_by_bucket.get(bucket, ())}:
+                candidate = candidate_signatures.get(question_id)
+                if candidate is None:
+                    continue
+                score = similarity(signature, candidate)
+                if score >= NEAR_DUPLICATE_THRESHOLD and (best is None or score > best[1]):
+                    best = (question_id, score)
+            results.append(best)
+        return results
+
+    def find_pending_near(self, signature: Signature) -> Optional[Tuple[int, float]]:
+        """Best near-duplicate among earlier rows of this import: (row number, similarity)."""
+        candidates = {}
+        for bucket in band_buckets(signature):
+            candidates.update(self._pending_buckets.get(bucket, ())[-MAX_BUCKET_CANDIDATES:])
+        best = None
+        for row_number, candidate in candidates.items():
+            score = similarity(signature, candidate)
+            if score >= NEAR_DUPLICATE_THRESHOLD and (best is None or score > best[1]):
+                best = (row_number, score)
+        return best
+
+    def remember(self, row_number: int, fingerprint: str, signature: Signature) -> None:
+        """Track a row of the current import for in-file duplicate checks."""
+        self._pending_fingerprints.setdefault(fingerprint, row_number)
+        for bucket in band_buckets(signature):
+            self._pending_buckets[bucket].append((row_number, signature))
+
+    def add(self, entries: List[Tuple[int, Signature]]) -> None:
+        """Store signatures and LSH buckets of newly inserted questions (no commit)."""
+        if not entries:
+            return
+        # Core table inserts: eight bucket rows per question, skip the ORM bulk path
+        self.db.execute(insert(QuestionSignature.__table__), [
+            {"question_id": question_id, "signature": pack_signature(signature)}
+            for question_id, signature in entries
+        ])
+        self.db.execute(insert(QuestionLSHBucket.__table__), [
+            {"bucket": bucket, "question_id": question_id}
+            for question_id, signature in entries
+            for bucket in set(band_buckets(signature))
+        ])
+
+    @staticmethod
+    def index_question(db: Session, question: Question) -> None:
+        """Fingerprint and index a single question created outside the importer (no commit)."""
+        row = {field: getattr(question, field) for field in ("question_text", "option_a", "option_b", "option_c", "option_d")}
+        question.fingerprint = question_fingerprint(row)
+        db.query(QuestionSignature).filter(QuestionSignature.question_id == question.id).delete()
+        db.query(QuestionLSHBucket).filter(QuestionLSHBucket.question_id == question.id).delete()
+        QuestionDedupIndex(db).add([(question.id, question_signature(row))])
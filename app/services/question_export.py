@@ -0,0 +1,172 @@
+import csv
+import io
+import json
+import logging
+import time
+import zlib
+from datetime import datetime
+from typing import Callable, Iterator, List, Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.database import SessionLocal
+from app.models.module import Module
+from app.models.question import Question
+from app.models.subject import Subject
+from app.models.test import TestQuestion
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = {"csv": "text/csv", "jsonl": "application/x-ndjson"}
+EXPORT_YIELD_PER = 2000
+
+# Same headers the bulk import reads, so an export can be re-imported as is
+EXPORT_COLUMNS = [
+    "id", "module_id", "question_text", "option_a", "option_b", "option_c", "option_d",
+    "correct_answer", "explanation", "difficulty", "created_at",
+]
+TEST_EXPORT_COLUMNS = EXPORT_COLUMNS + ["order", "marks"]
+
+
+class QuestionExporter:
+    """
+    Streams questions out of the database as CSV or JSON Lines.
+
+    Rows are read through a server-side cursor (`yield_per`) and encoded one
+    partition at a time, optionally gzip-compressed on the fly, so memory use
+    does not depend on the number of questions exported.
+    """
+
+    def __init__(
+        self,
+        fmt: str = "csv",
+        course_id: Optional[int] = None,
+        subject_id: Optional[int] = None,
+        module_id: Optional[int] = None,
+        test_id: Optional[int] = None,
+        compress: bool = False,
+        session_factory: Callable[[], Session] = SessionLocal
+    ):
+        """
+        Args:
+            fmt: "csv" or "jsonl"
+            course_id: Only questions of this course's subjects
+            subject_id: Only questions of this subject's modules
+            module_id: Only questions of this module
+            test_id: Only questions linked to this test, in test order
+            compress: Gzip the output
+            session_factory: Creates the session the export reads with. The
+                response is streamed after the request's own session is closed.
+
+        Raises:
+            ValueError: If the format is not supported
+        """
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Format must be one of: {', '.join(EXPORT_FORMATS)}")
+        self.fmt = fmt
+        self.course_id = course_id
+        self.subject_id = subject_id
+        self.module_id = module_id
+        self.test_id = test_id
+        self.compress = compress
+        self.session_factory = session_factory
+        self.columns = TEST_EXPORT_COLUMNS if test_id else EXPORT_COLUMNS
+
+    @property
+    def media_type(self) -> str:
+        return "application/gzip" if self.compress else EXPORT_FORMATS[self.fmt]
+
+    @property
+    def filename(self) -> str:
+        scope = next(
+            (f"{name}-{value}" for name, value in (
+                ("test", self.test_id), ("module", self.module_id),
+                ("subject", self.subject_id), ("course", self.course_id),
+            ) if value),
+            "all"
+        )
+        return f"questions-{scope}.{self.fmt}" + (".gz" if self.compress else "")
+
+    def statement(self):
+        """Column-only SELECT (no ORM objects) for the requested filters."""
+        columns = [getattr(Question, column) for column in EXPORT_COLUMNS]
+        if self.test_id:
+            columns += [TestQuestion.order, TestQuestion.marks]
+        stmt = select(*columns)
+
+        if self.test_id:
+            stmt = stmt.join(TestQuestion, TestQuestion.question_id == Question.id).where(
+                TestQuestion.test_id == self.test_id
+            )
+        if self.subject_id or self.course_id:
+            stmt = stmt.join(Module, Module.id == Question.module_id)
+        if self.course_id:
+            stmt = stmt.join(Subject, Subject.id == Module.subject_id).where(Subject.course_id == self.course_id)
+        if self.subject_id:
+            stmt = stmt.where(Module.subject_id == self.subject_id)
+        if self.module_id:
+            stmt = stmt.where(Question.module_id == self.module_id)
+
+        if self.test_id:
+            return stmt.order_by(TestQuestion.order, TestQuestion.id)
+        return stmt.order_by(Question.id)
+
+    def _encode(self, rows: List[tuple]) -> str:
+        if self.fmt == "csv":
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(
+                [value.isoformat() if isinstance(value, datetime) else value for value in row] for row in rows
+            )
+            return buffer.getvalue()
+
+        return "".join(
+            json.dumps(dict(zip(self.columns, row)), ensure_ascii=False, default=_json_default) + "\n"
+            for row in rows
+        )
+
+    def iter_text(self) -> Iterator[str]:
+        """Header (CSV) then one encoded chunk per partition of rows."""
+        started = time.perf_counter()
+        exported = 0
+        db = self.session_factory()
+        try:
+            if self.fmt == "csv":
+                buffer = io.StringIO()
+                csv.writer(buffer).writerow(self.columns)
+                yield buffer.getvalue()
+
+            result = db.execute(self.statement().execution_options(yield_per=EXPORT_YIELD_PER))
+            for rows in result.partitions():
+                exported += len(rows)
+                yield self._encode(rows)
+        finally:
+            db.close()
+            elapsed = time.perf_counter() - started
+            metrics.inc("qbank.export.rows", exported)
+            metrics.observe("qbank.export.duration", elapsed)
+            logger.info(f"Exported {exported} questions as {self.fmt} in {elapsed:.2f}s")
+
+    def iter_bytes(self) -> Iterator[bytes]:
+        """
+        Response body chunks.
+
+        Runs in Starlette's threadpool when passed to a StreamingResponse, so
+        the blocking database reads stay off the event loop.
+        """
+        if not self.compress:
+            for text in self.iter_text():
+                yield text.encode("utf-8")
+            return
+
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # gzip container
+        for text in self.iter_text():
+            data = compressor.compress(text.encode("utf-8"))
+            if data:
+                yield data
+        yield compressor.flush()
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
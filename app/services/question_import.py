@@ -0,0 +1,450 @@
+import codecs
+import csv
+import io
+import json
+import logging
+import time
+from datetime import datetime
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session
+from app.models.module import Module
+from app.models.question import Question
+from app.services.question_dedup import QuestionDedupIndex, question_fingerprint, question_signature
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+IMPORT_BATCH_SIZE = 5000
+MAX_REPORTED_ERRORS = 1000
+MAX_REPORTED_DUPLICATES = 1000
+READ_CHUNK_SIZE = 1024 * 1024
+
+QUESTION_COLUMNS = [
+    "module_id", "question_text", "option_a", "option_b", "option_c", "option_d",
+    "correct_answer", "explanation", "difficulty", "fingerprint", "created_at",
+]
+REQUIRED_FIELDS = ["question_text", "option_a", "option_b", "option_c", "option_d", "correct_answer"]
+VALID_ANSWERS = {"A", "B", "C", "D"}
+VALID_DIFFICULTIES = {"easy", "medium", "hard"}
+
+# (row number as shown to the user, raw record)
+Record = Tuple[int, dict]
+
+
+class ImportFormatError(ValueError):
+    """The file as a whole cannot be parsed (bad JSON, missing CSV headers, ...)."""
+
+
+class RowError(ValueError):
+    """A single row is invalid; it is reported and skipped."""
+
+
+def iter_csv_records(binary_file: BinaryIO, required_headers: Iterable[str] = REQUIRED_FIELDS) -> Iterator[Record]:
+    """
+    Read CSV records one at a time from a binary file.
+
+    Row numbers count the header as row 1, matching what spreadsheets show.
+    """
+    text = io.TextIOWrapper(binary_file, encoding="utf-8-sig", newline="")
+    reader = csv.DictReader(text)
+    fieldnames = reader.fieldnames or []
+    missing = [header for header in required_headers if header not in fieldnames]
+    if missing:
+        raise ImportFormatError(f"CSV must contain headers: {', '.join(missing)}")
+
+    try:
+        for index, row in enumerate(reader):
+            yield index + 2, row
+    except (csv.Error, UnicodeDecodeError) as e:
+        raise ImportFormatError(f"Invalid CSV near line {reader.line_num}: {e}")
+    finally:
+        # Don't let the wrapper close the underlying upload file
+        text.detach()
+
+
+def iter_json_records(binary_file: BinaryIO, chunk_size: int = READ_CHUNK_SIZE) -> Iterator[Record]:
+    """
+    Read objects one at a time from a JSON array or JSON Lines file.
+
+    Only one chunk plus the object being decoded is held in memory, so large
+    files are parsed in constant space.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    pos = 0
+    eof = False
+    started = False
+    index = 0
+
+    def read_more() -> None:
+        nonlocal buffer, pos, eof
+        chunk = binary_file.read(chunk_size)
+        eof = not chunk
+        try:
+            buffer = buffer[pos:] + text_decoder.decode(chunk, final=eof)
+        except UnicodeDecodeError as e:
+            raise ImportFormatError(f"File is not valid UTF-8: {e}")
+        pos = 0
+
+    while True:
+        while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+            pos += 1
+
+        if pos >= len(buffer):
+            if eof:
+                return
+            read_more()
+            continue
+
+        if not started:
+            started = True
+            if buffer[pos] == "[":
+                pos += 1
+                continue
+        if buffer[pos] == "]":
+            return
+
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError as e:
+            if eof:
+                raise ImportFormatError(f"Invalid JSON format after item {index}: {e.msg}")
+            # The object continues in the next chunk
+            read_more()
+            continue
+
+        index += 1
+        pos = end
+        yield index, item
+
+
+def iter_question_records(binary_file: BinaryIO, filename: str) -> Iterator[Record]:
+    """Pick the record reader for an uploaded file by its extension."""
+    name = (filename or "").lower()
+    if name.endswith(".csv"):
+        return iter_csv_records(binary_file)
+    if name.endswith((".json", ".jsonl", ".ndjson")):
+        return iter_json_records(binary_file)
+    raise ImportFormatError("File must be .csv, .json or .jsonl")
+
+
+class QuestionImporter:
+    """
+    Bulk question import engine.
+
+    Records are validated and inserted in batches with set-based statements:
+    COPY on PostgreSQL (psycopg2), INSERT ... RETURNING on PostgreSQL when
+    the caller needs the new ids, a multi-row executemany INSERT elsewhere.
+    New ids (read back by fingerprint when not returned) feed the duplicate
+    index. Invalid rows are skipped and reported with their row numbers.
+
+    Every row is checked against the question bank and the rest of the file:
+    exact duplicates (same normalized text and options) are skipped, near
+    duplicates are inserted but reported.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        default_module_id: Optional[int] = None,
+        require_module: bool = True,
+        batch_size: int = IMPORT_BATCH_SIZE,
+        atomic: bool = False,
+        on_batch: Optional[Callable[[List[Record], List[int]], None]] = None,
+        skip_duplicates: bool = True,
+        reuse_duplicates: bool = False
+    ):
+        """
+        Args:
+            db: Database session
+            default_module_id: Module for rows without a module_id
+            require_module: Reject rows without any module
+            batch_size: Rows validated and inserted per statement
+            atomic: All-or-nothing: any invalid row rolls back the whole import
+            on_batch: Called with each inserted batch and its new ids, in the
+                same transaction (disables COPY)
+            skip_duplicates: Don't insert rows that exactly duplicate an
+                existing question or an earlier row of the file
+            reuse_duplicates: Pass skipped duplicates of existing questions to
+                on_batch with the existing question's id
+        """
+        self.db = db
+        self.default_module_id = default_module_id
+        self.require_module = require_module
+        self.batch_size = batch_size
+        self.atomic = atomic
+        self.on_batch = on_batch
+        self.skip_duplicates = skip_duplicates
+        self.reuse_duplicates = reuse_duplicates
+        self.dedup = QuestionDedupIndex(db)
+        self.created = 0
+        self.error_count = 0
+        self.errors: List[Tuple[int, str]] = []
+        self.duplicate_count = 0
+        self.near_duplicate_count = 0
+        # (row number, existing question id or None, earlier row number or None, similarity)
+        self.duplicates: List[Tuple[int, Optional[int], Optional[int], float]] = []
+        self.near_duplicates: List[Tuple[int, Optional[int], Optional[int], float]] = []
+        self.elapsed = 0.0
+        self._known_modules: Set[int] = set()
+        dialect = db.get_bind().dialect
+        self.use_copy = dialect.name == "postgresql" and dialect.driver == "psycopg2" and on_batch is None
+        # Ordered INSERT ... RETURNING is batched on PostgreSQL but row-at-a-time on SQLite
+        self.use_returning = dialect.name == "postgresql" and not self.use_copy
+
+    def _error(self, row_number: int, message: str) -> None:
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((row_number, message))
+
+    def validate(self, record: dict, now: datetime) -> dict:
+        """
+        Normalise one raw record into a questions row.
+
+        Raises:
+            RowError: If the record is invalid
+        """
+        if not isinstance(record, dict):
+            raise RowError("Expected an object")
+
+        row = {}
+        for field in REQUIRED_FIELDS:
+            value = record.get(field)
+            value = str(value).strip() if value is not None else ""
+            if not value:
+                raise RowError(f"{field} is required")
+            row[field] = value
+
+        row["correct_answer"] = row["correct_answer"].upper()
+        if row["correct_answer"] not in VALID_ANSWERS:
+            raise RowError("Correct answer must be A, B, C, or D")
+
+        difficulty = str(record.get("difficulty") or "medium").strip().lower()
+        if difficulty not in VALID_DIFFICULTIES:
+            raise RowError("Difficulty must be easy, medium or hard")
+        row["difficulty"] = difficulty
+
+        explanation = record.get("explanation")
+        if explanation is not None:
+            explanation = str(explanation).strip() or None
+        row["explanation"] = explanation
+
+        module_id = record.get("module_id")
+        if module_id in (None, ""):
+            module_id = self.default_module_id
+        if module_id is not None:
+            try:
+                module_id = int(module_id)
+            except (TypeError, ValueError):
+                raise RowError(f"Invalid module_id: {module_id}")
+        elif self.require_module:
+            raise RowError("module_id is required")
+        row["module_id"] = module_id
+
+        row["fingerprint"] = question_fingerprint(row)
+        row["created_at"] = now
+        return row
+
+    def _check_modules(self, batch: List[Tuple[int, dict]]) -> List[Tuple[int, dict]]:
+        """Drop rows pointing at modules that don't exist (one query per batch)."""
+        unknown = {row["module_id"] for _, row in batch if row["module_id"] is not None} - self._known_modules
+        if unknown:
+            found = {module_id for (module_id,) in self.db.query(Module.id).filter(Module.id.in_(unknown))}
+            self._known_modules |= found
+
+        valid = []
+        for row_number, row in batch:
+            if row["module_id"] is not None and row["module_id"] not in self._known_modules:
+                self._error(row_number, f"Module {row['module_id']} not found")
+            else:
+                valid.append((row_number, row))
+        return valid
+
+    def _copy(self, rows: List[dict]) -> None:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([row[column] for column in QUESTION_COLUMNS])
+        buffer.seek(0)
+
+        raw_connection = self.db.connection().connection
+        with raw_connection.cursor() as cursor:
+            cursor.copy_expert(
+                f"COPY questions ({', '.join(QUESTION_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+                buffer
+            )
+
+    def _duplicate(self, row_number: int, question_id: Optional[int], earlier_row: Optional[int], score: float) -> None:
+        self.duplicate_count += 1
+        if len(self.duplicates) < MAX_REPORTED_DUPLICATES:
+            self.duplicates.append((row_number, question_id, earlier_row, score))
+
+    def _near_duplicate(self, row_number: int, question_id: Optional[int], earlier_row: Optional[int], score: float) -> None:
+        self.near_duplicate_count += 1
+        if len(self.near_duplicates) < MAX_REPORTED_DUPLICATES:
+            self.near_duplicates.append((row_number, question_id, earlier_row, score))
+
+    def _check_duplicates(self, batch: List[Tuple[int, dict]]) -> Tuple[List[Tuple[int, dict]], List[Tuple[int, dict, int]], list]:
+        """
+        Split a batch into rows to insert and exact duplicates.
+
+        Returns:
+            (rows to insert, (row number, row, existing id) of duplicates of
+            existing questions, MinHash signatures of the rows to insert)
+        """
+        existing = self.dedup.find_exact(row["fingerprint"] for _, row in batch)
+        fresh, reused = [], []
+        seen: Dict[str, int] = {}
+        for row_number, row in batch:
+            fingerprint = row["fingerprint"]
+            earlier_row = self.dedup.find_pending_exact(fingerprint) or seen.get(fingerprint)
+            if self.skip_duplicates and fingerprint in existing:
+                self._duplicate(row_number, existing[fingerprint], None, 1.0)
+                reused.append((row_number, row, existing[fingerprint]))
+                continue
+            if self.skip_duplicates and earlier_row is not None:
+                self._duplicate(row_number, None, earlier_row, 1.0)
+                continue
+            seen.setdefault(fingerprint, row_number)
+            fresh.append((row_number, row))
+
+        signatures = [question_signature(row) for _, row in fresh]
+        for (row_number, row), signature, near in zip(fresh, signatures, self.dedup.find_near(signatures)):
+            if row["fingerprint"] in existing:
+                pass  # Exact duplicate kept on purpose (skip_duplicates=False)
+            elif near:
+                self._near_duplicate(row_number, near[0], None, near[1])
+            else:
+                earlier = self.dedup.find_pending_near(signature)
+                if earlier:
+                    self._near_duplicate(row_number, None, earlier[0], earlier[1])
+            self.dedup.remember(row_number, row["fingerprint"], signature)
+        return fresh, reused, signatures
+
+    def _inserted_ids(self, rows: List[dict], watermark: int) -> List[int]:
+        """Ids assigned to rows inserted without RETURNING, in row order."""
+        fingerprints = list({row["fingerprint"] for row in rows})
+        ids_by_fingerprint: Dict[str, List[int]] = {}
+        for start in range(0, len(fingerprints), 900):
+            found = self.db.query(Question.fingerprint, Question.id).filter(
+                Question.fingerprint.in_(fingerprints[start:start + 900]),
+                Question.id > watermark
+            ).order_by(Question.id)
+            for fingerprint, question_id in found:
+                ids_by_fingerprint.setdefault(fingerprint, []).append(question_id)
+        return [ids_by_fingerprint[row["fingerprint"]].pop(0) for row in rows]
+
+    def _insert_batch(self, batch: List[Tuple[int, dict]]) -> None:
+        batch = self._check_modules(batch)
+        if not batch:
+            return
+        batch, reused, signatures = self._check_duplicates(batch)
+
+        rows = [row for _, row in batch]
+        ids: List[int] = []
+        if rows and self.use_returning:
+            result = self.db.execute(
+                insert(Question).returning(Question.id, sort_by_parameter_order=True),
+                rows
+            )
+            ids = [question_id for (question_id,) in result]
+        elif rows:
+            watermark = self.db.query(func.coalesce(func.max(Question.id), 0)).scalar()
+            if self.use_copy:
+                self._copy(rows)
+            else:
+                self.db.execute(insert(Question), rows)
+            ids = self._inserted_ids(rows, watermark)
+        self.dedup.add(list(zip(ids, signatures)))
+
+        if self.on_batch:
+            if self.reuse_duplicates and reused:
+                # Keep file order so callers that number rows see them as uploaded
+                merged = sorted(
+                    [(row_number, row, question_id) for (row_number, row), question_id in zip(batch, ids)] + reused,
+                    key=lambda item: item[0]
+                )
+                self.on_batch([(row_number, row) for row_number, row, _ in merged], [qid for _, _, qid in merged])
+            elif batch:
+                self.on_batch(batch, ids)
+
+        self.created += len(rows)
+        if not self.atomic:
+            self.db.commit()
+
+    def run(self, records: Iterable[Record]) -> "QuestionImporter":
+        """
+        Validate and insert all records.
+
+        Raises:
+            ImportFormatError: If the file cannot be parsed (nothing from the
+                failing batch onwards is committed)
+        """
+        started = time.perf_counter()
+        now = datetime.utcnow()
+        batch: List[Tuple[int, dict]] = []
+
+        try:
+            for row_number, record in records:
+                try:
+                    row = self.validate(record, now)
+                except RowError as e:
+                    self._error(row_number, str(e))
+                    continue
+
+                if self.atomic and self.error_count:
+                    # The import will be rolled back; keep validating to report every error
+                    continue
+
+                batch.append((row_number, row))
+                if len(batch) >= self.batch_size:
+                    self._insert_batch(batch)
+                    batch = []
+
+            if batch and not (self.atomic and self.error_count):
+                self._insert_batch(batch)
+
+            if self.atomic and self.error_count:
+                self.db.rollback()
+                self.created = 0
+            else:
+                self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        finally:
+            self.elapsed = time.perf_counter() - started
+
+        metrics.inc("qbank.import.rows", self.created)
+        metrics.inc("qbank.import.errors", self.error_count)
+        metrics.inc("qbank.import.duplicates", self.duplicate_count)
+        metrics.observe("qbank.import.duration", self.elapsed)
+        logger.info(
+            f"Imported {self.created} questions ({self.error_count} errors, "
+            f"{self.duplicate_count} duplicates skipped) in {self.elapsed:.2f}s"
+        )
+        return self
+
+    @staticmethod
+    def _report(entries: List[Tuple[int, Optional[int], Optional[int], float]]) -> List[Dict]:
+        return [
+            {"row": row, "question_id": question_id, "duplicate_of_row": earlier_row, "similarity": round(score, 2)}
+            for row, question_id, earlier_row, score in sorted(entries)
+        ]
+
+    def summary(self) -> Dict:
+        """Response fields shared by the import endpoints."""
+        return {
+            "questions_created": self.created,
+            "error_count": self.error_count,
+            "errors": [f"Row {row}: {message}" for row, message in sorted(self.errors)] or None,
+            "errors_truncated": self.error_count > len(self.errors),
+            "rolled_back": self.atomic and self.error_count > 0,
+            "duplicates_skipped": self.duplicate_count,
+            "duplicates": self._report(self.duplicates),
+            "near_duplicate_count": self.near_duplicate_count,
+            "near_duplicates": self._report(self.near_duplicates),
+            "rows_per_second": round(self.created / self.elapsed) if self.elapsed else None,
+        }
@@ -0,0 +1,265 @@
+import logging
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import upsert_insert
+from app.models.question import Question
+from app.models.review import QuestionReview, ReviewDigest
+from app.services.job_queue import JobQueue, job_handler
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+DAILY_DIGEST_JOB = "reviews.daily_digest"
+
+# SM-2 parameters
+INITIAL_EASE = 2.5
+MIN_EASE = 1.3
+CORRECT_QUALITY = 4  # "Correct after hesitation"; attempts carry no self-grading
+INCORRECT_QUALITY = 1
+
+
+class Review(NamedTuple):
+    """One graded answer to a question, as input to the scheduler."""
+    question_id: int
+    module_id: int
+    is_correct: bool
+    reviewed_at: datetime
+
+
+class ReviewState(NamedTuple):
+    ease_factor: float
+    interval_days: int
+    repetitions: int
+    lapses: int
+    due_at: datetime
+
+
+def schedule(state: Optional[ReviewState], is_correct: bool, reviewed_at: datetime) -> ReviewState:
+    """
+    Next SM-2 state after a review.
+
+    A correct answer grows the interval (1 day, 6 days, then interval x
+    ease factor); a wrong one restarts at 1 day and counts a lapse. The
+    ease factor moves with the answer quality and never drops below 1.3.
+
+    Args:
+        state: Current state, None for a question not yet in the queue
+        is_correct: Whether the answer was correct
+        reviewed_at: When the answer was given
+
+    Returns:
+        The new state
+    """
+    state = state or ReviewState(INITIAL_EASE, 0, 0, 0, reviewed_at)
+    quality = CORRECT_QUALITY if is_correct else INCORRECT_QUALITY
+    ease = max(MIN_EASE, state.ease_factor + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+    if is_correct:
+        repetitions = state.repetitions + 1
+        if repetitions == 1:
+            interval = 1
+        elif repetitions == 2:
+            interval = 6
+        else:
+            interval = round(state.interval_days * state.ease_factor)
+        lapses = state.lapses
+    else:
+        repetitions = 0
+        interval = 1
+        lapses = state.lapses + 1
+    return ReviewState(round(ease, 4), interval, repetitions, lapses, reviewed_at + timedelta(days=interval))
+
+
+def _next_digest_delay(now: datetime) -> float:
+    """Seconds from `now` until the next REVIEW_DIGEST_HOUR (UTC)."""
+    run_at = datetime.combine(now.date(), time(settings.REVIEW_DIGEST_HOUR))
+    if run_at <= now:
+        run_at += timedelta(days=1)
+    return (run_at - now).total_seconds()
+
+
+class ReviewService:
+    """Service class for the spaced-repetition review queue."""
+
+    @staticmethod
+    def record(db: Session, user_id: int, reviews: Sequence[Review]) -> int:
+        """
+        Reschedule the reviewed questions of one user. Does not commit.
+
+        Wrong answers add the question to the queue; answers to questions
+        not in the queue that are correct are ignored. Reviews older than the
+        stored state (late offline sync) are skipped. One read of the
+        existing states and one multi-row upsert.
+
+        Args:
+            db: Database session
+            user_id: User ID
+            reviews: Graded answers, in any order
+
+        Returns:
+            Number of review states written
+        """
+        if not reviews:
+            return 0
+        stored = db.query(QuestionReview).filter(
+            QuestionReview.user_id == user_id,
+            QuestionReview.question_id.in_({review.question_id for review in reviews})
+        )
+        states: Dict[int, ReviewState] = {}
+        reviewed_at: Dict[int, datetime] = {}
+        for row in stored:
+            states[row.question_id] = ReviewState(row.ease_factor, row.interval_days, row.repetitions, row.lapses, row.due_at)
+            reviewed_at[row.question_id] = row.last_reviewed_at or row.created_at
+        module_ids: Dict[int, int] = {}
+        for review in sorted(reviews, key=lambda review: review.reviewed_at):
+            current = states.get(review.question_id)
+            if current is None and review.is_correct:
+                continue
+            if current is not None and review.reviewed_at < reviewed_at[review.question_id]:
+                continue
+            states[review.question_id] = schedule(current, review.is_correct, review.reviewed_at)
+            reviewed_at[review.question_id] = review.reviewed_at
+            module_ids[review.question_id] = review.module_id
+        if not module_ids:
+            return 0
+
+        now = datetime.utcnow()
+        rows = []
+        for question_id, module_id in module_ids.items():
+            state = states[question_id]
+            rows.append({
+                "user_id": user_id,
+                "question_id": question_id,
+                "module_id": module_id,
+                "ease_factor": state.ease_factor,
+                "interval_days": state.interval_days,
+                "repetitions": state.repetitions,
+                "lapses": state.lapses,
+                "due_at": state.due_at,
+                "last_reviewed_at": reviewed_at[question_id],
+                "created_at": now
+            })
+        table = QuestionReview.__table__
+        statement = upsert_insert(db)(table).values(rows)
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.user_id, table.c.question_id],
+            set_={
+                column: statement.excluded[column]
+                for column in ("ease_factor", "interval_days", "repetitions", "lapses", "due_at", "last_reviewed_at")
+            }
+        )
+        db.execute(statement)
+        metrics.inc("reviews.scheduled", len(rows))
+        return len(rows)
+
+    @staticmethod
+    def get_due(db: Session, user_id: int, limit: int = 20, now: Optional[datetime] = None) -> List[Tuple[QuestionReview, Question]]:
+        """
+        The user's reviews due at `now`, most overdue first.
+
+        One range read on the (user_id, due_at) index, stopping after `limit` rows.
+
+        Returns:
+            (review state, question) pairs
+        """
+        now = now or datetime.utcnow()
+        return db.query(QuestionReview, Question).join(
+            Question, Question.id == QuestionReview.question_id
+        ).filter(
+            QuestionReview.user_id == user_id,
+            QuestionReview.due_at <= now
+        ).order_by(QuestionReview.due_at).limit(limit).all()
+
+    @staticmethod
+    def next_due_at(db: Session, user_id: int, now: Optional[datetime] = None) -> Optional[datetime]:
+        """When the user's next review that is not yet due becomes due (one index seek)."""
+        now = now or datetime.utcnow()
+        return db.query(func.min(QuestionReview.due_at)).filter(
+            QuestionReview.user_id == user_id,
+            QuestionReview.due_at > now
+        ).scalar()
+
+    @staticmethod
+    def get_digest(db: Session, user_id: int, for_date: Optional[date] = None) -> Optional[ReviewDigest]:
+        """The user's digest for `for_date` (default: today, UTC), if the daily job has written it."""
+        for_date = for_date or datetime.utcnow().date()
+        return db.query(ReviewDigest).filter(
+            ReviewDigest.user_id == user_id,
+            ReviewDigest.for_date == for_date
+        ).first()
+
+    @staticmethod
+    def generate_digests(db: Session, for_date: Optional[date] = None, batch_size: Optional[int] = None) -> int:
+        """
+        Write every user's review digest for a day, in batches of users.
+
+        Each batch is one keyset read of the next user ids on the
+        (user_id, due_at) index, one grouped count over those users' review
+        states and one upsert of their digests, committed on its own.
+
+        Args:
+            db: Database session
+            for_date: Day to count reviews for (default: today, UTC)
+            batch_size: Users per batch (default: REVIEW_DIGEST_BATCH_SIZE)
+
+        Returns:
+            Number of digests written
+        """
+        for_date = for_date or datetime.utcnow().date()
+        batch_size = batch_size or settings.REVIEW_DIGEST_BATCH_SIZE
+        cutoff = datetime.combine(for_date + timedelta(days=1), time.min)
+        written = 0
+        last_user_id = 0
+        while True:
+            user_ids = [
+                user_id for (user_id,) in db.query(QuestionReview.user_id).filter(
+                    QuestionReview.user_id > last_user_id
+                ).distinct().order_by(QuestionReview.user_id).limit(batch_size)
+            ]
+            if not user_ids:
+                break
+            rows = db.query(
+                QuestionReview.user_id,
+                func.sum(case((QuestionReview.due_at < cutoff, 1), else_=0)),
+                func.min(QuestionReview.due_at)
+            ).filter(QuestionReview.user_id.in_(user_ids)).group_by(QuestionReview.user_id)
+            now = datetime.utcnow()
+            digests = [
+                {"user_id": user_id, "for_date": for_date, "due_count": due_count,
+                 "next_due_at": next_due_at, "generated_at": now}
+                for user_id, due_count, next_due_at in rows
+            ]
+            table = ReviewDigest.__table__
+            statement = upsert_insert(db)(table).values(digests)
+            statement = statement.on_conflict_do_update(
+                index_elements=[table.c.user_id],
+                set_={column: statement.excluded[column] for column in ("for_date", "due_count", "next_due_at", "generated_at")}
+            )
+            db.execute(statement)
+            db.commit()
+            written += len(digests)
+            last_user_id = user_ids[-1]
+            if len(user_ids) < batch_size:
+                break
+        metrics.inc("reviews.digests", written)
+        logger.info(f"Generated {written} review digests for {for_date}")
+        return written
+
+    @staticmethod
+    def schedule_daily_digest(db: Session, delay_seconds: Optional[float] = None):
+        """(Re)schedule the daily digest job, by default for the next REVIEW_DIGEST_HOUR (one keyed job)."""
+        if delay_seconds is None:
+            delay_seconds = _next_digest_delay(datetime.utcnow())
+        return JobQueue.enqueue(
+            db, DAILY_DIGEST_JOB, idempotency_key="reviews:daily-digest",
+            requeue=True, delay_seconds=delay_seconds
+        )
+
+
+@job_handler(DAILY_DIGEST_JOB)
+def daily_digest_job(db: Session) -> None:
+    """Job entry point: write today's review digests, then run again tomorrow."""
+    ReviewService.schedule_daily_digest(db)
+    ReviewService.generate_digests(db)
@@ -0,0 +1,300 @@
+import logging
+import mimetypes
+import os
+import shutil
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from threading import Lock
+from typing import Iterator, NamedTuple, Optional
+from app.config import settings
+from app.utils.helpers import STATIC_DIR
+
+logger = logging.getLogger(__name__)
+
+READ_BLOCK_SIZE = 64 * 1024
+
+
+class StoredFile(NamedTuple):
+    """Metadata of a stored object."""
+    key: str
+    size: int
+    modified_at: datetime
+
+
+class StorageBackend:
+    """
+    Interface for where uploaded files live.
+
+    Keys are relative paths such as "cas/ab/<sha256>.mp4". Public URLs stay
+    "/static/<key>" for every backend so database rows do not depend on where
+    the bytes are stored.
+    """
+
+    name = "base"
+
+    def exists(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def stat(self, key: str) -> Optional[StoredFile]:
+        """Size and modification time of an object, or None if it does not exist."""
+        raise NotImplementedError
+
+    def save_file(self, local_path: Path, key: str) -> None:
+        """Store a local file under `key`. The local file is consumed."""
+        raise NotImplementedError
+
+    def touch(self, key: str) -> None:
+        """Refresh an object's modification time."""
+        raise NotImplementedError
+
+    def iter_range(self, key: str, start: int, end: int, block_size: int = READ_BLOCK_SIZE) -> Iterator[bytes]:
+        """Yield bytes start..end (inclusive) of an object in blocks."""
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def list(self, prefix: str) -> Iterator[StoredFile]:
+        """List all objects whose key starts with `prefix`."""
+        raise NotImplementedError
+
+    def local_path(self, key: str) -> Optional[Path]:
+        """Local filesystem path of an object, if the backend has one."""
+        return None
+
+    def download_url(self, key: str) -> Optional[str]:
+        """Direct URL clients (or ffmpeg) can fetch the object from, if any."""
+        return None
+
+
+class LocalStorage(StorageBackend):
+    """
+    Files under the static/ directory, served by the /static mount.
+
+    Files are first moved into a staging directory under the root, then
+    renamed into place, so a key only ever names a complete file even when
+    the source (UPLOAD_STAGING_DIR) is on another filesystem and the move
+    is a copy.
+    """
+
+    name = "local"
+    STAGING_DIR = ".staging"
+
+    def __init__(self, root: Path = STATIC_DIR):
+        self.root = root
+
+    def local_path(self, key: str) -> Path:
+        return self.root / key
+
+    def exists(self, key: str) -> bool:
+        return self.local_path(key).is_file()
+
+    def stat(self, key: str) -> Optional[StoredFile]:
+        try:
+            result = self.local_path(key).stat()
+        except FileNotFoundError:
+            return None
+        return StoredFile(key=key, size=result.st_size, modified_at=datetime.utcfromtimestamp(result.st_mtime))
+
+    def save_file(self, local_path: Path, key: str) -> None:
+        destination = self.local_path(key)
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        staging = self.root / self.STAGING_DIR
+        staging.mkdir(parents=True, exist_ok=True)
+        staged = staging / f"{uuid.uuid4().hex}{destination.suffix}"
+        try:
+            shutil.move(str(local_path), str(staged))
+            os.replace(staged, destination)
+        except Exception:
+            staged.unlink(missing_ok=True)
+            raise
+
+    def touch(self, key: str) -> None:
+        os.utime(self.local_path(key))
+
+    def iter_range(self, key: str, start: int, end: int, block_size: int = READ_BLOCK_SIZE) -> Iterator[bytes]:
+        with open(self.local_path(key), "rb") as f:
+            f.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                data = f.read(min(block_size, remaining))
+                if not data:
+                    break
+                remaining -= len(data)
+                yield data
+
+    def delete(self, key: str) -> None:
+        self.local_path(key).unlink(missing_ok=True)
+
+    def list(self, prefix: str) -> Iterator[StoredFile]:
+        base = self.root / prefix
+        if not base.is_dir():
+            return
+        for path in base.rglob("*"):
+            if path.is_file():
+                stored = self.stat(path.relative_to(self.root).as_posix())
+                if stored:
+                    yield stored
+
+
+class S3Storage(StorageBackend):
+    """
+    S3-compatible object storage (AWS S3, MinIO, moto).
+
+    Large files are sent as multipart uploads whose parts are transferred in
+    parallel on a thread pool (S3_MULTIPART_CONCURRENCY workers), and reads use
+    ranged GETs so seeking in a video only transfers the requested bytes.
+    """
+
+    name = "s3"
+
+    # Stored objects are immutable, so their sizes can be cached for range requests
+    STAT_CACHE_SIZE = 4096
+
+    def __init__(self):
+        import boto3
+        from boto3.s3.transfer import TransferConfig
+        from botocore.config import Config
+
+        if not settings.AWS_S3_BUCKET:
+            raise RuntimeError("STORAGE_BACKEND=s3 requires AWS_S3_BUCKET")
+
+        self.bucket = settings.AWS_S3_BUCKET
+        self.client = boto3.client(
+            "s3",
+            region_name=settings.AWS_REGION,
+            endpoint_url=settings.AWS_S3_ENDPOINT_URL or None,
+            aws_access_key_id=settings.AWS_ACCESS_KEY_ID or None,
+            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY or None,
+            config=Config(max_pool_connections=max(10, settings.S3_MULTIPART_CONCURRENCY * 2)),
+        )
+        self.transfer_config = TransferConfig(
+            multipart_threshold=settings.S3_MULTIPART_THRESHOLD,
+            multipart_chunksize=settings.S3_MULTIPART_CHUNK_SIZE,
+            max_concurrency=settings.S3_MULTIPART_CONCURRENCY,
+            use_threads=True,
+        )
+        self._stat_cache: "OrderedDict[str, StoredFile]" = OrderedDict()
+        self._stat_lock = Lock()
+
+    @staticmethod
+    def content_type(key: str) -> str:
+        """Content type objects are stored (and later served) with."""
+        return mimetypes.guess_type(key)[0] or "application/octet-stream"
+
+    @staticmethod
+    def _is_missing(error) -> bool:
+        code = error.response.get("Error", {}).get("Code")
+        return code in ("404", "NoSuchKey", "NotFound")
+
+    def exists(self, key: str) -> bool:
+        return self.stat(key) is not None
+
+    def stat(self, key: str) -> Optional[StoredFile]:
+        from botocore.exceptions import ClientError
+
+        with self._stat_lock:
+            cached = self._stat_cache.get(key)
+            if cached:
+                self._stat_cache.move_to_end(key)
+                return cached
+
+        try:
+            head = self.client.head_object(Bucket=self.bucket, Key=key)
+        except ClientError as e:
+            if self._is_missing(e):
+                return None
+            raise
+
+        stored = StoredFile(
+            key=key,
+            size=head["ContentLength"],
+            modified_at=head["LastModified"].replace(tzinfo=None),
+        )
+        with self._stat_lock:
+            self._stat_cache[key] = stored
+            if len(self._stat_cache) > self.STAT_CACHE_SIZE:
+                self._stat_cache.popitem(last=False)
+        return stored
+
+    def _forget(self, key: str) -> None:
+        with self._stat_lock:
+            self._stat_cache.pop(key, None)
+
+    def save_file(self, local_path: Path, key: str) -> None:
+        # upload_file switches to a parallel multipart upload above the threshold
+        # and aborts the multipart upload if any part fails.
+        self.client.upload_file(
+            str(local_path), self.bucket, key,
+            ExtraArgs={"ContentType": self.content_type(key)}, Config=self.transfer_config
+        )
+        self._forget(key)
+        local_path.unlink(missing_ok=True)
+
+    def touch(self, key: str) -> None:
+        from botocore.exceptions import ClientError
+
+        try:
+            # Server-side copy onto itself bumps LastModified without moving data through us.
+            # S3 refuses a self-copy that changes nothing, so the metadata is replaced,
+            # re-supplying the content type it would otherwise drop.
+            self.client.copy_object(
+                Bucket=self.bucket, Key=key,
+                CopySource={"Bucket": self.bucket, "Key": key},
+                MetadataDirective="REPLACE",
+                ContentType=self.content_type(key),
+            )
+            self._forget(key)
+        except ClientError as e:
+            # Single-request copies are limited to 5GB; the GC grace period still applies
+            logger.warning(f"Could not refresh modification time of {key}: {e}")
+
+    def iter_range(self, key: str, start: int, end: int, block_size: int = READ_BLOCK_SIZE) -> Iterator[bytes]:
+        response = self.client.get_object(Bucket=self.bucket, Key=key, Range=f"bytes={start}-{end}")
+        body = response["Body"]
+        try:
+            for data in body.iter_chunks(block_size):
+                yield data
+        finally:
+            body.close()
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+        self._forget(key)
+
+    def list(self, prefix: str) -> Iterator[StoredFile]:
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+            for item in page.get("Contents", []):
+                yield StoredFile(
+                    key=item["Key"],
+                    size=item["Size"],
+                    modified_at=item["LastModified"].replace(tzinfo=None),
+                )
+
+    def download_url(self, key: str) -> Optional[str]:
+        if settings.AWS_S3_PUBLIC_URL:
+            return f"{settings.AWS_S3_PUBLIC_URL.rstrip('/')}/{key}"
+        return self.client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": self.bucket, "Key": key},
+            ExpiresIn=settings.STREAM_URL_TTL_SECONDS,
+        )
+
+
+STORAGE_BACKENDS = {
+    LocalStorage.name: LocalStorage,
+    S3Storage.name: S3Storage,
+}
+
+
+@lru_cache()
+def get_storage() -> StorageBackend:
+    """Return the configured storage backend (STORAGE_BACKEND setting)."""
+    backend = STORAGE_BACKENDS.get(settings.STORAGE_BACKEND)
+    if not backend:
+        raise RuntimeError(f"Unknown STORAGE_BACKEND: {settings.STORAGE_BACKEND}")
+    return backend()
@@ -0,0 +1,297 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Sequence, Set
+from sqlalchemy import insert, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from fastapi import HTTPException, status
+from app.config import settings
+from app.database import upsert_insert
+from app.models.bookmark import LessonBookmark
+from app.models.course import Lesson
+from app.models.lesson_progress import LessonProgress
+from app.models.sync_receipt import SyncReceipt
+from app.schemas.sync import BookmarkEvent, LessonProgressEvent, QuestionAttemptEvent, SyncEventResult
+from app.services.attempt_service import Answer, AttemptService
+from app.services.job_queue import JobQueue, job_handler
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+APPLIED = "applied"
+STALE = "stale"
+REJECTED = "rejected"
+DUPLICATE = "duplicate"
+
+PURGE_RECEIPTS_JOB = "sync.purge_receipts"
+PURGE_INTERVAL_SECONDS = 86400
+
+
+def _event_time(event, now: datetime) -> datetime:
+    """Client timestamp as naive UTC, clamped to the server clock (device clocks run ahead)."""
+    value = event.client_timestamp
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return min(value, now)
+
+
+class SyncService:
+    """Applies batches of offline events (lesson progress, QBank attempts, bookmarks)."""
+
+    @staticmethod
+    def apply(db: Session, user_id: int, events: Sequence) -> List[SyncEventResult]:
+        """
+        Apply a batch of offline events in one transaction.
+
+        Events whose idempotency key was already applied return the stored
+        result (status "duplicate") and are not applied again. Progress is
+        last-write-wins per lesson by client timestamp: one multi-row upsert
+        that only overwrites rows older than the event. Attempts and
+        bookmarks are bulk inserted. Every new event gets a receipt in the
+        same transaction, so a batch replayed after a lost response is safe.
+
+        Args:
+            db: Database session
+            user_id: User ID
+            events: Parsed sync events, in client order
+
+        Returns:
+            One result per event, in request order
+
+        Raises:
+            HTTPException: 409 if a concurrent request is applying the same keys
+        """
+        now = datetime.utcnow()
+        results: List[Optional[SyncEventResult]] = [None] * len(events)
+
+        # Replays: keys seen earlier in this batch or stored by a previous sync
+        keys = {event.idempotency_key for event in events}
+        stored = {
+            receipt.idempotency_key: receipt
+            for receipt in db.query(SyncReceipt).filter(
+                SyncReceipt.user_id == user_id,
+                SyncReceipt.idempotency_key.in_(keys)
+            )
+        }
+        pending: Dict[str, List[int]] = {"lesson_progress": [], "question_attempt": [], "bookmark": []}
+        first_index: Dict[str, int] = {}
+        for index, event in enumerate(events):
+            key = event.idempotency_key
+            receipt = stored.get(key)
+            if receipt:
+                results[index] = SyncEventResult(
+                    idempotency_key=key, type=receipt.event_type, status=DUPLICATE,
+                    detail=f"Already {receipt.status}", data=receipt.result
+                )
+            elif key in first_index:
+                results[index] = SyncEventResult(
+                    idempotency_key=key, type=event.type, status=DUPLICATE, detail="Repeated in this batch"
+                )
+            else:
+                first_index[key] = index
+                pending[event.type].append(index)
+
+        courses = SyncService._apply_progress(db, user_id, events, pending["lesson_progress"], results, now)
+        SyncService._apply_attempts(db, user_id, events, pending["question_attempt"], results, now)
+        SyncService._apply_bookmarks(db, user_id, events, pending["bookmark"], results, now)
+
+        receipts = [
+            {
+                "user_id": user_id,
+                "idempotency_key": results[index].idempotency_key,
+                "event_type": results[index].type,
+                "status": results[index].status,
+                "result": results[index].data,
+                "created_at": now
+            }
+            for index in first_index.values()
+        ]
+        if receipts:
+            db.execute(insert(SyncReceipt.__table__), receipts)
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Another sync with the same idempotency keys is in progress, retry"
+            )
+
+        # Same coalescing recalculation as a single progress update
+        for course_id in courses:
+            JobQueue.enqueue(
+                db, "lessons.update_course_progress",
+                {"user_id": user_id, "course_id": course_id},
+                idempotency_key=f"course-progress:{user_id}:{course_id}",
+                requeue=True
+            )
+
+        for result in results:
+            metrics.inc(f"sync.events.{result.status}")
+        return results
+
+    @staticmethod
+    def _apply_progress(
+        db: Session, user_id: int, events: Sequence, indexes: List[int],
+        results: List[Optional[SyncEventResult]], now: datetime
+    ) -> Set[int]:
+        """Upsert lesson progress, last write wins. Returns the affected course ids."""
+        if not indexes:
+            return set()
+        lesson_ids = {events[index].lesson_id for index in indexes}
+        lesson_courses = dict(db.query(Lesson.id, Lesson.course_id).filter(Lesson.id.in_(lesson_ids)))
+
+        # Latest event per lesson; older ones in the same batch lose outright
+        latest: Dict[int, int] = {}
+        for index in indexes:
+            event: LessonProgressEvent = events[index]
+            if event.lesson_id not in lesson_courses:
+                results[index] = SyncEventResult(
+                    idempotency_key=event.idempotency_key, type=event.type, status=REJECTED, detail="Lesson not found"
+                )
+                continue
+            current = latest.get(event.lesson_id)
+            if current is not None and _event_time(events[current], now) > _event_time(event, now):
+                loser = index
+            else:
+                latest[event.lesson_id] = index
+                loser = current
+            if loser is not None:
+                results[loser] = SyncEventResult(
+                    idempotency_key=events[loser].idempotency_key, type=event.type, status=STALE,
+                    detail="Superseded by a later event in this batch"
+                )
+        if not latest:
+            return set()
+
+        rows = []
+        for lesson_id, index in latest.items():
+            event = events[index]
+            rows.append({
+                "user_id": user_id,
+                "lesson_id": lesson_id,
+                "course_id": lesson_courses[lesson_id],
+                "watch_time": event.watch_time,
+                "last_position": event.last_position,
+                "completed": event.completed,
+                "last_watched_at": _event_time(event, now),
+                "created_at": now
+            })
+        table = LessonProgress.__table__
+        statement = upsert_insert(db)(table).values(rows)
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.user_id, table.c.lesson_id],
+            set_={
+                "watch_time": statement.excluded.watch_time,
+                "last_position": statement.excluded.last_position,
+                "completed": statement.excluded.completed,
+                "last_watched_at": statement.excluded.last_watched_at
+            },
+            where=or_(table.c.last_watched_at == None, table.c.last_watched_at <= statement.excluded.last_watched_at)
+        ).returning(table.c.lesson_id)
+        written = set(db.execute(statement).scalars())
+
+        for lesson_id, index in latest.items():
+            event = events[index]
+            if lesson_id in written:
+                results[index] = SyncEventResult(
+                    idempotency_key=event.idempotency_key, type=event.type, status=APPLIED,
+                    data={"lesson_id": lesson_id, "completed": event.completed, "watch_time": event.watch_time}
+                )
+            else:
+                results[index] = SyncEventResult(
+                    idempotency_key=event.idempotency_key, type=event.type, status=STALE,
+                    detail="A newer update is already stored"
+                )
+        return {lesson_courses[lesson_id] for lesson_id in written}
+
+    @staticmethod
+    def _apply_attempts(
+        db: Session, user_id: int, events: Sequence, indexes: List[int],
+        results: List[Optional[SyncEventResult]], now: datetime
+    ) -> None:
+        """Grade and record QBank attempts with one answer-key query and one insert."""
+        if not indexes:
+            return
+        key = AttemptService.answer_key(db, [events[index].question_id for index in indexes])
+        answers = [
+            Answer(events[index].question_id, events[index].selected_answer, events[index].time_taken,
+                   _event_time(events[index], now))
+            for index in indexes
+        ]
+        for index, graded in zip(indexes, AttemptService.record(db, user_id, answers, key)):
+            event: QuestionAttemptEvent = events[index]
+            if graded is None:
+                results[index] = SyncEventResult(
+                    idempotency_key=event.idempotency_key, type=event.type, status=REJECTED, detail="Question not found"
+                )
+                continue
+            results[index] = SyncEventResult(
+                idempotency_key=event.idempotency_key, type=event.type, status=APPLIED,
+                data={
+                    "question_id": graded.question_id,
+                    "is_correct": graded.is_correct,
+                    "correct_answer": graded.correct_answer,
+                    "explanation": graded.explanation,
+                    "selected_answer": graded.selected_answer
+                }
+            )
+
+    @staticmethod
+    def _apply_bookmarks(
+        db: Session, user_id: int, events: Sequence, indexes: List[int],
+        results: List[Optional[SyncEventResult]], now: datetime
+    ) -> None:
+        """Create bookmarks in one flush."""
+        if not indexes:
+            return
+        lesson_ids = {events[index].lesson_id for index in indexes}
+        existing = {lesson_id for (lesson_id,) in db.query(Lesson.id).filter(Lesson.id.in_(lesson_ids))}
+        created = []
+        for index in indexes:
+            event: BookmarkEvent = events[index]
+            if event.lesson_id not in existing:
+                results[index] = SyncEventResult(
+                    idempotency_key=event.idempotency_key, type=event.type, status=REJECTED, detail="Lesson not found"
+                )
+                continue
+            bookmark = LessonBookmark(
+                user_id=user_id,
+                lesson_id=event.lesson_id,
+                timestamp=event.timestamp,
+                note=event.note,
+                created_at=_event_time(event, now)
+            )
+            created.append((index, bookmark))
+        db.add_all([bookmark for _, bookmark in created])
+        db.flush()
+        for index, bookmark in created:
+            results[index] = SyncEventResult(
+                idempotency_key=events[index].idempotency_key, type=events[index].type, status=APPLIED,
+                data={"id": bookmark.id, "lesson_id": bookmark.lesson_id, "timestamp": bookmark.timestamp}
+            )
+
+    @staticmethod
+    def purge_receipts(db: Session) -> int:
+        """Delete receipts past the retention period."""
+        cutoff = datetime.utcnow() - timedelta(days=settings.SYNC_RECEIPT_RETENTION_DAYS)
+        deleted = db.query(SyncReceipt).filter(SyncReceipt.created_at < cutoff).delete(synchronize_session=False)
+        db.commit()
+        return deleted
+
+    @staticmethod
+    def schedule_receipt_purge(db: Session, delay_seconds: float = 0):
+        """(Re)schedule the daily receipt purge job (one keyed job shared by all processes)."""
+        return JobQueue.enqueue(
+            db, PURGE_RECEIPTS_JOB, idempotency_key="sync:purge-receipts",
+            requeue=True, delay_seconds=delay_seconds
+        )
+
+
+@job_handler(PURGE_RECEIPTS_JOB)
+def purge_receipts_job(db: Session) -> None:
+    """Job entry point: purge old sync receipts, then run again in a day."""
+    SyncService.schedule_receipt_purge(db, delay_seconds=PURGE_INTERVAL_SECONDS)
+    deleted = SyncService.purge_receipts(db)
+    if deleted:
+        logger.info(f"Purged {deleted} sync receipts")
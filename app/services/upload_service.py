@@ -0,0 +1,250 @@
+import logging
+import os
+import shutil
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import AsyncIterable, AsyncIterator, List
+from fastapi import HTTPException, status
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import ClientDisconnect
+from app.config import settings
+from app.models.course import Lesson
+from app.models.upload_session import UploadSession
+from app.services.content_store import ContentStore, StoredObject
+from app.utils.uploads import UPLOAD_CHUNK_SIZE, require_extension, save_stream
+
+logger = logging.getLogger(__name__)
+
+
+class ResumableUploadService:
+    """
+    Service class for resumable (tus-style) lesson video uploads.
+
+    Every PATCH is stored as its own chunk file named after its starting offset.
+    The offset only advances through a conditional UPDATE, so concurrent or
+    retried PATCH requests for the same offset cannot both be accepted.
+    Once all bytes have arrived, the chunks are concatenated (and hashed) into
+    the final video file. A PATCH cut off by a client disconnect still keeps
+    the bytes that arrived, so the client resumes from there.
+    """
+
+    @staticmethod
+    def _upload_dir(upload_id: str) -> Path:
+        return Path(settings.RESUMABLE_UPLOAD_DIR) / upload_id
+
+    @staticmethod
+    def _chunk_paths(upload_id: str) -> List[Path]:
+        return sorted(ResumableUploadService._upload_dir(upload_id).glob("*.chunk"))
+
+    @staticmethod
+    def create_upload(db: Session, lesson_id: int, filename: str, upload_length: int, user_id: int) -> UploadSession:
+        """
+        Start a resumable upload for a lesson video.
+
+        Args:
+            db: Database session
+            lesson_id: Lesson the video belongs to
+            filename: Original file name (used for the extension)
+            upload_length: Total size in bytes
+            user_id: Uploading admin
+
+        Returns:
+            Created upload session
+        """
+        lesson = db.query(Lesson).filter(Lesson.id == lesson_id).first()
+        if not lesson:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Lesson not found")
+
+        require_extension(filename, settings.video_extensions)
+        if upload_length <= 0 or upload_length > settings.MAX_VIDEO_UPLOAD_SIZE:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Upload-Length must be between 1 and {settings.MAX_VIDEO_UPLOAD_SIZE} bytes"
+            )
+
+        # Opportunistic cleanup keeps the partial upload directory bounded
+        ResumableUploadService.expire_stale_uploads(db)
+
+        upload = UploadSession(
+            id=uuid.uuid4().hex,
+            lesson_id=lesson_id,
+            created_by=user_id,
+            filename=os.path.basename(filename),
+            upload_length=upload_length,
+            upload_offset=0,
+            expires_at=datetime.utcnow() + timedelta(hours=settings.RESUMABLE_UPLOAD_EXPIRE_HOURS)
+        )
+        ResumableUploadService._upload_dir(upload.id).mkdir(parents=True, exist_ok=True)
+        db.add(upload)
+        db.commit()
+        db.refresh(upload)
+        return upload
+
+    @staticmethod
+    def get_upload(db: Session, upload_id: str) -> UploadSession:
+        """
+        Get an active (unexpired) upload session.
+
+        Raises:
+            HTTPException: If the upload does not exist or has expired
+        """
+        upload = db.query(UploadSession).filter(UploadSession.id == upload_id).first()
+        if not upload or upload.expires_at < datetime.utcnow():
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload not found or expired")
+        return upload
+
+    @staticmethod
+    async def _until_disconnect(chunks: AsyncIterable[bytes], state: dict) -> AsyncIterator[bytes]:
+        """Yield the body chunks, ending the stream (instead of failing) if the client disconnects."""
+        try:
+            async for chunk in chunks:
+                yield chunk
+        except ClientDisconnect:
+            state["disconnected"] = True
+
+    @staticmethod
+    def _commit_chunk(db: Session, upload: UploadSession, offset: int, staging_path: Path, size: int) -> UploadSession:
+        """Advance the offset past a fully written staging file and move it into place."""
+        # Only one writer can advance the offset from this value
+        result = db.execute(
+            update(UploadSession)
+            .where(UploadSession.id == upload.id, UploadSession.upload_offset == offset)
+            .values(
+                upload_offset=offset + size,
+                updated_at=datetime.utcnow(),
+                expires_at=datetime.utcnow() + timedelta(hours=settings.RESUMABLE_UPLOAD_EXPIRE_HOURS)
+            )
+        )
+        if result.rowcount != 1:
+            db.rollback()
+            staging_path.unlink(missing_ok=True)
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Concurrent upload to the same offset")
+
+        os.replace(staging_path, ResumableUploadService._upload_dir(upload.id) / f"{offset:020d}.chunk")
+        db.commit()
+        db.refresh(upload)
+        return upload
+
+    @staticmethod
+    async def append_chunk(db: Session, upload_id: str, offset: int, chunks: AsyncIterable[bytes]) -> UploadSession:
+        """
+        Append the request body at `offset`.
+
+        If the client disconnects mid-body, the bytes received so far are
+        committed and the offset advanced, as for a shorter PATCH. Database
+        and file work runs in the threadpool.
+
+        Args:
+            db: Database session
+            upload_id: Upload session ID
+            offset: Client's Upload-Offset; must match the server offset
+            chunks: Request body stream
+
+        Returns:
+            Updated upload session
+
+        Raises:
+            HTTPException: 409 on offset mismatch, 413 if the body overruns Upload-Length
+        """
+        upload = await run_in_threadpool(ResumableUploadService.get_upload, db, upload_id)
+        if offset != upload.upload_offset:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Upload-Offset mismatch: server is at {upload.upload_offset}"
+            )
+
+        upload_dir = ResumableUploadService._upload_dir(upload_id)
+        staging_path = upload_dir / f"{offset:020d}-{uuid.uuid4().hex}.staging"
+        state = {"disconnected": False}
+        stored = await save_stream(
+            ResumableUploadService._until_disconnect(chunks, state), staging_path, upload.upload_length - offset
+        )
+        if stored.size == 0:
+            staging_path.unlink(missing_ok=True)
+            return upload
+
+        upload = await run_in_threadpool(ResumableUploadService._commit_chunk, db, upload, offset, staging_path, stored.size)
+        if state["disconnected"]:
+            logger.info(f"Resumable upload {upload_id}: client disconnected, kept {stored.size} bytes at offset {offset}")
+        return upload
+
+    @staticmethod
+    async def _iter_chunks(paths: List[Path]) -> AsyncIterator[bytes]:
+        for path in paths:
+            with open(path, "rb") as chunk_file:
+                while True:
+                    data = await run_in_threadpool(chunk_file.read, UPLOAD_CHUNK_SIZE)
+                    if not data:
+                        break
+                    yield data
+
+    @staticmethod
+    async def finalize_upload(db: Session, upload: UploadSession) -> Lesson:
+        """
+        Assemble all chunks into the lesson video and point the lesson at it.
+
+        Args:
+            db: Database session
+            upload: Fully received upload session
+
+        Returns:
+            Updated lesson
+        """
+        chunk_paths = ResumableUploadService._chunk_paths(upload.id)
+        extension = os.path.splitext(upload.filename)[1].lower()
+
+        stored: StoredObject = await ContentStore.store_stream(
+            ResumableUploadService._iter_chunks(chunk_paths),
+            extension,
+            upload.upload_length
+        )
+        if stored.size != upload.upload_length:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Assembled upload size does not match Upload-Length"
+            )
+
+        lesson = await run_in_threadpool(ResumableUploadService._attach_video, db, upload, stored)
+        logger.info(f"Resumable upload {upload.id} finalized into {lesson.video_url} (sha256 {stored.sha256})")
+        return lesson
+
+    @staticmethod
+    def _attach_video(db: Session, upload: UploadSession, stored: StoredObject) -> Lesson:
+        """Point the lesson at the assembled video and drop the upload session and its chunks."""
+        upload_id = upload.id
+        lesson = upload.lesson
+        lesson.video_url = stored.url
+        lesson.updated_at = datetime.utcnow()
+        db.delete(upload)
+        db.commit()
+        db.refresh(lesson)
+        shutil.rmtree(ResumableUploadService._upload_dir(upload_id), ignore_errors=True)
+        return lesson
+
+    @staticmethod
+    def cancel_upload(db: Session, upload_id: str) -> None:
+        """Terminate an upload and discard received chunks."""
+        upload = ResumableUploadService.get_upload(db, upload_id)
+        db.delete(upload)
+        db.commit()
+        shutil.rmtree(ResumableUploadService._upload_dir(upload_id), ignore_errors=True)
+
+    @staticmethod
+    def expire_stale_uploads(db: Session) -> int:
+        """
+        Delete expired upload sessions and their chunk files.
+
+        Returns:
+            Number of expired uploads removed
+        """
+        stale = db.query(UploadSession).filter(UploadSession.expires_at < datetime.utcnow()).all()
+        for upload in stale:
+            shutil.rmtree(ResumableUploadService._upload_dir(upload.id), ignore_errors=True)
+            db.delete(upload)
+        if stale:
+            db.commit()
+            logger.info(f"Expired {len(stale)} stale resumable uploads")
+        return len(stale)
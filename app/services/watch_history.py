@@ -0,0 +1,70 @@
+from typing import Optional
+from sqlalchemy.orm import Session
+from app.models.course import Lesson
+from app.models.lesson_progress import LessonProgress
+from app.utils.pagination import DEFAULT_PAGE_SIZE, KeysetPage, paginate_keyset
+
+# Newest first; id breaks ties between lessons watched in the same instant.
+# Matches the ix_lesson_progress_user_recent index.
+HISTORY_KEYS = [(LessonProgress.last_watched_at, True), (LessonProgress.id, True)]
+
+
+class WatchHistoryService:
+    """Service class for the "continue watching" feed."""
+
+    @staticmethod
+    def get_history(
+        db: Session,
+        user_id: int,
+        completed: Optional[bool] = None,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        compact: bool = False
+    ) -> KeysetPage:
+        """
+        One page of a user's recently watched lessons, most recent first.
+
+        Each page is a seek on the (user_id, last_watched_at DESC, id DESC)
+        index, so the cost is the page size, not the number of lessons the
+        user has ever watched.
+
+        Args:
+            db: Database session
+            user_id: User ID
+            completed: Only completed (True) or unfinished (False) lessons
+            cursor: next_cursor of the previous page
+            limit: Page size
+            compact: Only load the columns of the compact feed item
+
+        Returns:
+            KeysetPage of (Lesson, LessonProgress) rows, or of compact column
+            rows (see LessonHistoryCompactResponse)
+
+        Raises:
+            CursorError: If the cursor is invalid
+        """
+        if compact:
+            query = db.query(
+                Lesson.id.label("lesson_id"),
+                Lesson.course_id,
+                Lesson.title,
+                Lesson.poster_url,
+                Lesson.duration,
+                LessonProgress.completed.label("progress_completed"),
+                LessonProgress.last_position.label("progress_last_position"),
+                LessonProgress.last_watched_at,
+                LessonProgress.id.label("progress_id")
+            )
+            key_values = lambda row: (row.last_watched_at, row.progress_id)
+        else:
+            query = db.query(Lesson, LessonProgress)
+            key_values = lambda row: (row.LessonProgress.last_watched_at, row.LessonProgress.id)
+
+        query = query.select_from(LessonProgress).join(Lesson, Lesson.id == LessonProgress.lesson_id).filter(
+            LessonProgress.user_id == user_id,
+            LessonProgress.last_watched_at != None
+        )
+        if completed is not None:
+            query = query.filter(LessonProgress.completed == completed)
+
+        return paginate_keyset(query, HISTORY_KEYS, cursor, limit, with_total=False, key_values=key_values)
@@ -4,14 +4,19 @@ from app.utils.security import (
     create_access_token,
     create_refresh_token,
     decode_token,
-    verify_token_type
+    verify_token_type,
+    sign_stream_url,
+    sign_video_url,
+    verify_stream_signature
 )
 from app.utils.helpers import (
     generate_token,
     generate_verification_token,
     generate_reset_token,
     validate_file_extension,
-    sanitize_filename
+    sanitize_filename,
+    static_file_path,
+    image_srcset
 )
 
 __all__ = [
@@ -21,9 +26,14 @@ __all__ = [
     "create_refresh_token",
     "decode_token",
     "verify_token_type",
+    "sign_stream_url",
+    "sign_video_url",
+    "verify_stream_signature",
     "generate_token",
     "generate_verification_token",
     "generate_reset_token",
     "validate_file_extension",
-    "sanitize_filename"
+    "sanitize_filename",
+    "static_file_path",
+    "image_srcset"
 ]
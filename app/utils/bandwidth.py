@@ -0,0 +1,133 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Set, Tuple
+from app.config import settings
+from app.utils.metrics import metrics
+
+
+class TokenBucket:
+    """
+    Token bucket rate limiter.
+
+    Tokens are bytes. `reserve` always succeeds and returns how long the
+    caller has to wait before sending, so pacing never drops data.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def set_rate(self, rate: float) -> None:
+        """Change the refill rate, crediting tokens earned at the old rate first."""
+        self._refill()
+        self.rate = rate
+
+    def reserve(self, amount: int) -> float:
+        """
+        Take `amount` tokens, going into debt if needed.
+
+        Returns:
+            Seconds to wait before the reserved bytes may be sent
+        """
+        if self.rate <= 0:
+            return 0.0
+        self._refill()
+        self.tokens -= amount
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.rate
+
+
+class StreamShaper:
+    """Per-connection handle returned by `BandwidthScheduler.open_stream`."""
+
+    def __init__(self, scheduler: "BandwidthScheduler", rate: float):
+        self.scheduler = scheduler
+        self.bucket = TokenBucket(rate, settings.STREAM_BURST_BYTES)
+
+    async def throttle(self, nbytes: int) -> None:
+        """Wait until `nbytes` may be sent on this connection."""
+        delay = max(self.bucket.reserve(nbytes), self.scheduler.global_bucket.reserve(nbytes))
+        self.scheduler.record(nbytes)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class BandwidthScheduler:
+    """
+    Fair bandwidth scheduler for video streams.
+
+    Every active stream gets an equal share of the global budget, capped at
+    the per-connection rate (set slightly above the video bitrate). A shared
+    global bucket additionally bounds bursts across all streams.
+    A rate of 0 disables the corresponding limit.
+    """
+
+    THROUGHPUT_WINDOW_SECONDS = 10
+
+    def __init__(self, connection_rate: float, global_rate: float):
+        self.connection_rate = connection_rate
+        self.global_rate = global_rate
+        self.global_bucket = TokenBucket(global_rate, settings.STREAM_BURST_BYTES * 4)
+        self.active: Set[StreamShaper] = set()
+        self._window: Deque[Tuple[int, int]] = deque()
+
+    def fair_share(self) -> float:
+        """Current per-stream rate in bytes/second (0 = unlimited)."""
+        if not self.global_rate:
+            return self.connection_rate
+        share = self.global_rate / max(len(self.active), 1)
+        return min(self.connection_rate, share) if self.connection_rate else share
+
+    def _rebalance(self) -> None:
+        rate = self.fair_share()
+        for shaper in self.active:
+            shaper.bucket.set_rate(rate)
+
+    @asynccontextmanager
+    async def open_stream(self) -> AsyncIterator[StreamShaper]:
+        """Register a stream for the duration of the block and rebalance shares."""
+        shaper = StreamShaper(self, self.connection_rate)
+        self.active.add(shaper)
+        self._rebalance()
+        try:
+            yield shaper
+        finally:
+            self.active.discard(shaper)
+            self._rebalance()
+
+    def record(self, nbytes: int) -> None:
+        """Account sent bytes for throughput metrics."""
+        second = int(time.monotonic())
+        if self._window and self._window[-1][0] == second:
+            self._window[-1] = (second, self._window[-1][1] + nbytes)
+        else:
+            self._window.append((second, nbytes))
+        metrics.inc("stream.bytes_sent", nbytes)
+
+    def throughput(self) -> float:
+        """Average bytes/second sent over the last few seconds."""
+        cutoff = int(time.monotonic()) - self.THROUGHPUT_WINDOW_SECONDS
+        while self._window and self._window[0][0] <= cutoff:
+            self._window.popleft()
+        return sum(nbytes for _, nbytes in self._window) / self.THROUGHPUT_WINDOW_SECONDS
+
+
+# Global scheduler shared by all streaming responses
+stream_scheduler = BandwidthScheduler(
+    connection_rate=settings.STREAM_CONNECTION_RATE,
+    global_rate=settings.STREAM_GLOBAL_RATE,
+)
+
+metrics.register_gauge("stream.active", lambda: len(stream_scheduler.active))
+metrics.register_gauge("stream.throughput_bytes_per_sec", stream_scheduler.throughput)
+metrics.register_gauge("stream.fair_share_bytes_per_sec", stream_scheduler.fair_share)
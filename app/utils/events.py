@@ -0,0 +1,30 @@
+import logging
+from collections import defaultdict
+from typing import Any, Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+# Event name -> callables(**payload)
+_subscribers: Dict[str, List[Callable[..., Any]]] = defaultdict(list)
+
+
+def subscribe(name: str):
+    """
+    Register a function to be called with the payload of every `name` event.
+
+    Events are delivered synchronously within the emitting process only;
+    state shared across processes must not rely on them alone.
+    """
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        _subscribers[name].append(func)
+        return func
+    return decorator
+
+
+def emit(name: str, **payload) -> None:
+    """Call every subscriber of `name`. A failing subscriber is logged and skipped."""
+    for func in _subscribers.get(name, ()):
+        try:
+            func(**payload)
+        except Exception as e:
+            logger.error(f"Subscriber {func.__name__} of '{name}' failed: {e}")
@@ -1,6 +1,15 @@
+import os
+import re
 import secrets
 import string
+from pathlib import Path
 from typing import Optional
+from app.config import settings
+
+STATIC_DIR = Path("static")
+
+# Content-addressed image originals: /static/cas/<aa>/<sha256>.<ext>
+CAS_IMAGE_URL_PATTERN = re.compile(r"^/static/cas/[0-9a-f]{2}/[0-9a-f]{64}\.(jpg|jpeg|png|webp)$")
 
 
 def generate_token(length: int = 32) -> str:
@@ -63,3 +72,39 @@ def sanitize_filename(filename: str) -> str:
         sanitized = sanitized.replace(char, '')
     
     return sanitized.strip()
+
+
+def static_file_path(url: Optional[str]) -> Optional[Path]:
+    """
+    Map a "/static/..." URL to the file it refers to on disk.
+    
+    Args:
+        url: URL as stored in the database
+        
+    Returns:
+        Path inside the static directory, or None for external/empty URLs
+    """
+    if not url or not url.startswith("/static/"):
+        return None
+    relative = os.path.normpath(url[len("/static/"):].split("?", 1)[0])
+    if relative.startswith("..") or os.path.isabs(relative):
+        return None
+    return STATIC_DIR / relative
+
+
+def image_srcset(url: Optional[str]) -> Optional[str]:
+    """
+    Build a srcset string of resized variants for an uploaded image.
+    
+    Each candidate is the original URL with a `w` query parameter; the static
+    mount serves the matching variant (WebP when the client accepts it).
+    
+    Args:
+        url: Image URL as stored in the database
+        
+    Returns:
+        srcset value, or None for images without variants (external/legacy URLs)
+    """
+    if not url or not CAS_IMAGE_URL_PATTERN.match(url):
+        return None
+    return ", ".join(f"{url}?w={width} {width}w" for width in settings.image_variant_widths)
@@ -0,0 +1,72 @@
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Dict
+
+
+class MetricsRegistry:
+    """
+    Minimal in-process metrics registry.
+
+    Holds counters, gauges (static values or callbacks evaluated on read)
+    and timing summaries. Exposed as JSON through the /metrics endpoint.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = defaultdict(float)
+        self._gauges: Dict[str, float] = {}
+        self._gauge_callbacks: Dict[str, Callable[[], float]] = {}
+        self._timings: Dict[str, Dict[str, float]] = {}
+
+    def inc(self, name: str, value: float = 1) -> None:
+        """Increment a counter."""
+        with self._lock:
+            self._counters[name] += value
+
+    def set_gauge(self, name: str, value: float) -> None:
+        """Set a gauge to a fixed value."""
+        with self._lock:
+            self._gauges[name] = value
+
+    def register_gauge(self, name: str, callback: Callable[[], float]) -> None:
+        """Register a gauge whose value is computed when metrics are read."""
+        with self._lock:
+            self._gauge_callbacks[name] = callback
+
+    def observe(self, name: str, seconds: float) -> None:
+        """Record a duration in a count/total/max summary."""
+        with self._lock:
+            summary = self._timings.setdefault(name, {"count": 0, "total": 0.0, "max": 0.0})
+            summary["count"] += 1
+            summary["total"] += seconds
+            summary["max"] = max(summary["max"], seconds)
+
+    def snapshot(self) -> dict:
+        """Return a JSON-serialisable view of all metrics."""
+        with self._lock:
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+            callbacks = dict(self._gauge_callbacks)
+            timings = {
+                name: {
+                    "count": summary["count"],
+                    "avg": round(summary["total"] / summary["count"], 6) if summary["count"] else 0.0,
+                    "max": round(summary["max"], 6),
+                }
+                for name, summary in self._timings.items()
+            }
+
+        for name, callback in callbacks.items():
+            gauges[name] = callback()
+
+        return {
+            "timestamp": time.time(),
+            "counters": counters,
+            "gauges": gauges,
+            "timings": timings,
+        }
+
+
+# Global metrics registry
+metrics = MetricsRegistry()
@@ -0,0 +1,154 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+from sqlalchemy import and_, func, literal, or_, select, tuple_
+from sqlalchemy.orm import Query
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+# Totals are counted exactly up to this many rows, then estimated
+COUNT_EXACT_LIMIT = 10000
+
+# (column, descending)
+SortKey = Tuple[Any, bool]
+
+
+class CursorError(ValueError):
+    """The pagination cursor is malformed or does not match the listing."""
+
+
+class KeysetPage(NamedTuple):
+    """One page of a keyset-paginated listing."""
+    items: List[Any]
+    next_cursor: Optional[str]
+    total: Optional[int]
+    total_is_estimate: bool
+
+    def to_dict(self, serialize: Callable[[Any], Dict]) -> Dict:
+        return {
+            "items": [serialize(item) for item in self.items],
+            "next_cursor": self.next_cursor,
+            "has_more": self.next_cursor is not None,
+            "total": self.total,
+            "total_is_estimate": self.total_is_estimate,
+        }
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Opaque, URL-safe cursor holding the sort key values of the last row."""
+    payload = [{"dt": value.isoformat()} if isinstance(value, datetime) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Raises:
+        CursorError: If the cursor is malformed or has the wrong number of values
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(values, list) or len(values) != size:
+            raise CursorError("Invalid cursor")
+        return [datetime.fromisoformat(value["dt"]) if isinstance(value, dict) else value for value in values]
+    except (ValueError, TypeError, KeyError):
+        raise CursorError("Invalid cursor")
+
+
+def _after(keys: Sequence[SortKey], values: Sequence[Any]):
+    """WHERE clause selecting the rows that sort after the given key values."""
+    directions = {descending for _, descending in keys}
+    if len(directions) == 1:
+        # Row-value comparison lets the database seek a composite index directly
+        columns = tuple_(*[column for column, _ in keys])
+        bound = tuple_(*[literal(value, column.type) for (column, _), value in zip(keys, values)])
+        return columns < bound if directions.pop() else columns > bound
+
+    # Mixed directions: (a > x) OR (a = x AND b < y) ...
+    clauses = []
+    for index, (column, descending) in enumerate(keys):
+        equal = [keys[i][0] == values[i] for i in range(index)]
+        clauses.append(and_(*equal, column < values[index] if descending else column > values[index]))
+    return or_(*clauses)
+
+
+def estimate_count(query: Query, exact_limit: int = COUNT_EXACT_LIMIT) -> Tuple[int, bool]:
+    """
+    Row count of a query without an unbounded COUNT(*).
+
+    Counts exactly up to `exact_limit` rows. Beyond that PostgreSQL's planner
+    estimate is used (EXPLAIN, no scan); other databases report the limit as
+    a lower bound.
+
+    Returns:
+        (count, whether the count is an estimate)
+    """
+    db = query.session
+    capped = query.order_by(None).limit(exact_limit + 1).subquery()
+    count = db.execute(select(func.count()).select_from(capped)).scalar()
+    if count <= exact_limit:
+        return count, False
+
+    dialect = db.get_bind().dialect
+    if dialect.name == "postgresql":
+        compiled = query.order_by(None).statement.compile(dialect=dialect)
+        plan = db.connection().exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return max(int(plan[0]["Plan"]["Plan Rows"]), exact_limit), True
+    return exact_limit, True
+
+
+def paginate_keyset(
+    query: Query,
+    keys: Sequence[SortKey],
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    with_total: Optional[bool] = None,
+    key_values: Optional[Callable[[Any], Sequence[Any]]] = None
+) -> KeysetPage:
+    """
+    Keyset ("seek") pagination: each page continues after the last row of the
+    previous one, so every page costs the same index range scan no matter how
+    deep the client has paged (unlike OFFSET).
+
+    The last sort key must be unique (usually the primary key) so the order is
+    total. The sort key columns must not be NULL.
+
+    Args:
+        query: Filtered query, without ORDER BY
+        keys: Sort keys as (column, descending), e.g. [(Test.created_at, True), (Test.id, True)]
+        cursor: next_cursor of the previous page, or None for the first page
+        limit: Page size (clamped to 1..MAX_PAGE_SIZE)
+        with_total: Also estimate the total (default: first page only)
+        key_values: Extracts the sort key values from a result row
+            (default: attributes named like the key columns)
+
+    Raises:
+        CursorError: If the cursor is invalid
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    if with_total is None:
+        with_total = cursor is None
+    total, is_estimate = estimate_count(query) if with_total else (None, False)
+
+    if cursor:
+        query = query.filter(_after(keys, decode_cursor(cursor, len(keys))))
+    query = query.order_by(*[column.desc() if descending else column.asc() for column, descending in keys])
+
+    rows = query.limit(limit + 1).all()
+    items = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        values = key_values(last) if key_values else [getattr(last, column.key) for column, _ in keys]
+        next_cursor = encode_cursor(values)
+    return KeysetPage(items, next_cursor, total, is_estimate)
+
+
+def contains_pattern(search: str) -> str:
+    """LIKE pattern matching `search` anywhere, with wildcards escaped (escape char: backslash)."""
+    escaped = search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
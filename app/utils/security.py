@@ -1,4 +1,9 @@
 import uuid
+import hmac
+import time
+import base64
+import hashlib
+from urllib.parse import quote
 from passlib.context import CryptContext
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
@@ -9,6 +14,12 @@ from app.schemas.user import TokenData
 # Password hashing context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Dedicated key for stream URL signatures, derived once at import so that
+# verification is a single HMAC over a short message.
+_STREAM_URL_KEY = hashlib.sha256(
+    b"stream-url:" + (settings.STREAM_URL_SECRET or settings.SECRET_KEY).encode()
+).digest()
+
 
 def hash_password(password: str) -> str:
     """
@@ -123,3 +134,67 @@ def verify_token_type(token: str, expected_type: str) -> bool:
         return token_type == expected_type
     except JWTError:
         return False
+
+
+def _stream_signature(filename: str, expires: int) -> str:
+    """Compute the URL-safe HMAC-SHA256 signature for a stream URL."""
+    digest = hmac.new(
+        _STREAM_URL_KEY, f"{filename}\n{expires}".encode(), hashlib.sha256
+    ).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+
+def sign_stream_url(filename: str, expires_in: Optional[int] = None) -> str:
+    """
+    Create a short-lived signed URL for the video streaming endpoint.
+    
+    The expiry is rounded up to a quarter of the TTL so that repeated course
+    fetches hand out the same URL, which keeps client and proxy caches warm.
+    
+    Args:
+        filename: Name of the video file to stream
+        expires_in: Lifetime in seconds (default: STREAM_URL_TTL_SECONDS)
+        
+    Returns:
+        Relative stream URL carrying `expires` and `sig` query parameters
+    """
+    ttl = expires_in or settings.STREAM_URL_TTL_SECONDS
+    bucket = max(ttl // 4, 1)
+    expires = -(-(int(time.time()) + ttl) // bucket) * bucket
+    signature = _stream_signature(filename, expires)
+    return (
+        f"/api/{settings.API_VERSION}/stream/video/{quote(filename)}"
+        f"?expires={expires}&sig={signature}"
+    )
+
+
+def sign_video_url(video_url: Optional[str]) -> Optional[str]:
+    """
+    Replace a locally stored video URL with a signed stream URL.
+    
+    Args:
+        video_url: Lesson video URL as stored in the database
+        
+    Returns:
+        Signed stream URL for files under /static/, otherwise the URL unchanged
+    """
+    if not video_url or not video_url.startswith("/static/"):
+        return video_url
+    return sign_stream_url(video_url.rsplit("/", 1)[-1])
+
+
+def verify_stream_signature(filename: str, expires: Optional[int], signature: Optional[str]) -> bool:
+    """
+    Verify a stream URL signature without touching the database.
+    
+    Args:
+        filename: Requested video file name
+        expires: Unix timestamp the URL expires at
+        signature: Signature from the URL
+        
+    Returns:
+        True if the signature is valid and not expired, False otherwise
+    """
+    if expires is None or not signature or expires < time.time():
+        return False
+    return hmac.compare_digest(_stream_signature(filename, expires), signature)
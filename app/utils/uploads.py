@@ -0,0 +1,188 @@
+import hashlib
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import AsyncIterable, AsyncIterator, BinaryIO, List, NamedTuple, Sequence, Tuple
+from fastapi import HTTPException, UploadFile, status
+from starlette.concurrency import run_in_threadpool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.utils.helpers import validate_file_extension
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB
+
+# Allowance for multipart boundaries and part headers on top of the file size
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+class StoredUpload(NamedTuple):
+    """Result of writing an upload to disk."""
+    path: Path
+    size: int
+    sha256: str
+
+
+def require_extension(filename: str, allowed_extensions: List[str]) -> str:
+    """
+    Validate an uploaded file name against an extension allowlist.
+
+    Args:
+        filename: Client supplied file name
+        allowed_extensions: Allowed extensions (without dot)
+
+    Returns:
+        Lower-cased extension including the dot
+
+    Raises:
+        HTTPException: If the extension is not allowed
+    """
+    if not filename or not validate_file_extension(filename, allowed_extensions):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"File type not allowed. Allowed: {', '.join(allowed_extensions)}"
+        )
+    return "." + filename.rsplit(".", 1)[1].lower()
+
+
+async def iter_upload_file(upload: UploadFile, chunk_size: int = UPLOAD_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """Read an UploadFile in chunks (reads of spooled files run in a thread)."""
+    while True:
+        chunk = await upload.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+def _write_chunk(buffer: BinaryIO, hasher, chunk: bytes) -> None:
+    buffer.write(chunk)
+    hasher.update(chunk)
+
+
+def _commit_file(buffer: BinaryIO, temp_path: str, destination: Path) -> None:
+    buffer.flush()
+    os.fsync(buffer.fileno())
+    buffer.close()
+    os.replace(temp_path, destination)
+    # Persist the rename itself
+    dir_fd = os.open(destination.parent, os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+
+
+async def save_stream(chunks: AsyncIterable[bytes], destination: Path, max_size: int) -> StoredUpload:
+    """
+    Stream chunks to `destination`, hashing them in the same pass.
+
+    Data is written to a temporary file in the destination directory, fsynced
+    and atomically renamed into place, so readers never see partial files.
+    All file I/O and hashing runs in the threadpool, off the event loop.
+
+    Args:
+        chunks: Async iterable of byte chunks
+        destination: Final file path
+        max_size: Maximum allowed size in bytes
+
+    Returns:
+        StoredUpload with the final path, size and SHA-256 hex digest
+
+    Raises:
+        HTTPException: 413 as soon as the stream exceeds max_size
+    """
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=destination.parent, prefix=".upload-", suffix=".part")
+    buffer = os.fdopen(fd, "wb")
+    hasher = hashlib.sha256()
+    size = 0
+
+    try:
+        async for chunk in chunks:
+            size += len(chunk)
+            if size > max_size:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"File exceeds maximum size of {max_size} bytes"
+                )
+            await run_in_threadpool(_write_chunk, buffer, hasher, chunk)
+        await run_in_threadpool(_commit_file, buffer, temp_path, destination)
+    except BaseException:
+        buffer.close()
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+    return StoredUpload(path=destination, size=size, sha256=hasher.hexdigest())
+
+
+async def save_upload_file(upload: UploadFile, destination: Path, max_size: int) -> StoredUpload:
+    """Stream an UploadFile to disk. See `save_stream`."""
+    return await save_stream(iter_upload_file(upload), destination, max_size)
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Reject oversized request bodies before they are parsed or spooled.
+
+    Requests declaring a larger Content-Length get an immediate 413. Bodies
+    without a length (chunked encoding) are counted as they arrive and cut off
+    once they cross the limit.
+
+    `max_size` applies to every request; paths matching one of `route_limits`
+    (regex, size) use that size instead, so only the upload routes that need
+    it accept very large bodies.
+    """
+
+    def __init__(self, app: ASGIApp, max_size: int, route_limits: Sequence[Tuple[str, int]] = ()):
+        self.app = app
+        self.max_size = max_size
+        self.route_limits = [(re.compile(pattern), size) for pattern, size in route_limits]
+
+    def limit_for(self, path: str) -> int:
+        for pattern, size in self.route_limits:
+            if pattern.match(path):
+                return size
+        return self.max_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in ("POST", "PUT", "PATCH"):
+            await self.app(scope, receive, send)
+            return
+
+        max_size = self.limit_for(scope["path"])
+
+        headers = dict(scope["headers"])
+        content_length = headers.get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > max_size:
+            await self._reject(send)
+            return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_size:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail="Request body too large"
+                    )
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+    @staticmethod
+    async def _reject(send: Send) -> None:
+        body = b'{"detail":"Request body too large"}'
+        await send({
+            "type": "http.response.start",
+            "status": status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"connection", b"close"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,32 @@
+"""
+Garbage-collect content-addressed uploads (static/cas/) that no lesson,
+course or user profile references any more.
+
+Usage:
+    python gc_static_files.py --dry-run
+    python gc_static_files.py --grace-hours 48
+"""
+import argparse
+from app.database import SessionLocal
+from app.services.content_store import ContentStore
+
+
+def gc_static_files(grace_hours: int = None, dry_run: bool = False):
+    db = SessionLocal()
+    try:
+        removed = ContentStore.collect_garbage(db, grace_hours=grace_hours, dry_run=dry_run)
+        for path in removed:
+            print(f"{'Would remove' if dry_run else 'Removed'}: {path}")
+        print(f"\n✅ {len(removed)} unreferenced files {'found' if dry_run else 'removed'}")
+    except Exception as e:
+        print(f"❌ Error: {e}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="Only list files that would be removed")
+    parser.add_argument("--grace-hours", type=int, default=None, help="Keep files younger than this")
+    args = parser.parse_args()
+    gc_static_files(grace_hours=args.grace_hours, dry_run=args.dry_run)
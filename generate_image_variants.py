@@ -0,0 +1,40 @@
+"""
+Generate resized variants for images uploaded before the image pipeline existed
+(course covers/banners and user avatars stored under /static/cas/).
+
+Usage: python generate_image_variants.py
+"""
+import asyncio
+from app.database import SessionLocal
+from app.models.course import Course
+from app.models.user import UserProfile
+from app.services.content_store import ContentStore
+from app.services.image_service import ImageService, shutdown_process_pool
+
+
+async def generate_missing_variants():
+    db = SessionLocal()
+    try:
+        urls = set()
+        for column in (Course.cover_image, Course.banner_image, UserProfile.avatar_url):
+            urls.update(url for (url,) in db.query(column).filter(column.like("/static/cas/%")))
+    finally:
+        db.close()
+
+    keys = sorted(
+        key for key in (ContentStore.key_from_url(url) for url in urls)
+        if key and ImageService.is_original_key(key)
+    )
+    print(f"Found {len(keys)} uploaded images")
+
+    # Images are resized in parallel by the process pool
+    results = await asyncio.gather(*(ImageService.generate_variants(key) for key in keys))
+    for key, variants in zip(keys, results):
+        print(f"{'✅' if variants else '⚠️ '} {key}: {len(variants)} variants")
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(generate_missing_variants())
+    finally:
+        shutdown_process_pool()
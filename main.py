@@ -1,12 +1,16 @@
-from fastapi import FastAPI, Request, status
-from fastapi.staticfiles import StaticFiles
+from fastapi import Depends, FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from sqlalchemy.exc import SQLAlchemyError
 from app.config import settings
-from app.database import init_db
+from app.database import init_db, SessionLocal
 from app.api import api_router
+from app.api.stream import ProtectedStaticFiles
+from app.dependencies import get_admin_user
+from app.models.user import User
+from app.utils.metrics import metrics
+from app.utils.uploads import UploadSizeLimitMiddleware, MULTIPART_OVERHEAD
 import logging
 import os
 
@@ -29,7 +33,18 @@ app = FastAPI(
 # Mount static files
 UPLOAD_DIR = "static"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
-app.mount("/static", StaticFiles(directory=UPLOAD_DIR), name="static")
+app.mount("/static", ProtectedStaticFiles(directory=UPLOAD_DIR), name="static")
+
+# Reject oversized request bodies before they are spooled; only video uploads may be large
+API_PREFIX = f"/api/{settings.API_VERSION}"
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    max_size=settings.MAX_UPLOAD_SIZE + MULTIPART_OVERHEAD,
+    route_limits=[
+        (rf"^{API_PREFIX}/admin/lessons/\d+/video$", settings.MAX_VIDEO_UPLOAD_SIZE + MULTIPART_OVERHEAD),
+        (rf"^{API_PREFIX}/admin/uploads/[^/]+$", settings.MAX_VIDEO_UPLOAD_SIZE),
+    ]
+)
 
 # CORS middleware
 app.add_middleware(
@@ -96,6 +111,30 @@ async def startup_event():
     except Exception as e:
         logger.error(f"Failed to initialize database: {str(e)}")
         raise
+    
+    # Clean up partial uploads abandoned while the server was down
+    from app.services.upload_service import ResumableUploadService
+    db = SessionLocal()
+    try:
+        ResumableUploadService.expire_stale_uploads(db)
+    finally:
+        db.close()
+    
+    # Run queued background jobs (previews, image variants, progress recalculation)
+    from app.services.job_queue import job_workers
+    job_workers.start()
+    
+    # Periodic maintenance jobs (one shared job each, whichever process runs it)
+    from app.services.enrollment_service import EnrollmentService
+    from app.services.sync_service import SyncService
+    from app.services.review_service import ReviewService
+    db = SessionLocal()
+    try:
+        EnrollmentService.schedule_expiry_sweep(db)
+        SyncService.schedule_receipt_purge(db)
+        ReviewService.schedule_daily_digest(db)
+    finally:
+        db.close()
 
 
 # Shutdown event
@@ -103,6 +142,10 @@ async def startup_event():
 async def shutdown_event():
     """Cleanup on shutdown."""
     logger.info("Shutting down application...")
+    from app.services.job_queue import job_workers
+    job_workers.stop()
+    from app.services.image_service import shutdown_process_pool
+    shutdown_process_pool()
 
 
 # Health check endpoint
@@ -117,6 +160,13 @@ async def health_check():
     }
 
 
+# Metrics endpoint
+@app.get("/metrics", tags=["Health"])
+async def get_metrics(current_user: User = Depends(get_admin_user)):
+    """In-process metrics (active streams, throughput, job queue, ...). Admin only."""
+    return metrics.snapshot()
+
+
 # Root endpoint
 @app.get("/", tags=["Root"])
 async def root():
@@ -130,7 +180,7 @@ async def root():
 
 
 # Include API router
-app.include_router(api_router, prefix=f"/api/{settings.API_VERSION}")
+app.include_router(api_router, prefix=API_PREFIX)
 
 
 if __name__ == "__main__":
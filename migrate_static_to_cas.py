@@ -0,0 +1,97 @@
+"""
+Migration script to move legacy uploads (static/<uuid>.jpg, static/<lesson>_<ts>.mp4)
+into content-addressed storage (static/cas/).
+
+Identical files collapse into a single stored copy. Database URLs are rewritten,
+and the legacy files are removed once nothing points at them any more.
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from app.database import SessionLocal
+from app.models.course import Course, Lesson
+from app.models.user import UserProfile
+from app.services.content_store import ContentStore, CAS_PREFIX
+from app.services.storage import get_storage
+from app.utils.helpers import static_file_path
+
+URL_COLUMNS = [
+    (Lesson, "video_url"), (Lesson, "content_url"),
+    (Course, "cover_image"), (Course, "banner_image"), (Course, "video_intro_url"),
+    (UserProfile, "avatar_url"),
+]
+
+
+def file_sha256(path) -> str:
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+def migrate_static_to_cas():
+    """Rewrite every legacy /static/ URL to its content-addressed equivalent."""
+    db = SessionLocal()
+    storage = get_storage()
+    url_map = {}
+    try:
+        for model, attribute in URL_COLUMNS:
+            column = getattr(model, attribute)
+            rows = db.query(model).filter(
+                column.like("/static/%"),
+                ~column.like(f"/static/{CAS_PREFIX}/%")
+            ).all()
+
+            for row in rows:
+                old_url = getattr(row, attribute)
+                if old_url not in url_map:
+                    path = static_file_path(old_url)
+                    if not path or not path.is_file():
+                        print(f"⚠️  Missing file for {old_url}, skipping")
+                        url_map[old_url] = None
+                        continue
+                    extension = os.path.splitext(path.name)[1].lower()
+                    key = ContentStore.key_for(file_sha256(path), extension)
+                    if not storage.exists(key):
+                        destination = storage.local_path(key)
+                        if destination:
+                            destination.parent.mkdir(parents=True, exist_ok=True)
+                            # Hard link: no data is copied, the legacy path stays valid until cleanup
+                            os.link(path, destination)
+                        else:
+                            # Remote backends consume the file they upload, so hand them a copy
+                            fd, copy_path = tempfile.mkstemp(suffix=extension)
+                            os.close(fd)
+                            shutil.copyfile(path, copy_path)
+                            storage.save_file(Path(copy_path), key)
+                    url_map[old_url] = ContentStore.url_for(key)
+
+                if url_map[old_url]:
+                    setattr(row, attribute, url_map[old_url])
+                    print(f"Updated {model.__tablename__}.{attribute} {row.id}: {old_url} -> {url_map[old_url]}")
+
+        db.commit()
+
+        # The legacy names are now unreferenced; drop them (data lives on via the hard link)
+        for old_url, new_url in url_map.items():
+            if new_url:
+                static_file_path(old_url).unlink(missing_ok=True)
+
+        migrated = sum(1 for new_url in url_map.values() if new_url)
+        unique = len({new_url for new_url in url_map.values() if new_url})
+        print(f"\n✅ Migrated {migrated} files into {unique} content-addressed objects")
+
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Error: {e}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    print("Starting content-addressed storage migration...")
+    migrate_static_to_cas()
+    print("Migration complete!")
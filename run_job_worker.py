@@ -0,0 +1,40 @@
+"""
+Run background job workers without the web server.
+
+Set JOB_WORKERS=0 on the API processes to keep heavy jobs (video previews,
+image variants) off the web servers and run this on a worker machine instead.
+
+Usage: python run_job_worker.py [--workers 4]
+"""
+import argparse
+import logging
+import signal
+import threading
+import app.api  # noqa: F401  (registers the job handlers)
+from app.config import settings
+from app.database import init_db
+from app.services.job_queue import JobWorkerPool
+from app.services.image_service import shutdown_process_pool
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+
+def run_job_worker(workers: int):
+    init_db()
+    pool = JobWorkerPool(workers=workers)
+    stopped = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stopped.set())
+    signal.signal(signal.SIGINT, lambda *_: stopped.set())
+
+    pool.start()
+    print(f"✅ Running {workers} job workers (Ctrl+C to stop)")
+    stopped.wait()
+    pool.stop()
+    shutdown_process_pool()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run background job workers")
+    parser.add_argument("--workers", type=int, default=settings.JOB_WORKERS or 2, help="Worker threads")
+    args = parser.parse_args()
+    run_job_worker(args.workers)
@@ -0,0 +1,110 @@
+"""
+Benchmark the course catalog response (GET /courses).
+
+Builds a scratch catalog and compares the previous response (every course
+with its full subject and lesson tree, serialized as CourseResponse) against
+the summary projection (course fields plus counts and total duration from one
+column-projected query). Reports payload size and median latency of query +
+serialization.
+
+Usage: python scripts/benchmark_course_catalog.py [--courses 100] [--subjects 5] [--lessons 40] [--runs 20]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import List
+
+# Add parent directory to path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import StandardCourse
+from app.models.course import Course, CourseSubject, Lesson
+from app.schemas.course import CourseResponse, CourseSummaryResponse
+from app.services.course_service import CourseService
+
+
+def seed(session, courses: int, subjects: int, lessons: int) -> None:
+    standard = StandardCourse(name="Benchmark")
+    session.add(standard)
+    session.flush()
+    for c in range(courses):
+        course = Course(
+            course_id=standard.id, title=f"Course {c}", subtitle="Subtitle",
+            description="A course description. " * 10, is_published=True,
+            cover_image=f"https://cdn.example.com/covers/{c}.jpg"
+        )
+        session.add(course)
+        session.flush()
+        for s in range(subjects):
+            subject = CourseSubject(course_id=course.id, title=f"Subject {s}", description="About the subject", order=s)
+            session.add(subject)
+            session.flush()
+            session.add_all(
+                Lesson(
+                    course_id=course.id, subject_id=subject.id, title=f"Lesson {s}.{i}",
+                    description="What this lesson covers. " * 4,
+                    video_url=f"https://cdn.example.com/videos/{course.id}/{subject.id}/{i}/master.m3u8",
+                    duration=600 + i, order=i
+                )
+                for i in range(lessons)
+            )
+    session.commit()
+
+
+def timed(fn, runs: int):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        payload = fn()
+        timings.append(time.perf_counter() - started)
+    return payload, statistics.median(timings)
+
+
+def benchmark(courses: int, subjects: int, lessons: int, runs: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(engine)
+        Session = sessionmaker(bind=engine)
+        with Session() as session:
+            seed(session, courses, subjects, lessons)
+
+        full_adapter = TypeAdapter(List[CourseResponse])
+        summary_adapter = TypeAdapter(List[CourseSummaryResponse])
+
+        def full_tree():
+            with Session() as session:
+                rows = CourseService.get_courses(session, 0, courses)
+                return full_adapter.dump_json(full_adapter.validate_python(rows, from_attributes=True))
+
+        def summaries():
+            with Session() as session:
+                rows = CourseService.get_course_summaries(session, 0, courses)
+                return summary_adapter.dump_json(summary_adapter.validate_python(rows, from_attributes=True))
+
+        full_payload, full_latency = timed(full_tree, runs)
+        summary_payload, summary_latency = timed(summaries, runs)
+
+    print(f"{courses} courses x {subjects} subjects x {lessons} lessons, median of {runs} runs")
+    print(f"{'response':<12}{'payload':>14}{'latency':>12}")
+    print(f"{'full tree':<12}{len(full_payload):>12,} B{full_latency * 1000:>10.1f}ms")
+    print(f"{'summary':<12}{len(summary_payload):>12,} B{summary_latency * 1000:>10.1f}ms")
+    print(f"payload {len(full_payload) / len(summary_payload):.0f}x smaller, "
+          f"latency {full_latency / summary_latency:.1f}x faster")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the course catalog response")
+    parser.add_argument("--courses", type=int, default=100)
+    parser.add_argument("--subjects", type=int, default=5)
+    parser.add_argument("--lessons", type=int, default=40, help="Lessons per subject")
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+    benchmark(args.courses, args.subjects, args.lessons, args.runs)
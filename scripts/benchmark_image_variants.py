@@ -0,0 +1,80 @@
+"""
+Benchmark the image variant pipeline.
+
+Reports bytes transferred for one catalog page of course covers when clients
+load the originals versus the resized WebP/JPEG variants, and how long variant
+generation takes serially versus in the process pool.
+
+Usage: python scripts/benchmark_image_variants.py [--courses 20] [--width 400]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Add parent directory to path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageFilter
+
+from app.config import settings
+from app.services.image_service import render_image_variants
+
+ORIGINAL_SIZE = (3000, 2000)
+
+
+def make_cover(path: str, seed: int) -> None:
+    """A photo-like test image: noisy gradient, so it compresses like a real photo."""
+    noise = Image.effect_noise(ORIGINAL_SIZE, 60 + seed % 20).filter(ImageFilter.GaussianBlur(1.5))
+    gradient = Image.linear_gradient("L").resize(ORIGINAL_SIZE)
+    image = Image.merge("RGB", (noise, gradient, Image.blend(noise, gradient, 0.5)))
+    image.save(path, "JPEG", quality=92)
+
+
+def render(args):
+    return render_image_variants(*args)
+
+
+def benchmark(courses: int, display_width: int) -> None:
+    widths = settings.image_variant_widths
+    width = next((w for w in widths if w >= display_width), widths[-1])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        jobs = []
+        for i in range(courses):
+            source = os.path.join(tmp, f"cover_{i}.jpg")
+            make_cover(source, i)
+            output_dir = os.path.join(tmp, f"out_{i}")
+            os.makedirs(output_dir)
+            jobs.append((source, output_dir, f"cover_{i}", widths, settings.IMAGE_VARIANT_QUALITY))
+
+        started = time.perf_counter()
+        render(jobs[0])
+        serial_per_image = time.perf_counter() - started
+
+        workers = settings.IMAGE_WORKERS or os.cpu_count()
+        started = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(render, jobs))
+        pool_total = time.perf_counter() - started
+
+        originals = sum(os.path.getsize(job[0]) for job in jobs)
+        webp = sum(os.path.getsize(os.path.join(job[1], f"{job[2]}_w{width}.webp")) for job in jobs)
+        jpeg = sum(os.path.getsize(os.path.join(job[1], f"{job[2]}_w{width}.jpg")) for job in jobs)
+
+    print(f"Catalog page: {courses} course covers, displayed at {display_width}px (variant w{width})")
+    print(f"Originals ({ORIGINAL_SIZE[0]}x{ORIGINAL_SIZE[1]} JPEG)  {originals / 1024:10.1f} KiB/page")
+    print(f"Variant JPEG                   {jpeg / 1024:10.1f} KiB/page  ({originals / jpeg:.1f}x smaller)")
+    print(f"Variant WebP                   {webp / 1024:10.1f} KiB/page  ({originals / webp:.1f}x smaller)")
+    print(f"Generation, serial             {serial_per_image * 1000:10.1f} ms/image ({len(widths) * 2} variants)")
+    print(f"Generation, {workers} processes        {pool_total / courses * 1000:10.1f} ms/image")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark image variants")
+    parser.add_argument("--courses", type=int, default=20, help="Courses per catalog page")
+    parser.add_argument("--width", type=int, default=400, help="Displayed cover width in px")
+    args = parser.parse_args()
+    benchmark(args.courses, args.width)
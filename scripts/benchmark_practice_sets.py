@@ -0,0 +1,156 @@
+"""
+Benchmark practice-set generation (POST /qbank/practice-sets).
+
+Seeds modules of questions and a user who has attempted part of them, then
+times picking a set of questions with SQL (anti-join for unattempted
+questions, latest attempt per question for incorrect ones) against the
+bitset generator, cold (bitsets read from user_test_attempts) and warm.
+
+Uses a temporary SQLite database.
+
+Usage: python scripts/benchmark_practice_sets.py [--modules 10] [--questions 2000] [--attempts 20000] [--count 20] [--runs 30]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Add parent directory to path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import StandardCourse, User
+from app.models.module import Module
+from app.models.question import Question
+from app.models.subject import Subject
+from app.models.user_test_attempt import UserTestAttempt
+from app.services.practice_service import WEIGHTS, PracticeSetGenerator
+
+USER_ID = 1
+
+
+def seed(engine, modules: int, questions: int, attempts: int) -> list:
+    rng = random.Random(42)
+    Session = sessionmaker(bind=engine)
+    with Session() as session:
+        standard = StandardCourse(name="Benchmark")
+        session.add(standard)
+        session.flush()
+        subject = Subject(course_id=standard.id, name="Benchmark")
+        session.add(subject)
+        session.flush()
+        session.execute(insert(User.__table__), [
+            {"id": USER_ID, "email": "user@example.com", "password_hash": "x", "role": "student"}
+        ])
+        session.execute(insert(Module.__table__), [
+            {"id": module_id, "subject_id": subject.id, "name": f"Module {module_id}"}
+            for module_id in range(1, modules + 1)
+        ])
+        # Interleaved ids, as when questions are added to several modules over time
+        session.execute(insert(Question.__table__), [
+            {"id": question_id, "module_id": question_id % modules + 1, "question_text": f"Question {question_id}",
+             "option_a": "a", "option_b": "b", "option_c": "c", "option_d": "d", "correct_answer": "A"}
+            for question_id in range(1, modules * questions + 1)
+        ])
+        start = datetime.utcnow() - timedelta(days=90)
+        rows = []
+        for i in range(attempts):
+            question_id = rng.randint(1, modules * questions)
+            is_correct = rng.random() < 0.6
+            rows.append({
+                "user_id": USER_ID, "question_id": question_id, "module_id": question_id % modules + 1,
+                "selected_answer": "A" if is_correct else "B", "is_correct": is_correct,
+                "attempted_at": start + timedelta(minutes=i)
+            })
+        session.execute(insert(UserTestAttempt.__table__), rows)
+        session.commit()
+    return list(range(1, modules + 1))
+
+
+def sql_practice_set(session, module_ids: list, count: int) -> list:
+    """Categories computed in SQL, then the same weighted sample in Python."""
+    params = {"user_id": USER_ID}
+    modules = ", ".join(str(module_id) for module_id in module_ids)
+    unattempted = [row[0] for row in session.execute(text(
+        f"SELECT q.id FROM questions q WHERE q.module_id IN ({modules}) AND NOT EXISTS "
+        "(SELECT 1 FROM user_test_attempts a WHERE a.user_id = :user_id AND a.question_id = q.id)"
+    ), params)]
+    latest = session.execute(text(
+        f"SELECT a.question_id, a.is_correct FROM user_test_attempts a WHERE a.user_id = :user_id "
+        f"AND a.module_id IN ({modules}) AND a.id = (SELECT MAX(b.id) FROM user_test_attempts b "
+        "WHERE b.user_id = a.user_id AND b.question_id = a.question_id)"
+    ), params).all()
+    weighted = [(question_id, WEIGHTS["unattempted"]) for question_id in unattempted]
+    weighted += [(question_id, WEIGHTS["correct" if is_correct else "incorrect"]) for question_id, is_correct in latest]
+    # Weighted sampling without replacement (exponential keys)
+    keyed = sorted(weighted, key=lambda item: random.random() ** (1 / item[1]), reverse=True)
+    return [question_id for question_id, _ in keyed[:count]]
+
+
+def timed(fn, runs: int):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - started)
+    return result, statistics.median(timings) * 1000
+
+
+def benchmark(modules: int, questions: int, attempts: int, count: int, runs: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(engine)
+        module_ids = seed(engine, modules, questions, attempts)
+        with engine.begin() as conn:
+            # The index the SQL version needs for its per-question lookups
+            conn.execute(text(
+                "CREATE INDEX ix_bench_attempts_user_question ON user_test_attempts (user_id, question_id, id)"
+            ))
+        Session = sessionmaker(bind=engine)
+
+        with Session() as session:
+            results = []
+            _, latency = timed(lambda: sql_practice_set(session, module_ids, count), runs)
+            results.append(("SQL anti-join", latency))
+
+            def cold():
+                generator = PracticeSetGenerator()
+                return generator.generate(session, USER_ID, module_ids, count)
+            _, latency = timed(cold, runs)
+            results.append(("bitsets, cold", latency))
+
+            generator = PracticeSetGenerator()
+            generator.generate(session, USER_ID, module_ids, count)
+
+            def cold_user():
+                generator._bits.clear()
+                return generator.generate(session, USER_ID, module_ids, count)
+            _, latency = timed(cold_user, runs)
+            results.append(("bitsets, cold user", latency))
+
+            generator.generate(session, USER_ID, module_ids, count)
+            _, latency = timed(lambda: generator.generate(session, USER_ID, module_ids, count), runs)
+            results.append(("bitsets, warm", latency))
+
+    print(f"{modules} modules x {questions} questions, {attempts} attempts, set of {count}, median of {runs} runs")
+    print(f"{'generator':<22}{'latency':>10}")
+    for label, latency in results:
+        print(f"{label:<22}{latency:>8.2f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark practice-set generation")
+    parser.add_argument("--modules", type=int, default=10)
+    parser.add_argument("--questions", type=int, default=2000, help="Questions per module")
+    parser.add_argument("--attempts", type=int, default=20000, help="Attempts by the user")
+    parser.add_argument("--count", type=int, default=20)
+    parser.add_argument("--runs", type=int, default=30)
+    args = parser.parse_args()
+    benchmark(args.modules, args.questions, args.attempts, args.count, args.runs)
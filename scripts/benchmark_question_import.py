@@ -0,0 +1,123 @@
+"""
+Benchmark the bulk question import engine.
+
+Generates CSV files of 10k, 100k and 1M questions and imports each into a
+scratch database, reporting rows/sec. Compares against the previous
+one-ORM-object-per-row approach on the smallest size. The bulk path includes
+duplicate detection (fingerprint lookups, MinHash signatures and LSH buckets);
+the generated questions follow one template, which is the worst case for LSH.
+
+Uses a temporary SQLite database by default; pass --database-url to measure
+PostgreSQL (COPY path). The tables are created if missing and the imported
+rows are deleted afterwards.
+
+Usage: python scripts/benchmark_question_import.py [--sizes 10000,100000,1000000] [--database-url URL]
+"""
+import argparse
+import csv
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+# Add parent directory to path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import StandardCourse, Subject, Module, Question, QuestionSignature, QuestionLSHBucket
+from app.services.question_import import QuestionImporter, iter_csv_records
+
+
+def write_csv(path: str, rows: int) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["question_text", "option_a", "option_b", "option_c", "option_d",
+                         "correct_answer", "explanation", "difficulty"])
+        for i in range(rows):
+            writer.writerow([
+                f"Which nerve supplies muscle #{i}, and what happens when it is injured?",
+                f"Median nerve {i}", f"Ulnar nerve {i}", f"Radial nerve {i}", f"Axillary nerve {i}",
+                "ABCD"[i % 4],
+                f"Explanation for question {i}, with a comma and \"quotes\".",
+                ("easy", "medium", "hard")[i % 3],
+            ])
+
+
+def orm_import(session, path: str, module_id: int) -> int:
+    """The previous approach: one ORM object per row, one commit at the end."""
+    count = 0
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            session.add(Question(
+                question_text=row["question_text"], option_a=row["option_a"], option_b=row["option_b"],
+                option_c=row["option_c"], option_d=row["option_d"], correct_answer=row["correct_answer"],
+                explanation=row.get("explanation"), module_id=module_id,
+                difficulty=row.get("difficulty", "medium"), created_at=datetime.utcnow()
+            ))
+            count += 1
+    session.commit()
+    return count
+
+
+def benchmark(sizes, database_url: str) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        url = database_url or f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        engine = create_engine(url)
+        Base.metadata.create_all(engine)
+        Session = sessionmaker(bind=engine)
+
+        session = Session()
+        course = StandardCourse(name=f"Benchmark {time.time()}")
+        session.add(course)
+        session.flush()
+        subject = Subject(course_id=course.id, name="Benchmark")
+        session.add(subject)
+        session.flush()
+        module = Module(subject_id=subject.id, name="Benchmark")
+        session.add(module)
+        session.commit()
+
+        print(f"Database: {engine.dialect.name} ({engine.dialect.driver})")
+        try:
+            for size in sizes:
+                path = os.path.join(tmp, f"questions_{size}.csv")
+                write_csv(path, size)
+
+                with open(path, "rb") as f:
+                    importer = QuestionImporter(session, default_module_id=module.id)
+                    importer.run(iter_csv_records(f))
+                method = "COPY" if importer.use_copy else "executemany"
+                print(f"{size:>9,} rows  bulk ({method:<11}) {importer.elapsed:8.2f}s  {importer.created / importer.elapsed:>10,.0f} rows/s")
+
+                if size == sizes[0]:
+                    started = time.perf_counter()
+                    count = orm_import(session, path, module.id)
+                    elapsed = time.perf_counter() - started
+                    print(f"{size:>9,} rows  ORM per-row        {elapsed:8.2f}s  {count / elapsed:>10,.0f} rows/s")
+
+                # No ON DELETE CASCADE on SQLite: clear the duplicate index explicitly
+                imported = session.query(Question.id).filter(Question.module_id == module.id)
+                session.query(QuestionLSHBucket).filter(QuestionLSHBucket.question_id.in_(imported)).delete(synchronize_session=False)
+                session.query(QuestionSignature).filter(QuestionSignature.question_id.in_(imported)).delete(synchronize_session=False)
+                session.query(Question).filter(Question.module_id == module.id).delete(synchronize_session=False)
+                session.commit()
+                os.remove(path)
+        finally:
+            session.delete(module)
+            session.delete(subject)
+            session.delete(course)
+            session.commit()
+            session.close()
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark bulk question import")
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="Comma separated row counts")
+    parser.add_argument("--database-url", default="", help="Database to import into (default: temporary SQLite)")
+    args = parser.parse_args()
+    benchmark([int(size) for size in args.sizes.split(",")], args.database_url)
@@ -0,0 +1,43 @@
+"""
+Benchmark the per-request cost of signed stream URLs.
+
+Signing happens once per unlocked lesson in GET /courses/{id};
+verification happens on every range request in /stream/video/{filename}.
+Both are pure CPU work and should stay in the low microseconds.
+
+Usage: python scripts/benchmark_stream_signing.py
+"""
+import sys
+import os
+import timeit
+from urllib.parse import urlparse, parse_qs
+
+# Add parent directory to path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.security import sign_stream_url, verify_stream_signature
+
+ITERATIONS = 200_000
+FILENAME = "6_1770621161.476249.mp4"
+
+
+def benchmark():
+    url = sign_stream_url(FILENAME)
+    query = parse_qs(urlparse(url).query)
+    expires = int(query["expires"][0])
+    sig = query["sig"][0]
+    assert verify_stream_signature(FILENAME, expires, sig)
+
+    sign_total = timeit.timeit(lambda: sign_stream_url(FILENAME), number=ITERATIONS)
+    verify_total = timeit.timeit(lambda: verify_stream_signature(FILENAME, expires, sig), number=ITERATIONS)
+    reject_total = timeit.timeit(lambda: verify_stream_signature(FILENAME, expires, "x" * 43), number=ITERATIONS)
+
+    print(f"Sample URL: {url}")
+    print(f"Iterations: {ITERATIONS:,}")
+    print(f"sign_stream_url           {sign_total / ITERATIONS * 1e6:.2f} µs/op")
+    print(f"verify (valid)            {verify_total / ITERATIONS * 1e6:.2f} µs/op")
+    print(f"verify (bad signature)    {reject_total / ITERATIONS * 1e6:.2f} µs/op")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,148 @@
+"""
+Benchmark the "continue watching" feed (GET /lessons/user/history).
+
+Seeds users with 5k watched lessons each and times one page of history with
+the previous approach (no index: every progress row of the user is sorted)
+against the keyset feed on the (user_id, last_watched_at DESC, id DESC)
+index, for the first page and a deep page, in full and compact mode.
+
+Uses a temporary SQLite database.
+
+Usage: python scripts/benchmark_watch_history.py [--users 20] [--lessons 5000] [--limit 10] [--runs 50]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Add parent directory to path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import StandardCourse, User
+from app.models.course import Course, Lesson
+from app.models.lesson_progress import LessonProgress
+from app.schemas.course import LessonHistoryCompactResponse, LessonHistoryResponse, LessonResponse
+from app.services.watch_history import WatchHistoryService
+
+
+def seed(engine, users: int, lessons: int) -> None:
+    Session = sessionmaker(bind=engine)
+    with Session() as session:
+        standard = StandardCourse(name="Benchmark")
+        session.add(standard)
+        session.flush()
+        course = Course(course_id=standard.id, title="Benchmark", is_published=True)
+        session.add(course)
+        session.flush()
+        session.execute(insert(User.__table__), [
+            {"id": user_id, "email": f"user{user_id}@example.com", "password_hash": "x", "role": "student"}
+            for user_id in range(1, users + 1)
+        ])
+        session.execute(insert(Lesson.__table__), [
+            {"id": lesson_id, "course_id": course.id, "title": f"Lesson {lesson_id}",
+             "description": "What this lesson covers. " * 4, "video_url": f"/static/{lesson_id}.mp4",
+             "poster_url": f"/static/previews/{lesson_id}/poster.jpg", "duration": 600, "order": lesson_id,
+             "is_preview": False, "is_locked": False, "created_at": datetime.utcnow()}
+            for lesson_id in range(1, lessons + 1)
+        ])
+        start = datetime.utcnow() - timedelta(days=365)
+        for user_id in range(1, users + 1):
+            session.execute(insert(LessonProgress.__table__), [
+                {"user_id": user_id, "lesson_id": lesson_id, "course_id": course.id,
+                 "completed": lesson_id % 3 == 0, "watch_time": 300, "last_position": 300,
+                 "last_watched_at": start + timedelta(minutes=(lesson_id * 7919 + user_id) % 500000)}
+                for lesson_id in range(1, lessons + 1)
+            ])
+        session.commit()
+
+
+def previous_history(session, user_id: int, limit: int):
+    """The previous endpoint body: unindexed sort, response built per row."""
+    rows = session.query(Lesson, LessonProgress).join(
+        LessonProgress, Lesson.id == LessonProgress.lesson_id
+    ).filter(LessonProgress.user_id == user_id).order_by(LessonProgress.last_watched_at.desc()).limit(limit).all()
+    return [
+        LessonHistoryResponse(
+            **LessonResponse.model_validate(lesson).model_dump(),
+            progress_completed=progress.completed, progress_watch_time=progress.watch_time,
+            progress_last_position=progress.last_position, last_watched_at=progress.last_watched_at
+        ).model_dump(mode="json")
+        for lesson, progress in rows
+    ]
+
+
+def feed_history(session, user_id: int, limit: int, cursor=None, compact=False):
+    page = WatchHistoryService.get_history(session, user_id, cursor=cursor, limit=limit, compact=compact)
+    if compact:
+        items = [LessonHistoryCompactResponse.model_validate(row).model_dump(mode="json") for row in page.items]
+    else:
+        items = [
+            LessonHistoryResponse(
+                **LessonResponse.model_validate(lesson).model_dump(),
+                progress_completed=progress.completed, progress_watch_time=progress.watch_time,
+                progress_last_position=progress.last_position, last_watched_at=progress.last_watched_at
+            ).model_dump(mode="json")
+            for lesson, progress in page.items
+        ]
+    return items, page.next_cursor
+
+
+def timed(fn, runs: int):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - started)
+    return result, statistics.median(timings) * 1000
+
+
+def benchmark(users: int, lessons: int, limit: int, runs: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(engine)
+        seed(engine, users, lessons)
+        Session = sessionmaker(bind=engine)
+        user_id = users // 2 or 1
+
+        with Session() as session:
+            # Cursor of a page deep in the history (~page 100)
+            cursor = None
+            for _ in range(100):
+                _, cursor = feed_history(session, user_id, limit, cursor)
+
+            results = []
+            for label, fn in [
+                ("indexed, first page", lambda: feed_history(session, user_id, limit)[0]),
+                ("indexed, page 100", lambda: feed_history(session, user_id, limit, cursor)[0]),
+                ("indexed, compact", lambda: feed_history(session, user_id, limit, compact=True)[0]),
+            ]:
+                items, latency = timed(fn, runs)
+                results.append((label, latency, len(json.dumps(items))))
+
+            with engine.begin() as conn:
+                conn.execute(text("DROP INDEX ix_lesson_progress_user_recent"))
+            items, latency = timed(lambda: previous_history(session, user_id, limit), runs)
+            results.insert(0, ("previous (no index)", latency, len(json.dumps(items))))
+
+    print(f"{users} users x {lessons} watched lessons, page size {limit}, median of {runs} runs")
+    print(f"{'query':<22}{'latency':>10}{'payload':>12}")
+    for label, latency, size in results:
+        print(f"{label:<22}{latency:>8.2f}ms{size:>10,} B")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the continue watching feed")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--lessons", type=int, default=5000, help="Watched lessons per user")
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+    benchmark(args.users, args.lessons, args.limit, args.runs)